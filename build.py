@@ -107,6 +107,18 @@ def validate_project_structure():
         'utils/fix_manager.py',
         'utils/download_manager.py',
         'utils/dlc_manager.py',
+        'utils/cache_store.py',
+        'utils/endpoint_health.py',
+        'utils/download_jobs.py',
+        'utils/artifact_store.py',
+        'utils/http_client.py',
+        'utils/app_names.py',
+        'utils/appinfo_index.py',
+        'utils/title_index.py',
+        'utils/app_metadata.py',
+        'utils/steamtools_lua.py',
+        'utils/fs_watcher.py',
+        'utils/library_index.py',
         'utils/fixes_list.json',
         'utils/steam_gameloader_config.json',
         
@@ -238,6 +250,7 @@ a = Analysis(
         'collections',
         'urllib.parse',
         'urllib.request',
+        'sqlite3',
         
         # MÓDULOS PERSONALIZADOS ATUALIZADOS (Dezembro 2025)
         'routes',
@@ -252,6 +265,18 @@ a = Analysis(
         'utils.fix_manager',
         'utils.download_manager',
         'utils.dlc_manager',
+        'utils.cache_store',
+        'utils.endpoint_health',
+        'utils.download_jobs',
+        'utils.artifact_store',
+        'utils.http_client',
+        'utils.app_names',
+        'utils.appinfo_index',
+        'utils.title_index',
+        'utils.app_metadata',
+        'utils.steamtools_lua',
+        'utils.fs_watcher',
+        'utils.library_index',
         'config.dll_manager',
         'icon_tray',
         'webview_config',
@@ -426,6 +451,18 @@ def build_directly():
         '--hidden-import=utils.fix_manager',
         '--hidden-import=utils.download_manager',
         '--hidden-import=utils.dlc_manager',
+        '--hidden-import=utils.cache_store',
+        '--hidden-import=utils.endpoint_health',
+        '--hidden-import=utils.download_jobs',
+        '--hidden-import=utils.artifact_store',
+        '--hidden-import=utils.http_client',
+        '--hidden-import=utils.app_names',
+        '--hidden-import=utils.appinfo_index',
+        '--hidden-import=utils.title_index',
+        '--hidden-import=utils.app_metadata',
+        '--hidden-import=utils.steamtools_lua',
+        '--hidden-import=utils.fs_watcher',
+        '--hidden-import=utils.library_index',
         '--hidden-import=config.dll_manager',
         '--hidden-import=icon_tray',
         '--hidden-import=webview_config',
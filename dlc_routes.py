@@ -91,9 +91,11 @@ def setup_dlc_routes(app: Flask):
         try:
             dlc_mgr = get_dlc_manager()
             force_refresh = request.args.get('refresh', 'false').lower() == 'true'
+            # refresh=true é incremental; full=true rebusca todos os detalhes
+            incremental = request.args.get('full', 'false').lower() != 'true'
             
             # Obter DLCs disponíveis
-            available_dlcs = dlc_mgr.list_dlcs(appid)
+            available_dlcs = dlc_mgr.get_game_dlcs(appid, force_refresh=force_refresh, incremental=incremental)
             
             # Obter DLCs já instaladas
             installed_dlcs = dlc_mgr.get_installed_dlcs(appid)
@@ -173,59 +175,18 @@ def setup_dlc_routes(app: Flask):
             if not dlc_ids_to_remove:
                 dlc_ids_to_remove = installed_dlcs
             
-            # Obter caminho do stplug-in
-            stplug_path = dlc_mgr._get_stplug()
-            if not stplug_path:
-                return jsonify({
-                    "success": False,
-                    "error": "stplug-in não encontrado"
-                })
-            
-            import os
-            from pathlib import Path
-            
-            steamtools_path = stplug_path / "Steamtools.lua"
-            if not steamtools_path.exists():
-                return jsonify({
-                    "success": True,
-                    "message": "Nenhuma DLC instalada (arquivo não existe)",
-                    "removed": 0
-                })
-            
-            # Ler arquivo e remover DLCs
-            with open(steamtools_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            new_lines = []
-            removed_count = 0
-            
-            for line in lines:
-                line_stripped = line.strip()
-                should_keep = True
-                
-                # Verificar se é uma linha de DLC para este appid
-                for dlc_id in dlc_ids_to_remove:
-                    if f"addappid({dlc_id}" in line_stripped.replace(" ", ""):
-                        should_keep = False
-                        removed_count += 1
-                        break
-                
-                if should_keep:
-                    new_lines.append(line)
-            
-            # Salvar arquivo atualizado
-            with open(steamtools_path, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
-            
-            # Limpar caches
-            dlc_mgr.dlc_cache.pop(appid, None)
-            dlc_mgr.games_cache.pop("games", None)
+            # Remoção em uma passada, atômica e sob trava do Steamtools.lua
+            result = dlc_mgr.uninstall_dlcs(appid, dlc_ids_to_remove)
+            if not result.get("success"):
+                return jsonify(result)
+            removed_count = result.get("removed", 0)
             
             return jsonify({
                 "success": True,
                 "message": f"{removed_count} DLC(s) removida(s)",
                 "removed": removed_count,
-                "dlcs_removed": dlc_ids_to_remove if removed_count > 0 else []
+                "dlcs_removed": result.get("dlcs_removed", []),
+                "diff": result.get("diff")
             })
             
         except Exception as e:
@@ -235,6 +196,36 @@ def setup_dlc_routes(app: Flask):
                 "error": str(e)
             })
     
+    @app.route('/api/dlc/bulk', methods=['POST'])
+    def api_dlc_bulk():
+        """Instala/remove DLCs de vários jogos em uma única escrita do Steamtools.lua
+        Corpo: {"install": {appid: [dlc_ids]}, "uninstall": {appid: [dlc_ids]}}"""
+        try:
+            data = request.get_json() or {}
+            install = data.get('install') or {}
+            uninstall = data.get('uninstall') or {}
+            
+            if not isinstance(install, dict) or not isinstance(uninstall, dict):
+                return jsonify({
+                    "success": False,
+                    "error": "Formato inválido: use {appid: [dlc_ids]}"
+                })
+            
+            dlc_mgr = get_dlc_manager()
+            result = dlc_mgr.bulk_apply(install=install, uninstall=uninstall)
+            
+            if result.get("success"):
+                logger.info(f"[DLC BULK] {len(result.get('games', {}))} jogos: "
+                            f"+{result.get('total_installed', 0)} / -{result.get('total_removed', 0)}")
+            
+            return jsonify(result)
+        except Exception as e:
+            logger.error(f"[DLC BULK] Erro: {e}")
+            return jsonify({
+                "success": False,
+                "error": str(e)
+            })
+    
     # ========== ROTAS DE BUSCA ==========
     
     @app.route('/api/dlc/search', methods=['GET'])
@@ -293,9 +284,8 @@ def setup_dlc_routes(app: Flask):
         try:
             dlc_mgr = get_dlc_manager()
             
-            with dlc_mgr._lock:
-                dlc_mgr.dlc_cache.clear()
-                dlc_mgr.games_cache.clear()
+            # Limpa memória e cache persistente
+            dlc_mgr.clear_cache()
             
             logger.info("Cache do DLC Manager limpo")
             
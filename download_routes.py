@@ -5,7 +5,6 @@ import os
 import json
 import logging
 import time
-import traceback
 from datetime import datetime
 from pathlib import Path
 from flask import Flask, request, Response
@@ -25,10 +24,6 @@ def _make_json_safe(obj, _seen=None):
     """Serializador JSON seguro independente"""
     if _seen is None:
         _seen = set()
-    oid = id(obj)
-    if oid in _seen:
-        return "<cyclic>"
-    _seen.add(oid)
 
     if obj is None or isinstance(obj, (bool, int, float, str)):
         return obj
@@ -45,14 +40,21 @@ def _make_json_safe(obj, _seen=None):
     if isinstance(obj, datetime):
         return obj.isoformat()
 
-    if isinstance(obj, dict):
-        return {str(k): _make_json_safe(v, _seen) for k, v in obj.items()}
-
-    if isinstance(obj, (list, tuple, set)):
-        return [_make_json_safe(x, _seen) for x in obj]
-
-    if hasattr(obj, "__dict__"):
-        return _make_json_safe(obj.__dict__, _seen)
+    # Ciclos só são possíveis em containers; o id sai do conjunto ao terminar
+    # para que valores repetidos (não cíclicos) sejam serializados normalmente
+    if isinstance(obj, (dict, list, tuple, set)) or hasattr(obj, "__dict__"):
+        oid = id(obj)
+        if oid in _seen:
+            return "<cyclic>"
+        _seen.add(oid)
+        try:
+            if isinstance(obj, dict):
+                return {str(k): _make_json_safe(v, _seen) for k, v in obj.items()}
+            if isinstance(obj, (list, tuple, set)):
+                return [_make_json_safe(x, _seen) for x in obj]
+            return _make_json_safe(obj.__dict__, _seen)
+        finally:
+            _seen.discard(oid)
 
     try:
         return str(obj)
@@ -99,8 +101,9 @@ def setup_download_routes(app: Flask, getattr_funcs: dict):
     DOWNLOAD_MANAGER_AVAILABLE = _get_func("DOWNLOAD_MANAGER_AVAILABLE", False)
     baixar_manifesto_func = _get_func("baixar_manifesto")  # ✅ Já é a função segura do main.py
     criar_gerenciador_download_func = _get_func("criar_gerenciador_download")
-    _verificar_disponibilidade_appid_func = _get_func("_verificar_disponibilidade_appid")
     get_download_manager_instance_func = _get_func("get_download_manager_instance")  # ✅ NOVO
+    criar_contexto_download_func = _get_func("criar_contexto_download")
+    verificar_disponibilidade_lote_func = _get_func("verificar_disponibilidade_lote")
     
     # ✅ Obter instância única do DownloadManager
     download_manager = None
@@ -116,6 +119,7 @@ def setup_download_routes(app: Flask, getattr_funcs: dict):
     
     # ✅ 2. STORE SEARCH FUNCTIONS (BUSCA REAL)
     buscar_jogos_steam_func = _get_func("buscar_jogos_steam")
+    sugerir_titulos_func = _get_func("sugerir_titulos")
     STORE_SEARCH_AVAILABLE = callable(buscar_jogos_steam_func)
     
     # ✅ 3. FILE PROCESSING
@@ -243,6 +247,76 @@ def setup_download_routes(app: Flask, getattr_funcs: dict):
         
         return None
     
+    # ===================================================================
+    # FILA ASSÍNCRONA DE DOWNLOADS
+    # ===================================================================
+    
+    download_queue = None
+    if callable(baixar_manifesto_func):
+        try:
+            from utils.download_jobs import get_download_job_queue, MAX_BATCH_SIZE
+            download_queue = get_download_job_queue(baixar_manifesto_func, criar_contexto_download_func)
+            logger.info(f"✅ Fila de downloads ativa ({download_queue.max_workers} workers)")
+        except Exception as e:
+            logger.error(f"❌ Erro criando fila de downloads: {e}")
+    
+    def _finalizar_download(appid: str, download_result: dict) -> dict:
+        """
+        Executado pelo worker ao fim do job: registra o log e monta a
+        resposta final (mesmo formato da antiga resposta síncrona)
+        """
+        apis_disponiveis = download_result.get("apis_disponiveis", [])
+        
+        if download_result.get("success"):
+            logger.info(f"✅ DOWNLOAD REAL concluído para {appid}")
+            
+            # ✅ REGISTRAR DOWNLOAD CONCLUÍDO NO LOG
+            download_source = download_result.get("source", "unknown")
+            _log_download(appid, True, download_source, download_result)
+            
+            game_name = download_result.get("game_name", f"Jogo {appid}")
+            files_processed = download_result.get("processing_result", {}).get("files_processed", 0)
+            
+            response_data = {
+                "success": True,
+                "appid": appid,
+                "already_installed": False,
+                "download_completed": True,  # ✅ CRÍTICO: Indica que download foi concluído
+                "message": f"Download de '{game_name}' concluído com sucesso!",
+                "game_name": game_name,
+                "source": download_source,
+                "files_processed": files_processed,
+                "apis_disponiveis": apis_disponiveis,
+                "probe_count": download_result.get("probe_count"),
+                "download_details": {
+                    "source": download_source,
+                    "files_processed": files_processed,
+                    "timestamp": datetime.now().isoformat()
+                },
+                "installation_verified": True,
+                "verified_at": datetime.now().isoformat()
+            }
+            
+            if "processing_result" in download_result:
+                response_data["processing_result"] = download_result["processing_result"]
+            
+            logger.info(f"🎯 Download de {appid} registrado como CONCLUÍDO")
+            return response_data
+        
+        # ❌ DOWNLOAD FALHOU
+        error_msg = download_result.get("error", "Erro desconhecido no download")
+        logger.error(f"❌ Download falhou: {error_msg}")
+        _log_download(appid, False, "error", {"error": error_msg})
+        
+        return {
+            "success": False,
+            "appid": appid,
+            "error": error_msg,
+            "message": "Falha no download do jogo",
+            "apis_disponiveis": apis_disponiveis,
+            "suggestion": "Tente novamente ou use Upload via ZIP"
+        }
+    
     # ===================================================================
     # ROTA PRINCIPAL DE DOWNLOAD - VERSÃO DEFINITIVA CORRIGIDA
     # ===================================================================
@@ -289,93 +363,43 @@ def setup_download_routes(app: Flask, getattr_funcs: dict):
                     "suggestion": "Reinicie o aplicativo"
                 }, 503)
             
-            # ✅ 4. VERIFICAR SE O APPID TEM CONTEÚDO DISPONÍVEL
-            apis_disponiveis = []
-            if callable(_verificar_disponibilidade_appid_func):
-                try:
-                    apis_disponiveis = _verificar_disponibilidade_appid_func(appid)
-                    logger.info(f"🔍 APIs disponíveis para {appid}: {len(apis_disponiveis)}")
-                except Exception as e:
-                    logger.debug(f"Verificação de APIs falhou: {e}")
-            
-            # ✅ 5. EXECUTAR DOWNLOAD REAL
-            logger.info(f"🚀 INICIANDO DOWNLOAD REAL para {appid}...")
-            
-            try:
-                # ✅ CHAMADA À FUNÇÃO DE DOWNLOAD (já usa singleton via main.py)
-                download_result = baixar_manifesto_func(appid)
-                logger.info(f"📊 Resultado do download: {download_result}")
-                
-                if download_result.get("success"):
-                    # ✅ DOWNLOAD BEM-SUCEDIDO
-                    logger.info(f"✅ DOWNLOAD REAL concluído para {appid}")
-                    
-                    # ✅ REGISTRAR DOWNLOAD CONCLUÍDO NO LOG
-                    download_source = download_result.get("source", "unknown")
-                    _log_download(appid, True, download_source, download_result)
-                    
-                    # ✅ PREPARAR RESPOSTA DE SUCESSO
-                    game_name = download_result.get("game_name", f"Jogo {appid}")
-                    files_processed = download_result.get("processing_result", {}).get("files_processed", 0)
-                    
-                    response_data = {
-                        "success": True,
-                        "appid": appid,
-                        "already_installed": False,
-                        "download_completed": True,  # ✅ CRÍTICO: Indica que download foi concluído
-                        "message": f"Download de '{game_name}' concluído com sucesso!",
-                        "game_name": game_name,
-                        "source": download_source,
-                        "files_processed": files_processed,
-                        "apis_disponiveis": apis_disponiveis,
-                        "download_details": {
-                            "source": download_source,
-                            "files_processed": files_processed,
-                            "timestamp": datetime.now().isoformat()
-                        },
-                        "installation_verified": True,
-                        "verified_at": datetime.now().isoformat()
-                    }
-                    
-                    # ✅ Adicionar informações adicionais se disponíveis
-                    if "processing_result" in download_result:
-                        response_data["processing_result"] = download_result["processing_result"]
-                    
-                    logger.info(f"🎯 Download de {appid} registrado como CONCLUÍDO")
-                    return safe_jsonify(response_data)
-                    
-                else:
-                    # ❌ DOWNLOAD FALHOU
-                    error_msg = download_result.get("error", "Erro desconhecido no download")
-                    logger.error(f"❌ Download falhou: {error_msg}")
-                    
-                    # ✅ REGISTRAR FALHA NO LOG
-                    _log_download(appid, False, "error", {"error": error_msg})
-                    
-                    return safe_jsonify({
-                        "success": False,
-                        "appid": appid,
-                        "error": error_msg,
-                        "message": "Falha no download do jogo",
-                        "apis_disponiveis": apis_disponiveis,
-                        "suggestion": "Tente novamente ou use Upload via ZIP"
-                    }, 500)
-                    
-            except Exception as e:
-                error_msg = f"Erro no DownloadManager: {str(e)}"
-                logger.error(f"❌ Exceção no DownloadManager: {error_msg}")
-                logger.error(f"💥 TRACEBACK: {traceback.format_exc()}")
-                
-                # ✅ REGISTRAR FALHA NO LOG
-                _log_download(appid, False, "exception", {"exception": str(e)})
-                
+            # ✅ 4. ENFILEIRAR (probe + download + processamento rodam no worker)
+            if download_queue is None:
+                logger.error("❌ Fila de downloads não disponível")
                 return safe_jsonify({
                     "success": False,
                     "appid": appid,
-                    "error": error_msg,
-                    "message": "Erro interno no sistema de download",
-                    "apis_disponiveis": apis_disponiveis
-                }, 500)
+                    "error": "Fila de downloads não disponível",
+                    "message": "O sistema de download não foi inicializado corretamente",
+                    "suggestion": "Reinicie o aplicativo"
+                }, 503)
+            
+            # bypass_artifacts: baixar das fontes mesmo com artefatos no store local
+            # (force_download, enviado sempre pelo botão de instalar, não desliga o store)
+            data = request.get_json(silent=True) or {}
+            context = None
+            if data.get("bypass_artifacts") and callable(criar_contexto_download_func):
+                context = criar_contexto_download_func(appid_str, bypass_artifacts=True)
+            
+            submitted = download_queue.submit(
+                appid_str,
+                on_complete=lambda download_result: _finalizar_download(appid_str, download_result),
+                context=context
+            )
+            job_id = submitted["job_id"]
+            logger.info(f"📬 Download de {appid} na fila: job {job_id}"
+                        f"{' (reaproveitado)' if submitted.get('deduplicated') else ''}")
+            
+            return safe_jsonify({
+                "success": True,
+                "appid": appid,
+                "queued": True,
+                "job_id": job_id,
+                "deduplicated": submitted.get("deduplicated", False),
+                "status_url": f"/api/download/jobs/{job_id}",
+                "state": submitted.get("state"),
+                "message": f"Download do jogo {appid} adicionado à fila"
+            }, 202)
                 
         except Exception as e:
             error_msg = f"Erro crítico no download: {str(e)}"
@@ -460,6 +484,31 @@ def setup_download_routes(app: Flask, getattr_funcs: dict):
     # ROTA DE BUSCA DE JOGOS CORRIGIDA
     # ===================================================================
     
+    @app.route('/api/search/suggest')
+    def api_search_suggest():
+        """
+        ⚡ SUGESTÕES INSTANTÂNEAS - índice local de títulos (sem rede)
+        """
+        try:
+            query = request.args.get("q", "").strip()
+            limit = min(max(int(request.args.get("limit", 8)), 1), 25)
+            
+            if not query or len(query) < 2:
+                return safe_jsonify({"success": True, "results": [], "count": 0, "needs_remote": False})
+            
+            if not callable(sugerir_titulos_func):
+                return safe_jsonify({"success": False, "error": "Índice local não disponível",
+                                     "results": [], "needs_remote": True})
+            
+            resultado = sugerir_titulos_func(query, limit=limit)
+            resultado["count"] = len(resultado.get("results", []))
+            resultado["source"] = "local_index"
+            return safe_jsonify(resultado)
+            
+        except Exception as e:
+            logger.error(f"Erro nas sugestões: {e}")
+            return safe_jsonify({"success": False, "error": str(e), "results": [], "needs_remote": True}, 500)
+    
     @app.route('/api/search/games')
     def api_search_games():
         """
@@ -664,6 +713,21 @@ def setup_download_routes(app: Flask, getattr_funcs: dict):
                 }
             }
             
+            # Fila de downloads
+            if download_queue is not None:
+                systems_status["download_queue"] = download_queue.get_stats()
+            
+            # Saúde das APIs externas (circuit breaker / latência)
+            if download_manager is not None and hasattr(download_manager, "endpoint_health"):
+                systems_status["download_manager"]["endpoint_health"] = download_manager.endpoint_health.snapshot()
+            
+            # Reaproveitamento de conexões HTTP (pools compartilhados)
+            try:
+                from utils.http_client import get_http_metrics
+                systems_status["http_pools"] = get_http_metrics()
+            except Exception as e:
+                logger.debug(f"Métricas HTTP indisponíveis: {e}")
+            
             return safe_jsonify({
                 "success": True,
                 "systems": systems_status,
@@ -686,6 +750,109 @@ def setup_download_routes(app: Flask, getattr_funcs: dict):
                 "error": str(e)
             }, 500)
     
+    # ===================================================================
+    # ROTAS DE JOBS DE DOWNLOAD (POLLING DE PROGRESSO)
+    # ===================================================================
+    
+    @app.route('/api/download/jobs/<job_id>')
+    def api_download_job_status(job_id):
+        """
+        📬 STATUS DE UM JOB DE DOWNLOAD (fase, bytes, fonte e resultado final)
+        """
+        if download_queue is None:
+            return safe_jsonify({"success": False, "error": "Fila de downloads não disponível"}, 503)
+        
+        status = download_queue.get_status(job_id)
+        return safe_jsonify(status, 200 if status.get("success") else 404)
+    
+    @app.route('/api/download/jobs')
+    def api_download_jobs():
+        """
+        📋 LISTA DE JOBS DE DOWNLOAD (ativos e finalizados recentemente)
+        """
+        if download_queue is None:
+            return safe_jsonify({"success": False, "error": "Fila de downloads não disponível"}, 503)
+        
+        jobs = download_queue.list_jobs()
+        return safe_jsonify({
+            "success": True,
+            "jobs": jobs,
+            "total": len(jobs),
+            "stats": download_queue.get_stats()
+        })
+    
+    # ===================================================================
+    # ROTAS DE DOWNLOAD EM LOTE
+    # ===================================================================
+    
+    @app.route('/api/download/batch', methods=['POST'])
+    def api_download_batch():
+        """
+        📦 DOWNLOAD EM LOTE: uma verificação de APIs para todos os appids e
+        downloads pela fila compartilhada (limite de conexões por host)
+        """
+        try:
+            if download_queue is None:
+                return safe_jsonify({"success": False, "error": "Fila de downloads não disponível"}, 503)
+            
+            data = request.get_json(silent=True) or {}
+            appids = data.get("appids")
+            if not isinstance(appids, list) or not appids:
+                return safe_jsonify({
+                    "success": False,
+                    "error": "Lista de appids obrigatória",
+                    "message": "Envie {\"appids\": [\"123\", \"456\"]}"
+                }, 400)
+            
+            appids = list(dict.fromkeys(str(a).strip() for a in appids))
+            invalidos = [a for a in appids if not a.isdigit()]
+            validos = [a for a in appids if a.isdigit()]
+            if len(validos) > MAX_BATCH_SIZE:
+                return safe_jsonify({
+                    "success": False,
+                    "error": f"Máximo de {MAX_BATCH_SIZE} appids por lote"
+                }, 400)
+            
+            ja_concluidos = [a for a in validos if _is_download_completed(a)]
+            pendentes = [a for a in validos if a not in ja_concluidos]
+            
+            batch = {"batch_id": None, "jobs": {}}
+            if pendentes:
+                batch = download_queue.submit_batch(
+                    pendentes,
+                    on_complete=lambda download_result: _finalizar_download(
+                        str(download_result.get("appid")), download_result),
+                    probe_batch=verificar_disponibilidade_lote_func
+                )
+            
+            logger.info(f"📦 Lote recebido: {len(pendentes)} na fila, {len(ja_concluidos)} já concluídos, "
+                        f"{len(invalidos)} inválidos")
+            
+            return safe_jsonify({
+                "success": True,
+                "batch_id": batch["batch_id"],
+                "status_url": f"/api/download/batch/{batch['batch_id']}" if batch["batch_id"] else None,
+                "jobs": batch["jobs"],
+                "already_installed": ja_concluidos,
+                "invalid": invalidos,
+                "message": f"{len(pendentes)} downloads adicionados à fila"
+            }, 202 if pendentes else 200)
+            
+        except Exception as e:
+            logger.error(f"❌ Erro no download em lote: {e}")
+            return safe_jsonify({"success": False, "error": str(e)}, 500)
+    
+    @app.route('/api/download/batch/<batch_id>')
+    def api_download_batch_status(batch_id):
+        """
+        📊 PROGRESSO AGREGADO E RESULTADO POR APPID DE UM LOTE
+        """
+        if download_queue is None:
+            return safe_jsonify({"success": False, "error": "Fila de downloads não disponível"}, 503)
+        
+        status = download_queue.get_batch_status(batch_id)
+        return safe_jsonify(status, 200 if status.get("success") else 404)
+    
     # ===================================================================
     # ROTA PARA LIMPAR CACHE DE DOWNLOADS (ÚTIL PARA TESTES)
     # ===================================================================
@@ -734,10 +901,15 @@ def setup_download_routes(app: Flask, getattr_funcs: dict):
     logger.info(f"🔹 Sistema de Log: ✅ ATIVO ({downloads_dir})")
     logger.info("=" * 60)
     logger.info("🔹 Rotas disponíveis:")
-    logger.info("   • /api/game/<appid>/download (POST) - Download REAL")
+    logger.info("   • /api/game/<appid>/download (POST) - Enfileira download REAL")
+    logger.info("   • /api/download/jobs/<job_id> - Progresso do job")
+    logger.info("   • /api/download/jobs - Lista de jobs")
+    logger.info("   • /api/download/batch (POST) - Download em lote")
+    logger.info("   • /api/download/batch/<batch_id> - Progresso do lote")
     logger.info("   • /api/game/<appid>/install-status - Status REAL")
     logger.info("   • /api/game/<appid>/verify-installation (POST) - Verificação")
     logger.info("   • /api/search/games - Busca REAL via Steam API")
+    logger.info("   • /api/search/suggest - Sugestões instantâneas (índice local)")
     logger.info("   • /api/upload/zip (POST) - Upload REAL")
     logger.info("   • /api/download/system-status - Status do sistema")
     logger.info("   • /api/download/clear-cache (POST) - Limpar cache")
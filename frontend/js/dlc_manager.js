@@ -1080,6 +1080,18 @@ async function installSingleDLC(appid, dlcId) {
     );
 }
 
+async function postBulkDLCs(payload) {
+    const response = await fetch('/api/dlc/bulk', {
+        method: 'POST',
+        headers: { 
+            'Content-Type': 'application/json',
+            'Cache-Control': 'no-cache'
+        },
+        body: JSON.stringify(payload)
+    });
+    return response.json();
+}
+
 async function installSelectedDLCs() {
     // Coletar todas as DLCs selecionadas
     const installs = [];
@@ -1109,39 +1121,34 @@ async function installSelectedDLCs() {
                 const errors = [];
                 const success = [];
                 
-                // Instalar em cada jogo
+                // Uma única requisição/escrita do Steamtools.lua para todos os jogos
+                const games = {};
+                installs.forEach(install => { games[install.appid] = install.dlcIds; });
+                const data = await postBulkDLCs({ install: games });
+                if (!data.success) {
+                    throw new Error(data.error || 'Falha na operação em lote');
+                }
+                
+                const reloads = [];
                 for (const install of installs) {
-                    try {
-                        const response = await fetch(`/api/dlc/${install.appid}/install`, {
-                            method: 'POST',
-                            headers: { 
-                                'Content-Type': 'application/json',
-                                'Cache-Control': 'no-cache'
-                            },
-                            body: JSON.stringify({ dlc_ids: install.dlcIds })
-                        });
+                    const result = (data.games || {})[install.appid] || {};
+                    if (result.success) {
+                        const installed = result.installed || 0;
+                        totalInstalled += installed;
+                        success.push(`Jogo ${install.appid}: ${installed} DLC(s) instalada(s)`);
                         
-                        const data = await response.json();
-                        
-                        if (data.success) {
-                            const installed = data.installed || 0;
-                            totalInstalled += installed;
-                            success.push(`Jogo ${install.appid}: ${installed} DLC(s) instalada(s)`);
-                            
-                            // Recarregar DLCs deste jogo
-                            await loadGameDLCs(install.appid);
-                            
-                            // Limpar selecionadas
-                            selectedDLCs[install.appid] = [];
-                            updateSelectedCount(install.appid);
-                        } else {
-                            errors.push(`Jogo ${install.appid}: ${data.error}`);
-                        }
-                    } catch (error) {
-                        errors.push(`Jogo ${install.appid}: ${error.message}`);
+                        // Limpar selecionadas
+                        selectedDLCs[install.appid] = [];
+                        updateSelectedCount(install.appid);
+                        reloads.push(loadGameDLCs(install.appid));
+                    } else {
+                        errors.push(`Jogo ${install.appid}: ${result.error || 'sem resultado'}`);
                     }
                 }
                 
+                // Recarregar DLCs dos jogos afetados
+                await Promise.all(reloads);
+                
                 updateGlobalCounts();
                 updateStats();
                 saveToCache();
@@ -1342,39 +1349,34 @@ async function uninstallSelectedDLCs() {
                 const errors = [];
                 const success = [];
                 
-                // Remover de cada jogo
+                // Uma única requisição/escrita do Steamtools.lua para todos os jogos
+                const games = {};
+                removals.forEach(removal => { games[removal.appid] = removal.dlcIds; });
+                const data = await postBulkDLCs({ uninstall: games });
+                if (!data.success) {
+                    throw new Error(data.error || 'Falha na operação em lote');
+                }
+                
+                const reloads = [];
                 for (const removal of removals) {
-                    try {
-                        const response = await fetch(`/api/dlc/${removal.appid}/uninstall`, {
-                            method: 'POST',
-                            headers: { 
-                                'Content-Type': 'application/json',
-                                'Cache-Control': 'no-cache'
-                            },
-                            body: JSON.stringify({ dlc_ids: removal.dlcIds })
-                        });
+                    const result = (data.games || {})[removal.appid] || {};
+                    if (result.success) {
+                        const removed = result.removed || 0;
+                        totalRemoved += removed;
+                        success.push(`Jogo ${removal.appid}: ${removed} DLC(s) removida(s)`);
                         
-                        const data = await response.json();
-                        
-                        if (data.success) {
-                            const removed = data.removed || 0;
-                            totalRemoved += removed;
-                            success.push(`Jogo ${removal.appid}: ${removed} DLC(s) removida(s)`);
-                            
-                            // Recarregar DLCs deste jogo
-                            await loadGameDLCs(removal.appid);
-                            
-                            // Limpar selecionadas para remoção
-                            selectedToRemove[removal.appid] = [];
-                            updateSelectedRemoveCount(removal.appid);
-                        } else {
-                            errors.push(`Jogo ${removal.appid}: ${data.error}`);
-                        }
-                    } catch (error) {
-                        errors.push(`Jogo ${removal.appid}: ${error.message}`);
+                        // Limpar selecionadas para remoção
+                        selectedToRemove[removal.appid] = [];
+                        updateSelectedRemoveCount(removal.appid);
+                        reloads.push(loadGameDLCs(removal.appid));
+                    } else {
+                        errors.push(`Jogo ${removal.appid}: ${result.error || 'sem resultado'}`);
                     }
                 }
                 
+                // Recarregar DLCs dos jogos afetados
+                await Promise.all(reloads);
+                
                 updateGlobalCounts();
                 updateStats();
                 saveToCache();
@@ -7,6 +7,8 @@ class GameManagementSystem {
         this.steamPath = null;
         this.isInitialized = false;
         this.operationsLog = [];
+        this.namesPollInterval = 1500;
+        this.namesPollToken = 0;
         this.steamCoverManager = new SteamCoverManager();
         
         this.init();
@@ -136,7 +138,8 @@ class GameManagementSystem {
                     'Content-Type': 'application/json',
                 },
                 body: JSON.stringify({
-                    check_fixes: this.getSetting('autoFixes')
+                    check_fixes: this.getSetting('autoFixes'),
+                    names_pending: true
                 })
             });
 
@@ -154,6 +157,10 @@ class GameManagementSystem {
                 
                 this.logOperation(`🎮 ${result.total_games} jogos detectados com sucesso`);
                 
+                if (result.names_pending > 0) {
+                    this.pollPendingNames();
+                }
+                
                 if (result.fixes_count > 0) {
                     this.logOperation(`🔧 ${result.fixes_count} jogos com fixes disponíveis`);
                 }
@@ -178,6 +185,55 @@ class GameManagementSystem {
         }
     }
 
+    // Busca progressivamente os nomes resolvidos em segundo plano pelo backend
+    async pollPendingNames() {
+        const token = ++this.namesPollToken;
+        
+        while (token === this.namesPollToken) {
+            const pending = this.detectedGames.filter(game => game.name_pending);
+            if (!pending.length) return;
+            
+            await new Promise(resolve => setTimeout(resolve, this.namesPollInterval));
+            if (token !== this.namesPollToken) return;
+            
+            try {
+                const appids = pending.map(game => game.appid).join(',');
+                const response = await fetch(`/api/games/names?appids=${appids}`);
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                
+                const result = await response.json();
+                if (!result.success) throw new Error(result.error || 'Falha ao obter nomes');
+                
+                const stillPending = new Set(result.pending || []);
+                pending.forEach(game => {
+                    const name = result.names[game.appid];
+                    if (name === undefined && stillPending.has(game.appid)) return;
+                    
+                    game.name = name || `AppID ${game.appid}`;
+                    game.real_name = game.name;
+                    game.name_from_cache = !!(result.found && result.found[game.appid]);
+                    game.name_pending = false;
+                    this.updateGameNameElement(game);
+                });
+            } catch (error) {
+                console.error('Erro ao buscar nomes pendentes:', error);
+                return;
+            }
+        }
+    }
+
+    updateGameNameElement(game) {
+        const gameItem = document.querySelector(`.game-item[data-appid="${game.appid}"]`);
+        if (!gameItem) return;
+        
+        const nameElement = gameItem.querySelector('.game-name');
+        if (nameElement) {
+            nameElement.textContent = game.name;
+            nameElement.title = game.name;
+        }
+        gameItem.setAttribute('aria-label', game.name);
+    }
+
     // ==================== RENDERIZAÇÃO DA LISTA PREMIUM ====================
     async renderGamesList() {
         const gamesList = document.getElementById('gamesList');
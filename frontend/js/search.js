@@ -6,7 +6,10 @@ const SearchConfig = {
     API_BASE: '/api',
     INSTALLATION_CACHE_KEY: 'steam_gameloader_installed_games',
     SEARCH_MIN_CHARS: 2,
-    MAX_NOTIFICATIONS: 4
+    MAX_NOTIFICATIONS: 4,
+    JOB_POLL_INTERVAL: 1000,
+    SUGGEST_DEBOUNCE: 120,
+    SUGGEST_LIMIT: 8
 };
 
 // ====== ESTADO GLOBAL ======
@@ -24,6 +27,9 @@ const SearchState = {
 class SearchSystem {
     constructor() {
         this.searchTimeout = null;
+        this.suggestTimeout = null;
+        this.suggestSeq = 0;
+        this.localCoversQuery = false;
         this.initializeElements();
         this.setupEventListeners();
     }
@@ -41,6 +47,15 @@ class SearchSystem {
             systemStatusText: document.getElementById('systemStatusText'),
             resultsCount: document.getElementById('resultsCount')
         };
+        
+        // Lista de sugestões instantâneas (índice local de títulos)
+        const wrapper = this.elements.searchInput ? this.elements.searchInput.closest('.search-input-wrapper') : null;
+        if (wrapper) {
+            this.elements.suggestionsBox = document.createElement('div');
+            this.elements.suggestionsBox.className = 'search-suggestions';
+            this.elements.suggestionsBox.setAttribute('role', 'listbox');
+            wrapper.appendChild(this.elements.suggestionsBox);
+        }
     }
     
     setupEventListeners() {
@@ -51,15 +66,29 @@ class SearchSystem {
             searchInput.addEventListener('keypress', (e) => {
                 if (e.key === 'Enter') {
                     e.preventDefault();
+                    this.hideSuggestions();
                     this.performSearch();
                 }
             });
             
-            // Busca automática com debounce
+            searchInput.addEventListener('keydown', (e) => {
+                if (e.key === 'Escape') this.hideSuggestions();
+            });
+            
+            searchInput.addEventListener('blur', () => {
+                setTimeout(() => this.hideSuggestions(), 150);
+            });
+            
+            // Sugestões locais quase imediatas + busca remota com debounce
             searchInput.addEventListener('input', () => {
+                clearTimeout(this.suggestTimeout);
+                this.suggestTimeout = setTimeout(() => this.fetchSuggestions(searchInput.value.trim()),
+                    SearchConfig.SUGGEST_DEBOUNCE);
+                
                 clearTimeout(this.searchTimeout);
                 this.searchTimeout = setTimeout(() => {
-                    if (searchInput.value.length >= SearchConfig.SEARCH_MIN_CHARS) {
+                    // A Steam Store só é consultada quando o índice local não cobre a busca
+                    if (searchInput.value.length >= SearchConfig.SEARCH_MIN_CHARS && !this.localCoversQuery) {
                         this.performSearch();
                     }
                 }, 800);
@@ -146,6 +175,67 @@ class SearchSystem {
         }
     }
     
+    async fetchSuggestions(query) {
+        const seq = ++this.suggestSeq;
+        this.localCoversQuery = false;
+        
+        if (!query || query.length < SearchConfig.SEARCH_MIN_CHARS) {
+            this.hideSuggestions();
+            return;
+        }
+        
+        try {
+            const response = await fetch(`${SearchConfig.API_BASE}/search/suggest?q=${encodeURIComponent(query)}&limit=${SearchConfig.SUGGEST_LIMIT}`);
+            if (!response.ok) return;
+            
+            const data = await response.json();
+            // Resposta de uma digitação anterior: descartar
+            if (seq !== this.suggestSeq) return;
+            
+            this.localCoversQuery = data.success && data.needs_remote === false;
+            this.renderSuggestions(data.success ? (data.results || []) : []);
+        } catch (error) {
+            console.debug('Sugestões locais indisponíveis:', error);
+        }
+    }
+    
+    renderSuggestions(suggestions) {
+        const { suggestionsBox, searchInput } = this.elements;
+        if (!suggestionsBox) return;
+        
+        if (!suggestions.length) {
+            this.hideSuggestions();
+            return;
+        }
+        
+        suggestionsBox.innerHTML = suggestions.map(item => `
+            <div class="search-suggestion" role="option" data-name="${this.escapeHtml(item.name)}">
+                <span class="search-suggestion-name">${this.escapeHtml(item.name)}</span>
+                <span class="search-suggestion-appid">${item.appid}</span>
+            </div>
+        `).join('');
+        
+        suggestionsBox.querySelectorAll('.search-suggestion').forEach(element => {
+            element.addEventListener('mousedown', (e) => {
+                e.preventDefault();
+                if (searchInput) searchInput.value = element.getAttribute('data-name');
+                clearTimeout(this.searchTimeout);
+                this.hideSuggestions();
+                this.performSearch();
+            });
+        });
+        
+        suggestionsBox.classList.add('visible');
+    }
+    
+    hideSuggestions() {
+        const { suggestionsBox } = this.elements;
+        if (suggestionsBox) {
+            suggestionsBox.classList.remove('visible');
+            suggestionsBox.innerHTML = '';
+        }
+    }
+    
     async performSearch() {
         const { searchInput, btnSearch } = this.elements;
         const query = searchInput ? searchInput.value.trim() : '';
@@ -433,9 +523,15 @@ class SearchSystem {
                 })
             });
             
-            const data = await response.json();
+            let data = await response.json();
             console.log('📥 Resposta do download:', data);
             
+            // Download enfileirado: acompanhar o job até o resultado final
+            if (data.success && data.job_id) {
+                data = await this.waitForDownloadJob(data.job_id, button);
+                console.log('📥 Resultado do job de download:', data);
+            }
+            
             if (data.success) {
                 if (data.download_completed === true) {
                     button.classList.remove('installing');
@@ -514,6 +610,37 @@ class SearchSystem {
         }
     }
     
+    async waitForDownloadJob(jobId, button) {
+        const phaseLabels = {
+            na_fila: 'Na fila...',
+            iniciando: 'Iniciando...',
+            criado: 'Iniciando...',
+            baixando: 'Baixando...',
+            processando: 'Processando...'
+        };
+        
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, SearchConfig.JOB_POLL_INTERVAL));
+            
+            const response = await fetch(`${SearchConfig.API_BASE}/download/jobs/${jobId}`);
+            const data = await response.json();
+            if (!data.success) {
+                return { success: false, error: data.error || 'Job de download não encontrado' };
+            }
+            
+            const job = data.job;
+            if (job.status === 'completed' || job.status === 'failed') {
+                return job.result || { success: job.status === 'completed' };
+            }
+            
+            let label = phaseLabels[job.phase] || 'Instalando...';
+            if (job.phase === 'baixando' && job.total_bytes > 0) {
+                label = `Baixando ${Math.floor((job.bytes_read / job.total_bytes) * 100)}%`;
+            }
+            button.innerHTML = `<i class="fas fa-spinner fa-spin"></i><span>${label}</span>`;
+        }
+    }
+    
     async verifySingleInstallation(appid) {
         try {
             const response = await fetch(`${SearchConfig.API_BASE}/game/${appid}/install-status`);
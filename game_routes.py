@@ -24,7 +24,7 @@ def setup_game_routes(app: Flask, steam_utils_funcs: dict):
     
     try:
         # Importar o sistema CORRETO de game_management
-        from utils.game_management import create_game_manager
+        from utils.game_management import create_game_manager, get_name_resolver
         
         # Função helper para obter steam path
         def get_steam_path():
@@ -50,6 +50,7 @@ def setup_game_routes(app: Flask, steam_utils_funcs: dict):
             try:
                 data = request.get_json() or {}
                 fetch_names = data.get("fetch_names", True)
+                names_pending = bool(data.get("names_pending", False))
                 
                 # Obter caminho do Steam
                 steam_path = data.get("steam_path")
@@ -68,7 +69,7 @@ def setup_game_routes(app: Flask, steam_utils_funcs: dict):
                 manager = create_game_manager(steam_path)
                 
                 # Detectar jogos usando o sistema CORRETO
-                result = manager.detect_games(fetch_names=fetch_names)
+                result = manager.detect_games(fetch_names=fetch_names, names_pending=names_pending)
                 
                 return jsonify({
                     "success": result["success"],
@@ -76,6 +77,7 @@ def setup_game_routes(app: Flask, steam_utils_funcs: dict):
                     "total_games": result.get("total_games", 0),
                     "total_size": result.get("total_size", 0),
                     "processing_time": result.get("processing_time", "0s"),
+                    "names_pending": result.get("names_pending", 0),
                     "message": result.get("message", ""),
                     "error": result.get("error"),
                     "timestamp": datetime.now().isoformat()
@@ -90,6 +92,33 @@ def setup_game_routes(app: Flask, steam_utils_funcs: dict):
                     "timestamp": datetime.now().isoformat()
                 })
         
+        @app.route('/api/games/names', methods=['GET'])
+        def api_games_names():
+            """Nomes resolvidos em segundo plano (modo names_pending do detect)"""
+            try:
+                appids_param = request.args.get("appids", "")
+                appids = [a.strip() for a in appids_param.split(",") if a.strip().isdigit()] if appids_param else None
+                
+                names = get_name_resolver().get_names(appids)
+                
+                return jsonify({
+                    "success": True,
+                    "names": names["names"],
+                    "found": names["found"],
+                    "pending": names["pending"],
+                    "done": not names["pending"],
+                    "timestamp": datetime.now().isoformat()
+                })
+                
+            except Exception as e:
+                logger.error(f"[GAMES NAMES] Erro: {e}")
+                return jsonify({
+                    "success": False,
+                    "error": str(e),
+                    "names": {},
+                    "pending": []
+                })
+        
         @app.route('/api/games/refresh/<appid>', methods=['POST'])
         def api_games_refresh(appid):
             """✅ ROTA CORRIGIDA: Atualiza nome do jogo usando Steam API"""
@@ -331,6 +360,7 @@ def setup_game_routes(app: Flask, steam_utils_funcs: dict):
         logger.info("✅✅✅ ROTAS GAME MANAGEMENT CORRIGIDAS COM SUCESSO!")
         logger.info("📊 Rotas CORRETAS disponíveis:")
         logger.info("   🔹 /api/games/detect         - Detecta jogos .lua em stplug-in/")
+        logger.info("   🔹 /api/games/names          - Nomes resolvidos em segundo plano")
         logger.info("   🔹 /api/games/refresh/:id    - Atualiza nome do jogo")
         logger.info("   🔹 /api/games/backup         - Fazer backup de jogos")
         logger.info("   🔹 /api/games/remove         - Remover jogos")
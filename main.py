@@ -119,7 +119,8 @@ DOWNLOAD_ROUTES_AVAILABLE = bool(download_routes_funcs)
 # ✅ CORREÇÃO: Importação COMPLETA do download_manager com todas as funções necessárias
 download_manager_funcs = import_module("utils.download_manager", [
     "baixar_manifesto", "criar_gerenciador_download", "_verificar_disponibilidade_appid",
-    "reset_download_cache"  # ✅ ADICIONADA para limpeza de cache
+    "reset_download_cache",  # ✅ ADICIONADA para limpeza de cache
+    "criar_contexto_download", "verificar_disponibilidade_lote"
 ])
 DOWNLOAD_MANAGER_AVAILABLE = bool(download_manager_funcs)
 
@@ -135,6 +136,11 @@ fix_manager_funcs = import_module("utils.fix_manager", [
 ])
 FIX_MANAGER_AVAILABLE = bool(fix_manager_funcs)
 
+# ✅ Observador de arquivos (invalidação de caches por evento)
+fs_watcher_funcs = import_module("utils.fs_watcher", [
+    "start_fs_watcher", "get_fs_watcher"
+])
+
 # ✅ Steam Routes
 steam_routes_funcs = import_module("steam_routes", [
     "setup_steam_routes", "make_json_safe", "safe_jsonify"
@@ -149,7 +155,7 @@ GAME_ROUTES_AVAILABLE = bool(game_routes_funcs)
 
 # ✅ Store Search
 store_search_funcs = import_module("utils.store_search", [
-    "buscar_jogos_steam", "obter_detalhes_jogo", "get_system_status"
+    "buscar_jogos_steam", "obter_detalhes_jogo", "get_system_status", "sugerir_titulos"
 ])
 STORE_SEARCH_AVAILABLE = bool(store_search_funcs)
 
@@ -219,6 +225,7 @@ format_file_size = safe_get(game_routes_funcs, "format_file_size", lambda x: "0
 buscar_jogos_steam = safe_get(store_search_funcs, "buscar_jogos_steam", lambda x, y=20: {"success": False, "error": "Sistema não disponível"})
 obter_detalhes_jogo = safe_get(store_search_funcs, "obter_detalhes_jogo", lambda x: {"success": False, "error": "Sistema não disponível"})
 get_system_status = safe_get(store_search_funcs, "get_system_status", lambda: {"success": False, "error": "Sistema não disponível"})
+sugerir_titulos = safe_get(store_search_funcs, "sugerir_titulos", lambda x, limit=8: {"success": False, "error": "Sistema não disponível", "results": [], "needs_remote": True})
 
 # ✅ Download Manager - CORREÇÃO CRÍTICA
 def get_download_manager_instance():
@@ -240,15 +247,15 @@ def get_download_manager_instance():
     return DOWNLOAD_MANAGER_INSTANCE
 
 # ✅ Função wrapper para baixar_manifesto que usa singleton
-def baixar_manifesto_safe(appid: str):
+def baixar_manifesto_safe(appid: str, context=None):
     """Função segura de download usando singleton"""
     try:
         manager = get_download_manager_instance()
         if manager and hasattr(manager, 'baixar_manifesto'):
-            return manager.baixar_manifesto(appid)
+            return manager.baixar_manifesto(appid, context)
         elif callable(baixar_manifesto):
             # Fallback para função direta
-            return baixar_manifesto(appid)
+            return baixar_manifesto(appid, context)
         else:
             return {
                 "success": False,
@@ -264,10 +271,12 @@ def baixar_manifesto_safe(appid: str):
         }
 
 # ✅ Inicializar funções do Download Manager
-baixar_manifesto = safe_get(download_manager_funcs, "baixar_manifesto", lambda x: {"success": False, "error": "Sistema não disponível"})
+baixar_manifesto = safe_get(download_manager_funcs, "baixar_manifesto", lambda x, context=None: {"success": False, "error": "Sistema não disponível"})
 criar_gerenciador_download = safe_get(download_manager_funcs, "criar_gerenciador_download", lambda: None)
-_verificar_disponibilidade_appid = safe_get(download_manager_funcs, "_verificar_disponibilidade_appid", lambda x: [])
+_verificar_disponibilidade_appid = safe_get(download_manager_funcs, "_verificar_disponibilidade_appid", lambda x, context=None: [])
 reset_download_cache = safe_get(download_manager_funcs, "reset_download_cache", lambda: None)
+criar_contexto_download = safe_get(download_manager_funcs, "criar_contexto_download", lambda appid, bypass_artifacts=False: None)
+verificar_disponibilidade_lote = safe_get(download_manager_funcs, "verificar_disponibilidade_lote", lambda contexts: {})
 
 # ✅ CORREÇÃO: DLC Manager
 get_dlc_manager = safe_get(dlc_manager_funcs, "get_dlc_manager", lambda x=None: None)
@@ -277,6 +286,9 @@ initialize_dlc_system = safe_get(dlc_manager_funcs, "initialize_dlc_system", lam
 get_fix_manager = safe_get(fix_manager_funcs, "get_fix_manager", lambda x=None: None)
 initialize_fix_system = safe_get(fix_manager_funcs, "initialize_fix_system", lambda x=None: None)
 
+# ✅ Observador de arquivos
+start_fs_watcher = safe_get(fs_watcher_funcs, "start_fs_watcher", lambda x=None: False)
+
 # ✅ Steam Utils
 is_steam_running = safe_get(steam_utils_funcs, "is_steam_running", lambda: False)
 get_steam_info = safe_get(steam_utils_funcs, "get_steam_info", lambda: {})
@@ -398,6 +410,7 @@ def setup_routes():
             "buscar_jogos_steam": buscar_jogos_steam,
             "obter_detalhes_jogo": obter_detalhes_jogo,
             "get_system_status": get_system_status,
+            "sugerir_titulos": sugerir_titulos,
             
             # ✅ SISTEMA DE DOWNLOAD (CORRIGIDO)
             "baixar_manifesto": baixar_manifesto_safe,  # ✅ USA SINGLETON
@@ -405,6 +418,8 @@ def setup_routes():
             "criar_gerenciador_download": criar_gerenciador_download,
             "reset_download_cache": reset_download_cache,
             "get_download_manager_instance": get_download_manager_instance,  # ✅ NOVA
+            "criar_contexto_download": criar_contexto_download,
+            "verificar_disponibilidade_lote": verificar_disponibilidade_lote,
             
             # ✅ SISTEMA DE LOG DE DOWNLOADS (NOVO)
             "download_logger": download_logger,
@@ -550,6 +565,19 @@ def initialize_fix_system_robust():
         traceback.print_exc()
         return {'success': False, 'error': str(e)}
 
+def initialize_fs_watcher_robust():
+    """Inicia o observador de stplug-in/depotcache/steamapps"""
+    try:
+        steam_path = get_steam_path()
+        if start_fs_watcher(steam_path):
+            logger.info(f"[WATCH] ✅ Observador de arquivos ativo: {steam_path}")
+            return True
+        logger.warning("[WATCH] ⚠️ Observador de arquivos não iniciado (caches usam TTL)")
+        return False
+    except Exception as e:
+        logger.error(f"[WATCH] ❌ Erro ao iniciar observador de arquivos: {e}")
+        return False
+
 def initialize_dll_system_robust():
     """Inicializa o sistema DLL"""
     try:
@@ -671,6 +699,9 @@ def initialize_application():
     logger.info("[INIT] Inicializando sistema Fix...")
     fix_init_result = initialize_fix_system_robust()
     
+    logger.info("[INIT] Inicializando observador de arquivos...")
+    initialize_fs_watcher_robust()
+    
     # Configurar rotas
     logger.info("[INIT] 🌐 Configurando rotas DEFINITIVAS...")
     routes_success = setup_routes()
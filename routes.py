@@ -449,7 +449,9 @@ def setup_all_routes(app: Flask, frontend_path: str, base_path: str, getattr_fun
             return safe_jsonify({"success": False, "error": "DLCManager indisponível"})
         try:
             force_refresh = request.args.get("refresh", "false").lower() == "true"
-            dlcs = DLC_MANAGER.get_game_dlcs(appid, force_refresh=force_refresh)
+            # refresh=true é incremental; full=true rebusca todos os detalhes
+            incremental = request.args.get("full", "false").lower() != "true"
+            dlcs = DLC_MANAGER.get_game_dlcs(appid, force_refresh=force_refresh, incremental=incremental)
             
             installed_dlcs = DLC_MANAGER.get_installed_dlcs(appid)
             
@@ -514,57 +516,46 @@ def setup_all_routes(app: Flask, frontend_path: str, base_path: str, getattr_fun
                     "removed": 0
                 })
             
-            stplug_path = DLC_MANAGER._get_stplug()
-            if not stplug_path:
-                return safe_jsonify({
-                    "success": False,
-                    "error": "stplug-in não encontrado"
-                })
-            
-            steamtools_path = stplug_path / "Steamtools.lua"
-            if not steamtools_path.exists():
-                return safe_jsonify({
-                    "success": True,
-                    "message": "Nenhuma DLC instalada (arquivo não existe)",
-                    "removed": 0
-                })
-            
-            with open(steamtools_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-            
-            new_lines = []
-            removed_count = 0
-            
-            for line in lines:
-                line_stripped = line.strip()
-                should_keep = True
-                
-                for dlc_id in dlc_ids:
-                    if f"addappid({dlc_id}" in line_stripped.replace(" ", ""):
-                        should_keep = False
-                        removed_count += 1
-                        break
-                
-                if should_keep:
-                    new_lines.append(line)
-            
-            with open(steamtools_path, 'w', encoding='utf-8') as f:
-                f.writelines(new_lines)
-            
-            DLC_MANAGER.dlc_cache.pop(appid, None)
-            DLC_MANAGER.games_cache.pop("games", None)
+            result = DLC_MANAGER.uninstall_dlcs(appid, dlc_ids)
+            if not result.get("success"):
+                return safe_jsonify(result)
+            removed_count = result.get("removed", 0)
             
             return safe_jsonify({
                 "success": True,
                 "message": f"{removed_count} DLC(s) removida(s)",
                 "removed": removed_count,
-                "dlcs_removed": dlc_ids if removed_count > 0 else []
+                "dlcs_removed": result.get("dlcs_removed", []),
+                "diff": result.get("diff")
             })
             
         except Exception as e:
             logger.error(f"Erro ao remover DLCs de {appid}: {e}")
             return safe_jsonify({"success": False, "error": str(e)})
 
+    @app.route("/api/dlc/bulk", methods=["POST"])
+    def api_dlc_bulk():
+        """Instala/remove DLCs de vários jogos em uma única escrita do Steamtools.lua"""
+        if not DLC_MANAGER_AVAILABLE or not DLC_MANAGER:
+            return safe_jsonify({"success": False, "error": "DLCManager indisponível"})
+        try:
+            data = request.get_json() or {}
+            install = data.get("install") or {}
+            uninstall = data.get("uninstall") or {}
+            
+            if not isinstance(install, dict) or not isinstance(uninstall, dict):
+                return safe_jsonify({"success": False, "error": "Formato inválido: use {appid: [dlc_ids]}"})
+            
+            result = DLC_MANAGER.bulk_apply(install=install, uninstall=uninstall)
+            
+            if result.get("success"):
+                logger.info(f"Lote de DLCs aplicado: {len(result.get('games', {}))} jogos")
+            
+            return safe_jsonify(result)
+        except Exception as e:
+            logger.error(f"Erro no lote de DLCs: {e}")
+            return safe_jsonify({"success": False, "error": str(e)})
+
     @app.route("/api/dlc/search", methods=["GET"])
     def api_dlc_search():
         """Busca jogos no DLC Manager"""
@@ -612,9 +603,8 @@ def setup_all_routes(app: Flask, frontend_path: str, base_path: str, getattr_fun
         if not DLC_MANAGER_AVAILABLE or not DLC_MANAGER:
             return safe_jsonify({"success": False, "error": "DLCManager indisponível"})
         try:
-            with DLC_MANAGER._lock:
-                DLC_MANAGER.dlc_cache.clear()
-                DLC_MANAGER.games_cache.clear()
+            # Limpa memória e cache persistente
+            DLC_MANAGER.clear_cache()
             
             logger.info("Cache do DLC Manager limpo")
             
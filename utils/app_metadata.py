@@ -0,0 +1,175 @@
+# utils/app_metadata.py - SERVIÇO ÚNICO DE METADADOS DA STEAM STORE (appdetails)
+# O payload completo de appdetails de cada appid é buscado uma única vez,
+# guardado no cache persistente com TTL e lido por projeções (nome, lista de
+# DLCs, preço, imagens, resumo de DLC). store_search, game_management,
+# dlc_manager e fix_manager consomem daqui em vez de chamar a API cada um.
+
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from .cache_store import get_cache_store
+from .http_client import coalesced_get
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURAÇÕES --------------------
+APP_DETAILS_URL = "https://store.steampowered.com/api/appdetails"
+APP_METADATA_NAMESPACE = "app_metadata"
+APP_METADATA_TTL = 24 * 3600
+APP_METADATA_MISSING_TTL = 3600      # appids sem página na loja (success=False)
+APP_METADATA_TIMEOUT = 10
+# Região única para todos os consumidores: preços em BRL e um só payload por appid
+APP_METADATA_PARAMS = {"l": "brazilian", "cc": "BR"}
+
+
+class AppMetadataService:
+    """
+    🧾 METADADOS DE APPS (appdetails)
+    - um fetch por appid (chamadas simultâneas agrupadas via single-flight)
+    - payload persistido no cache SQLite compartilhado com TTL
+    - em falha de rede, serve o payload expirado se houver
+    """
+
+    def __init__(self):
+        self.store = get_cache_store()
+        self.hits = 0
+        self.fetches = 0
+        self.failures = 0
+        self.stale_served = 0
+
+    # -------------------- PAYLOAD --------------------
+    def _fetch(self, appid: str) -> Optional[Dict[str, Any]]:
+        """Busca appdetails; retorna o bloco "data" ou None se o app não tem página"""
+        params = dict(APP_METADATA_PARAMS, appids=appid)
+        response = coalesced_get("steam_store", APP_DETAILS_URL, params=params, timeout=APP_METADATA_TIMEOUT)
+        response.raise_for_status()
+        entry = (response.json() or {}).get(appid) or {}
+        if not entry.get("success"):
+            return None
+        return entry.get("data") or {}
+
+    def get(self, appid: Any, max_age: Optional[float] = None, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Payload "data" do appdetails (None se o app não existe na loja ou a
+        busca falhou). max_age força a rebusca de entradas mais antigas.
+        """
+        appid = str(appid).strip()
+        if not appid.isdigit():
+            return None
+
+        cached = self.store.get_entry(APP_METADATA_NAMESPACE, appid)
+        if cached and not cached["expired"] and (max_age is None or cached["age"] <= max_age):
+            self.hits += 1
+            return cached["value"].get("data")
+
+        self.fetches += 1
+        try:
+            data = self._fetch(appid)
+        except Exception as e:
+            self.failures += 1
+            if raise_errors:
+                raise
+            if cached:
+                self.stale_served += 1
+                logger.debug(f"appdetails {appid} falhou ({e}); usando metadados expirados")
+                return cached["value"].get("data")
+            logger.warning(f"⚠️ appdetails indisponível para {appid}: {e}")
+            return None
+
+        ttl = APP_METADATA_TTL if data is not None else APP_METADATA_MISSING_TTL
+        self.store.set(APP_METADATA_NAMESPACE, appid, {"data": data}, ttl=ttl)
+        return data
+
+    # -------------------- PROJEÇÕES --------------------
+    def get_name(self, appid: Any) -> Optional[str]:
+        data = self.get(appid)
+        return (data or {}).get("name") or None
+
+    def get_dlc_ids(self, appid: Any, raise_errors: bool = False) -> Optional[List[str]]:
+        """Ids de DLC listados na loja (None se o app não tem página)"""
+        data = self.get(appid, raise_errors=raise_errors)
+        if data is None:
+            return None
+        return [str(d) for d in data.get("dlc", []) or []]
+
+    def get_price(self, appid: Any) -> Optional[Dict[str, Any]]:
+        data = self.get(appid)
+        if data is None:
+            return None
+        price = data.get("price_overview") or {}
+        return {
+            "final": price.get("final", 0),
+            "initial": price.get("initial", 0),
+            "final_formatted": price.get("final_formatted", "N/A"),
+            "initial_formatted": price.get("initial_formatted", "N/A"),
+            "discount_percent": price.get("discount_percent", 0),
+            "currency": price.get("currency", ""),
+            "is_free": bool(data.get("is_free", False))
+        }
+
+    def get_images(self, appid: Any) -> Optional[Dict[str, Any]]:
+        data = self.get(appid)
+        if data is None:
+            return None
+        return {
+            "header_image": data.get("header_image", ""),
+            "capsule_image": data.get("capsule_image", ""),
+            "background": data.get("background", ""),
+            "screenshots": [s.get("path_full") for s in data.get("screenshots", []) if s.get("path_full")],
+            "movies": [m.get("webm", {}).get("max") for m in data.get("movies", []) if m.get("webm", {}).get("max")]
+        }
+
+    def get_dlc_summary(self, dlc_id: Any, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Registro de DLC no formato usado pelo DLCManager"""
+        dlc_id = str(dlc_id)
+        data = self.get(dlc_id, max_age=max_age)
+        if data is None:
+            return None
+        price = data.get("price_overview") or {}
+        release = data.get("release_date") or {}
+        return {
+            "id": dlc_id,
+            "appid": dlc_id,
+            "name": data.get("name", f"DLC {dlc_id}"),
+            "description": data.get("short_description", ""),
+            "type": data.get("type", "dlc"),
+            "price": price.get("final_formatted", "N/A"),
+            "original_price": price.get("initial_formatted", "N/A"),
+            "discount_percent": price.get("discount_percent", 0),
+            "is_free": data.get("is_free", False),
+            "release_date": release.get("date", ""),
+            "coming_soon": release.get("coming_soon", False),
+            "header_image": data.get("header_image", ""),
+            "capsule_image": data.get("capsule_image", ""),
+        }
+
+    def invalidate(self, appid: Optional[Any] = None):
+        if appid is None:
+            self.store.clear(APP_METADATA_NAMESPACE)
+        else:
+            self.store.delete(APP_METADATA_NAMESPACE, str(appid))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cached_apps": self.store.count(APP_METADATA_NAMESPACE),
+            "hits": self.hits,
+            "fetches": self.fetches,
+            "failures": self.failures,
+            "stale_served": self.stale_served
+        }
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_APP_METADATA: Optional[AppMetadataService] = None
+_APP_METADATA_LOCK = threading.Lock()
+
+
+def get_app_metadata() -> AppMetadataService:
+    """Retorna o serviço SINGLETON de metadados"""
+    global _APP_METADATA
+    if _APP_METADATA is None:
+        with _APP_METADATA_LOCK:
+            if _APP_METADATA is None:
+                _APP_METADATA = AppMetadataService()
+    return _APP_METADATA
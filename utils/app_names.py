@@ -0,0 +1,180 @@
+# utils/app_names.py - RESOLUÇÃO LOCAL DE NOMES DE APPS
+# Antes de consultar a Steam Store, o nome de um appid é procurado em camadas
+# locais: cache persistente de nomes ("game_names"), o índice dos arquivos
+# appmanifest_*.acf das bibliotecas Steam e o índice do appcache/appinfo.vdf.
+# A rede só é usada em faltas reais.
+
+import os
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache_store import get_cache_store
+from .appinfo_index import get_appinfo_index
+from .title_index import get_title_index
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURAÇÕES --------------------
+NAMES_NAMESPACE = "game_names"
+ACF_INDEX_MAX_AGE = 600       # revalida o índice ACF mesmo sem mudança nos diretórios
+MAX_NAME_LENGTH = 100
+
+SOURCE_CACHE = "cache"
+SOURCE_ACF = "acf"
+SOURCE_APPINFO = "appinfo"
+SOURCE_NETWORK = "network"
+
+
+class AppNameResolver:
+    """
+    🏷️ RESOLUÇÃO DE NOMES EM CAMADAS
+    1. cache persistente de nomes
+    2. índice appid -> nome dos appmanifest_*.acf (reconstruído quando o
+       mtime de algum diretório steamapps muda)
+    3. índice do appinfo.vdf (apps que o cliente Steam conhece)
+    4. função remota informada pelo chamador (HTTP)
+    """
+
+    def __init__(self, steam_path: Optional[str] = None):
+        self.steam_path = steam_path
+        self._lock = threading.Lock()
+        self._acf_names: Dict[str, str] = {}
+        self._acf_signature: Optional[Tuple] = None
+        self._acf_built_at = 0.0
+        self.stats = {SOURCE_CACHE: 0, SOURCE_ACF: 0, SOURCE_APPINFO: 0, SOURCE_NETWORK: 0, "misses": 0}
+
+    # -------------------- ÍNDICE ACF --------------------
+    def _resolve_steam_path(self, steam_path: Optional[str]) -> Optional[str]:
+        if steam_path:
+            self.steam_path = steam_path
+        if not self.steam_path:
+            from .fix_manager import detect_steam_root
+            self.steam_path = detect_steam_root()
+        return self.steam_path
+
+    def _library_dirs(self, steam_path: str) -> List[str]:
+        from .fix_manager import _parse_libraryfolders_vdf
+        steamapps = os.path.join(steam_path, "steamapps")
+        libraries = [os.path.abspath(steam_path)]
+        library_vdf = os.path.join(steamapps, "libraryfolders.vdf")
+        if os.path.isfile(library_vdf):
+            libraries.extend(_parse_libraryfolders_vdf(library_vdf))
+        return [os.path.join(lib, "steamapps") for lib in dict.fromkeys(libraries)]
+
+    def _signature(self, steam_path: str) -> Tuple:
+        # Criar/remover um .acf altera o mtime do diretório steamapps
+        assinatura = []
+        for steamapps in self._library_dirs(steam_path):
+            try:
+                assinatura.append((steamapps, os.stat(steamapps).st_mtime_ns))
+            except OSError:
+                continue
+        return tuple(assinatura)
+
+    def _ensure_acf_index(self, steam_path: Optional[str]) -> Dict[str, str]:
+        steam_path = self._resolve_steam_path(steam_path)
+        if not steam_path or not os.path.isdir(steam_path):
+            return {}
+
+        with self._lock:
+            assinatura = self._signature(steam_path)
+            if assinatura == self._acf_signature and time.time() - self._acf_built_at < ACF_INDEX_MAX_AGE:
+                return self._acf_names
+
+            from .fix_manager import scan_steam_games
+            nomes = {}
+            for game in scan_steam_games(steam_path):
+                nome = game.get("name")
+                if nome and not nome.startswith("App "):
+                    nomes[str(game["appid"])] = nome
+
+            self._acf_names = nomes
+            self._acf_signature = assinatura
+            self._acf_built_at = time.time()
+            logger.info(f"📚 Índice ACF de nomes reconstruído: {len(nomes)} apps instalados")
+            return nomes
+
+    # -------------------- API PÚBLICA --------------------
+    def lookup_local(self, appid: Any, steam_path: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """(nome, fonte) a partir das camadas locais, ou None"""
+        appid = str(appid)
+        store = get_cache_store()
+
+        nome = store.get(NAMES_NAMESPACE, appid)
+        if nome and nome != f"AppID {appid}":
+            self.stats[SOURCE_CACHE] += 1
+            return nome, SOURCE_CACHE
+
+        try:
+            nome = self._ensure_acf_index(steam_path).get(appid)
+        except Exception as e:
+            logger.debug(f"Índice ACF indisponível: {e}")
+            nome = None
+
+        if nome:
+            nome = nome[:MAX_NAME_LENGTH]
+            store.set(NAMES_NAMESPACE, appid, nome)
+            self.stats[SOURCE_ACF] += 1
+            return nome, SOURCE_ACF
+
+        try:
+            nome = get_appinfo_index(self.steam_path).get_name(appid)
+        except Exception as e:
+            logger.debug(f"Índice appinfo indisponível: {e}")
+            nome = None
+
+        if nome:
+            self.stats[SOURCE_APPINFO] += 1
+            return nome[:MAX_NAME_LENGTH], SOURCE_APPINFO
+
+        return None
+
+    def resolve(self, appid: Any, fetch_remote: Optional[Callable[[str], Optional[str]]] = None,
+                steam_path: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """(nome, fonte) tentando as camadas locais e, só então, fetch_remote"""
+        appid = str(appid)
+        local = self.lookup_local(appid, steam_path)
+        if local:
+            return local
+
+        if callable(fetch_remote):
+            nome = fetch_remote(appid)
+            if nome:
+                self.remember(appid, nome)
+                self.stats[SOURCE_NETWORK] += 1
+                return nome, SOURCE_NETWORK
+
+        self.stats["misses"] += 1
+        return None
+
+    def remember(self, appid: Any, name: str) -> None:
+        """Grava um nome obtido remotamente no cache persistente"""
+        if name:
+            get_cache_store().set(NAMES_NAMESPACE, str(appid), name[:MAX_NAME_LENGTH])
+            get_title_index().add(appid, name, source="appdetails")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "steam_path": self.steam_path,
+            "acf_entries": len(self._acf_names),
+            "acf_built_at": self._acf_built_at,
+            "appinfo": get_appinfo_index().get_stats(),
+            "lookups": dict(self.stats)
+        }
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_APP_NAME_RESOLVER: Optional[AppNameResolver] = None
+_APP_NAME_RESOLVER_LOCK = threading.Lock()
+
+
+def get_app_name_resolver() -> AppNameResolver:
+    """Retorna o resolvedor SINGLETON de nomes"""
+    global _APP_NAME_RESOLVER
+    if _APP_NAME_RESOLVER is None:
+        with _APP_NAME_RESOLVER_LOCK:
+            if _APP_NAME_RESOLVER is None:
+                _APP_NAME_RESOLVER = AppNameResolver()
+    return _APP_NAME_RESOLVER
@@ -0,0 +1,525 @@
+# utils/appinfo_index.py - ÍNDICE OFFLINE DO appcache/appinfo.vdf DA STEAM
+# O cliente Steam mantém em appcache/appinfo.vdf (VDF binário) nome, tipo,
+# app pai e lista de DLCs de todos os apps que conhece. Este módulo lê o
+# arquivo em streaming e grava um índice compacto ordenado por appid
+# (cache/appinfo_index.bin) consultado via mmap + busca binária, sem HTTP.
+# Quando o mtime do appinfo.vdf muda, apenas apps com change_number novo são
+# decodificados de novo; o restante é reaproveitado do índice anterior.
+
+import os
+import mmap
+import time
+import struct
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from .cache_store import CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURAÇÕES --------------------
+APPINFO_INDEX_FILE = CACHE_DIR / "appinfo_index.bin"
+APPINFO_CHECK_INTERVAL = 30      # intervalo mínimo entre stats do appinfo.vdf
+
+# Versões conhecidas do appinfo.vdf (magic do cabeçalho)
+APPINFO_V27 = 0x07564427
+APPINFO_V28 = 0x07564428
+APPINFO_V29 = 0x07564429         # chaves do VDF binário viram índices numa tabela de strings
+SUPPORTED_VERSIONS = (APPINFO_V27, APPINFO_V28, APPINFO_V29)
+
+# Tipos do VDF binário (KeyValues)
+KV_MAP = 0x00
+KV_STRING = 0x01
+KV_INT32 = 0x02
+KV_FLOAT32 = 0x03
+KV_POINTER = 0x04
+KV_WSTRING = 0x05
+KV_COLOR = 0x06
+KV_UINT64 = 0x07
+KV_END = 0x08
+KV_INT64 = 0x0A
+KV_END_ALT = 0x0B
+
+_FIXED_SIZES = {KV_INT32: 4, KV_FLOAT32: 4, KV_POINTER: 4, KV_COLOR: 4, KV_UINT64: 8, KV_INT64: 8}
+
+# Campos extraídos de cada app (caminho em minúsculas -> campo do registro)
+_WANTED = {
+    ("appinfo", "common", "name"): "name",
+    ("appinfo", "common", "type"): "type",
+    ("appinfo", "common", "parent"): "parent",
+    ("appinfo", "extended", "listofdlc"): "listofdlc",
+}
+_WANTED_PREFIXES = {path[:i] for path in _WANTED for i in range(1, len(path))}
+
+# Layout do índice (little-endian)
+_INDEX_MAGIC = b"SGLAPPIX"
+_INDEX_VERSION = 1
+# magic, versão do índice, versão do appinfo, mtime_ns, tamanho, qtd. registros, offset dlcs, offset strings
+_HEADER = struct.Struct("<8sIIqqIQQ")
+# appid, change_number, parent, name_off, name_len, type_off, type_len, dlc_off, dlc_count
+_RECORD = struct.Struct("<IIIIHIHII")
+_UINT32 = struct.Struct("<I")
+
+_ENTRY_HEAD = struct.Struct("<II")             # appid, size
+_ENTRY_FIXED_V27 = struct.Struct("<IIQ20sI")   # info_state, last_updated, pics_token, sha1, change_number
+_ENTRY_FIXED_V28 = struct.Struct("<IIQ20sI20s")
+
+
+class AppInfoFormatError(ValueError):
+    """appinfo.vdf com versão desconhecida ou conteúdo corrompido"""
+
+
+# ============================================================
+# LEITOR STREAMING DO appinfo.vdf
+# ============================================================
+
+def _read_cstring(buf: bytes, pos: int) -> Tuple[bytes, int]:
+    end = buf.index(b"\x00", pos)
+    return buf[pos:end], end + 1
+
+
+def _read_key(buf: bytes, pos: int, strings: Optional[List[str]]) -> Tuple[str, int]:
+    if strings is not None:
+        return strings[_UINT32.unpack_from(buf, pos)[0]], pos + 4
+    raw, pos = _read_cstring(buf, pos)
+    return raw.decode("utf-8", "replace"), pos
+
+
+def _skip_key(buf: bytes, pos: int, strings: Optional[List[str]]) -> int:
+    return pos + 4 if strings is not None else buf.index(b"\x00", pos) + 1
+
+
+def _skip_map(buf: bytes, pos: int, strings: Optional[List[str]]) -> int:
+    """Avança até o fim de um mapa sem construir objetos"""
+    depth = 1
+    while depth:
+        kv_type = buf[pos]
+        pos += 1
+        if kv_type in (KV_END, KV_END_ALT):
+            depth -= 1
+            continue
+        pos = _skip_key(buf, pos, strings)
+        if kv_type == KV_MAP:
+            depth += 1
+        elif kv_type == KV_STRING:
+            pos = buf.index(b"\x00", pos) + 1
+        elif kv_type in _FIXED_SIZES:
+            pos += _FIXED_SIZES[kv_type]
+        elif kv_type == KV_WSTRING:
+            pos = buf.index(b"\x00\x00", pos) + 2
+        else:
+            raise AppInfoFormatError(f"Tipo KV desconhecido 0x{kv_type:02x} na posição {pos - 1}")
+    return pos
+
+
+def _read_value(buf: bytes, pos: int, kv_type: int) -> Tuple[Any, int]:
+    if kv_type == KV_STRING:
+        raw, pos = _read_cstring(buf, pos)
+        return raw.decode("utf-8", "replace"), pos
+    if kv_type in (KV_INT32, KV_POINTER, KV_COLOR):
+        return struct.unpack_from("<i", buf, pos)[0], pos + 4
+    if kv_type == KV_FLOAT32:
+        return struct.unpack_from("<f", buf, pos)[0], pos + 4
+    if kv_type == KV_UINT64:
+        return struct.unpack_from("<Q", buf, pos)[0], pos + 8
+    if kv_type == KV_INT64:
+        return struct.unpack_from("<q", buf, pos)[0], pos + 8
+    if kv_type == KV_WSTRING:
+        end = buf.index(b"\x00\x00", pos)
+        return buf[pos:end].decode("utf-16-le", "replace"), end + 2
+    raise AppInfoFormatError(f"Tipo KV desconhecido 0x{kv_type:02x} na posição {pos - 1}")
+
+
+def extract_fields(buf: bytes, pos: int, strings: Optional[List[str]],
+                   path: Tuple[str, ...] = (), out: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], int]:
+    """Percorre um mapa KV binário coletando só os campos de _WANTED"""
+    out = {} if out is None else out
+    while True:
+        kv_type = buf[pos]
+        pos += 1
+        if kv_type in (KV_END, KV_END_ALT):
+            return out, pos
+        key, pos = _read_key(buf, pos, strings)
+        child = path + (key.lower(),)
+        if kv_type == KV_MAP:
+            if child in _WANTED_PREFIXES:
+                _, pos = extract_fields(buf, pos, strings, child, out)
+            else:
+                pos = _skip_map(buf, pos, strings)
+        else:
+            value, pos = _read_value(buf, pos, kv_type)
+            field = _WANTED.get(child)
+            if field:
+                out[field] = value
+
+
+def _to_record(fields: Dict[str, Any]) -> Dict[str, Any]:
+    dlcs = []
+    for parte in str(fields.get("listofdlc") or "").split(","):
+        parte = parte.strip()
+        if parte.isdigit():
+            dlcs.append(int(parte))
+    try:
+        parent = int(fields.get("parent") or 0)
+    except (TypeError, ValueError):
+        parent = 0
+    return {
+        "name": str(fields.get("name") or ""),
+        "type": str(fields.get("type") or ""),
+        "parent": parent,
+        "dlcs": dlcs
+    }
+
+
+def _read_string_table(f: BinaryIO, offset: int) -> List[str]:
+    atual = f.tell()
+    f.seek(offset)
+    count = _UINT32.unpack(f.read(4))[0]
+    dados = f.read()
+    f.seek(atual)
+    partes = dados.split(b"\x00")
+    if len(partes) < count:
+        raise AppInfoFormatError("Tabela de strings truncada")
+    return [p.decode("utf-8", "replace") for p in partes[:count]]
+
+
+def iter_appinfo(path: str, known: Optional[Dict[int, int]] = None) -> Iterator[Tuple[int, int, Optional[Dict[str, Any]]]]:
+    """
+    Lê o appinfo.vdf em streaming e produz (appid, change_number, registro).
+    Se known[appid] == change_number, o corpo do app não é decodificado e o
+    registro vem como None (o chamador reaproveita o que já tinha).
+    """
+    known = known or {}
+    with open(path, "rb") as f:
+        magic, _universe = struct.unpack("<II", f.read(8))
+        if magic not in SUPPORTED_VERSIONS:
+            raise AppInfoFormatError(f"Versão do appinfo.vdf não suportada: 0x{magic:08x}")
+
+        strings = None
+        if magic == APPINFO_V29:
+            string_table_offset = struct.unpack("<q", f.read(8))[0]
+            strings = _read_string_table(f, string_table_offset)
+
+        fixed = _ENTRY_FIXED_V27 if magic == APPINFO_V27 else _ENTRY_FIXED_V28
+        while True:
+            head = f.read(_ENTRY_HEAD.size)
+            if len(head) < 4:
+                break
+            appid = _UINT32.unpack_from(head)[0]
+            if appid == 0:
+                break
+            if len(head) < _ENTRY_HEAD.size:
+                raise AppInfoFormatError(f"Entrada truncada para o app {appid}")
+            size = _ENTRY_HEAD.unpack(head)[1]
+
+            fixed_bytes = f.read(fixed.size)
+            if len(fixed_bytes) < fixed.size:
+                raise AppInfoFormatError(f"Entrada truncada para o app {appid}")
+            change_number = fixed.unpack(fixed_bytes)[4]
+            body_size = size - fixed.size
+
+            if known.get(appid) == change_number:
+                f.seek(body_size, os.SEEK_CUR)
+                yield appid, change_number, None
+                continue
+
+            body = f.read(body_size)
+            if len(body) < body_size:
+                raise AppInfoFormatError(f"Entrada truncada para o app {appid}")
+            fields, _ = extract_fields(body, 0, strings)
+            yield appid, change_number, _to_record(fields)
+
+
+def read_appinfo_version(path: str) -> int:
+    with open(path, "rb") as f:
+        return struct.unpack("<I", f.read(4))[0]
+
+
+# ============================================================
+# ÍNDICE COMPACTO (mmap)
+# ============================================================
+
+class AppInfoIndex:
+    """
+    🗂️ ÍNDICE appid -> (nome, tipo, pai, DLCs) a partir do appinfo.vdf
+    - leitura por mmap com busca binária sobre registros de tamanho fixo
+    - reconstrução incremental em segundo plano quando o appinfo.vdf muda
+    """
+
+    def __init__(self, index_path: Optional[Path] = None, steam_path: Optional[str] = None):
+        self.index_path = Path(index_path) if index_path else APPINFO_INDEX_FILE
+        self.steam_path = steam_path
+        self._lock = threading.RLock()
+        self._mm: Optional[mmap.mmap] = None
+        self._file = None
+        self._header: Optional[Tuple] = None
+        self._last_check = 0.0
+        self._rebuilding = False
+        self.last_build: Dict[str, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self._open()
+
+    # -------------------- MAPEAMENTO --------------------
+    def _close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._header = None
+
+    def _open(self):
+        with self._lock:
+            self._close()
+            try:
+                if not self.index_path.is_file() or self.index_path.stat().st_size < _HEADER.size:
+                    return
+                self._file = open(self.index_path, "rb")
+                self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                header = _HEADER.unpack_from(self._mm, 0)
+                if header[0] != _INDEX_MAGIC or header[1] != _INDEX_VERSION:
+                    logger.warning("⚠️ Índice appinfo com formato antigo, será reconstruído")
+                    self._close()
+                    return
+                self._header = header
+            except Exception as e:
+                logger.warning(f"⚠️ Não foi possível abrir o índice appinfo: {e}")
+                self._close()
+
+    @property
+    def count(self) -> int:
+        return self._header[5] if self._header else 0
+
+    def _record_at(self, i: int) -> Tuple:
+        return _RECORD.unpack_from(self._mm, _HEADER.size + i * _RECORD.size)
+
+    def _find(self, appid: int) -> Optional[Tuple]:
+        lo, hi = 0, self.count
+        base = _HEADER.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            atual = _UINT32.unpack_from(self._mm, base + mid * _RECORD.size)[0]
+            if atual < appid:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count:
+            record = self._record_at(lo)
+            if record[0] == appid:
+                return record
+        return None
+
+    def _decode(self, record: Tuple) -> Dict[str, Any]:
+        appid, change_number, parent, name_off, name_len, type_off, type_len, dlc_off, dlc_count = record
+        strings_off = self._header[7]
+        dlcs_off = self._header[6] + dlc_off * 4
+        return {
+            "appid": appid,
+            "change_number": change_number,
+            "name": self._mm[strings_off + name_off:strings_off + name_off + name_len].decode("utf-8", "replace"),
+            "type": self._mm[strings_off + type_off:strings_off + type_off + type_len].decode("utf-8", "replace"),
+            "parent": parent,
+            "dlcs": list(struct.unpack_from(f"<{dlc_count}I", self._mm, dlcs_off)) if dlc_count else []
+        }
+
+    # -------------------- CONSULTA --------------------
+    def get(self, appid: Any) -> Optional[Dict[str, Any]]:
+        """Registro completo do appid ou None"""
+        try:
+            appid = int(appid)
+        except (TypeError, ValueError):
+            return None
+        with self._lock:
+            if self._mm is None:
+                self.misses += 1
+                return None
+            record = self._find(appid)
+            if record is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._decode(record)
+
+    def get_name(self, appid: Any) -> Optional[str]:
+        entry = self.get(appid)
+        return entry["name"] if entry and entry["name"] else None
+
+    def get_dlcs(self, appid: Any) -> Optional[List[int]]:
+        """Lista de DLCs conhecida pelo cliente (None se o app não está no índice)"""
+        entry = self.get(appid)
+        return entry["dlcs"] if entry else None
+
+    # -------------------- ATUALIZAÇÃO --------------------
+    def source_path(self, steam_path: Optional[str] = None) -> Optional[str]:
+        if steam_path:
+            self.steam_path = steam_path
+        if not self.steam_path:
+            from .fix_manager import detect_steam_root
+            self.steam_path = detect_steam_root()
+        if not self.steam_path:
+            return None
+        return os.path.join(self.steam_path, "appcache", "appinfo.vdf")
+
+    def is_current(self, source: str) -> bool:
+        st = os.stat(source)
+        return bool(self._header) and self._header[3] == st.st_mtime_ns and self._header[4] == st.st_size
+
+    def ensure_current(self, steam_path: Optional[str] = None, wait: bool = False) -> bool:
+        """
+        Verifica (no máximo a cada APPINFO_CHECK_INTERVAL) se o appinfo.vdf
+        mudou e dispara a reconstrução. Retorna True se há índice utilizável.
+        """
+        now = time.time()
+        if not wait and now - self._last_check < APPINFO_CHECK_INTERVAL:
+            return self._mm is not None
+        self._last_check = now
+
+        source = self.source_path(steam_path)
+        if not source or not os.path.isfile(source):
+            return self._mm is not None
+
+        try:
+            if self.is_current(source):
+                return True
+        except OSError:
+            return self._mm is not None
+
+        with self._lock:
+            if self._rebuilding:
+                return self._mm is not None
+            self._rebuilding = True
+
+        if wait:
+            self._rebuild_guarded(source)
+        else:
+            threading.Thread(target=self._rebuild_guarded, args=(source,), daemon=True,
+                             name="appinfo_index").start()
+        return self._mm is not None
+
+    def _rebuild_guarded(self, source: str):
+        try:
+            self.rebuild(source)
+        except Exception as e:
+            logger.error(f"❌ Falha ao indexar {source}: {e}")
+        finally:
+            with self._lock:
+                self._rebuilding = False
+
+    def rebuild(self, source: str) -> Dict[str, Any]:
+        """Reconstrói o índice a partir do appinfo.vdf (incremental por change_number)"""
+        inicio = time.time()
+        st = os.stat(source)
+
+        # Registros atuais para reaproveitamento
+        anteriores: Dict[int, Tuple] = {}
+        with self._lock:
+            if self._mm is not None:
+                for i in range(self.count):
+                    record = self._record_at(i)
+                    anteriores[record[0]] = record
+        known = {appid: record[1] for appid, record in anteriores.items()}
+
+        # O mapeamento só é trocado por esta reconstrução, então ler sem o lock é seguro
+        registros: Dict[int, Tuple[int, Dict[str, Any]]] = {}
+        reaproveitados = 0
+        for appid, change_number, record in iter_appinfo(source, known):
+            if record is None:
+                record = self._decode(anteriores[appid])
+                reaproveitados += 1
+            registros[appid] = (change_number, record)
+
+        self._write_index(registros, read_appinfo_version(source), st.st_mtime_ns, st.st_size)
+        self._open()
+
+        self.last_build = {
+            "source": source,
+            "apps": len(registros),
+            "reused": reaproveitados,
+            "decoded": len(registros) - reaproveitados,
+            "seconds": round(time.time() - inicio, 3),
+            "built_at": time.time()
+        }
+        logger.info(f"🗂️ Índice appinfo: {len(registros)} apps "
+                    f"({self.last_build['decoded']} decodificados, {reaproveitados} reaproveitados) "
+                    f"em {self.last_build['seconds']}s")
+        return self.last_build
+
+    def _write_index(self, registros: Dict[int, Tuple[int, Dict[str, Any]]], source_version: int,
+                     mtime_ns: int, size: int):
+        strings = bytearray()
+        string_offsets: Dict[str, Tuple[int, int]] = {}
+        dlcs: List[int] = []
+        records = bytearray()
+
+        def intern(texto: str) -> Tuple[int, int]:
+            if texto not in string_offsets:
+                raw = texto.encode("utf-8")[:0xFFFF]
+                string_offsets[texto] = (len(strings), len(raw))
+                strings.extend(raw)
+            return string_offsets[texto]
+
+        for appid in sorted(registros):
+            change_number, record = registros[appid]
+            name_off, name_len = intern(record["name"])
+            type_off, type_len = intern(record["type"])
+            records.extend(_RECORD.pack(appid, change_number, record["parent"] & 0xFFFFFFFF,
+                                        name_off, name_len, type_off, type_len,
+                                        len(dlcs), len(record["dlcs"])))
+            dlcs.extend(d & 0xFFFFFFFF for d in record["dlcs"])
+
+        dlc_section = _HEADER.size + len(records)
+        strings_section = dlc_section + len(dlcs) * 4
+        header = _HEADER.pack(_INDEX_MAGIC, _INDEX_VERSION, source_version, mtime_ns, size,
+                              len(registros), dlc_section, strings_section)
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=".appinfo_", dir=str(self.index_path.parent))
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(header)
+                out.write(records)
+                out.write(struct.pack(f"<{len(dlcs)}I", *dlcs))
+                out.write(strings)
+            with self._lock:
+                # No Windows um arquivo mapeado não pode ser substituído
+                self._close()
+                os.replace(temp_path, self.index_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "index_path": str(self.index_path),
+            "apps": self.count,
+            "appinfo_version": f"0x{self._header[2]:08x}" if self._header else None,
+            "rebuilding": self._rebuilding,
+            "last_build": dict(self.last_build),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_APPINFO_INDEX: Optional[AppInfoIndex] = None
+_APPINFO_INDEX_LOCK = threading.Lock()
+
+
+def get_appinfo_index(steam_path: Optional[str] = None) -> AppInfoIndex:
+    """Retorna o índice SINGLETON do appinfo.vdf (verifica mudanças sem bloquear)"""
+    global _APPINFO_INDEX
+    if _APPINFO_INDEX is None:
+        with _APPINFO_INDEX_LOCK:
+            if _APPINFO_INDEX is None:
+                _APPINFO_INDEX = AppInfoIndex(steam_path=steam_path)
+    try:
+        _APPINFO_INDEX.ensure_current(steam_path)
+    except Exception as e:
+        logger.debug(f"Verificação do appinfo.vdf falhou: {e}")
+    return _APPINFO_INDEX
@@ -0,0 +1,236 @@
+# utils/artifact_store.py - ARMAZENAMENTO LOCAL ENDEREÇADO POR CONTEÚDO
+# Cada .lua/.manifest instalado é guardado uma única vez em
+# cache/artifacts/<sha[:2]>/<sha256>. Um índice SQLite liga appid -> arquivos,
+# permitindo reinstalar um appid sem rede e descartar o que não é usado há
+# mais tempo quando o limite de bytes é ultrapassado.
+
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .cache_store import CACHE_DIR, SQLiteDatabase
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURAÇÕES --------------------
+ARTIFACTS_DIR = CACHE_DIR / "artifacts"
+ARTIFACTS_DB_FILE = ARTIFACTS_DIR / "index.db"
+ARTIFACTS_MAX_BYTES = 512 * 1024 * 1024     # limite total dos blobs (LRU)
+ARTIFACT_REUSE_TTL = 7 * 24 * 3600          # depois disso o appid volta a ser baixado
+HASH_CHUNK_SIZE = 64 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha256     TEXT PRIMARY KEY,
+    size       INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used  REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_blobs_last_used ON blobs(last_used);
+CREATE TABLE IF NOT EXISTS app_files (
+    appid     TEXT NOT NULL,
+    filename  TEXT NOT NULL,
+    sha256    TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    PRIMARY KEY (appid, filename)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_app_files_sha ON app_files(sha256);
+"""
+
+
+def _sha256_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """
+    🗃️ STORE DE ARTEFATOS (.lua / .manifest)
+    - blobs deduplicados por SHA-256 (manifests iguais de appids diferentes = 1 blob)
+    - índice appid -> {filename: sha256}
+    - despejo LRU por last_used quando o total passa de max_bytes
+    """
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: int = ARTIFACTS_MAX_BYTES):
+        self.root = Path(root) if root else ARTIFACTS_DIR
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.db = SQLiteDatabase(self.root / ARTIFACTS_DB_FILE.name, _SCHEMA)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def blob_path(self, sha256: str) -> Path:
+        return self.root / sha256[:2] / sha256
+
+    # -------------------- ESCRITA --------------------
+    def _store_blob(self, src_path: str) -> Optional[Dict[str, Any]]:
+        """Copia o arquivo para o store (se ainda não existir) e retorna hash e tamanho"""
+        sha256 = _sha256_file(src_path)
+        size = os.path.getsize(src_path)
+        destino = self.blob_path(sha256)
+        if not destino.exists():
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".blob_", dir=str(destino.parent))
+            try:
+                with os.fdopen(fd, 'wb') as out, open(src_path, 'rb') as src:
+                    for chunk in iter(lambda: src.read(HASH_CHUNK_SIZE), b""):
+                        out.write(chunk)
+                os.replace(temp_path, destino)
+            except Exception:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        return {"sha256": sha256, "size": size}
+
+    def put_files(self, appid: str, paths: Iterable[str]) -> int:
+        """Registra os arquivos instalados de um appid (substitui o conjunto anterior)"""
+        appid = str(appid)
+        now = time.time()
+        registros = []
+        for path in paths:
+            nome = os.path.basename(path)
+            if not nome.lower().endswith(('.lua', '.manifest')) or not os.path.isfile(path):
+                continue
+            try:
+                blob = self._store_blob(path)
+                if blob:
+                    registros.append((nome, blob["sha256"], blob["size"]))
+            except Exception as e:
+                logger.debug(f"⚠️ Não foi possível armazenar {nome}: {e}")
+
+        if not registros:
+            return 0
+
+        with self._lock:
+            with self.db.transaction() as conn:
+                conn.execute("DELETE FROM app_files WHERE appid = ?", (appid,))
+                for nome, sha256, size in registros:
+                    conn.execute(
+                        "INSERT INTO blobs (sha256, size, created_at, last_used) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(sha256) DO UPDATE SET last_used = excluded.last_used",
+                        (sha256, size, now, now)
+                    )
+                    conn.execute(
+                        "INSERT OR REPLACE INTO app_files (appid, filename, sha256, stored_at) VALUES (?, ?, ?, ?)",
+                        (appid, nome, sha256, now)
+                    )
+            self._evict_locked()
+
+        logger.info(f"🗃️ {len(registros)} artefatos de {appid} armazenados")
+        return len(registros)
+
+    # -------------------- LEITURA --------------------
+    def get_files(self, appid: str, max_age: float = ARTIFACT_REUSE_TTL) -> List[Dict[str, Any]]:
+        """
+        Arquivos armazenados de um appid ([] se ausente, expirado ou incompleto).
+        Cada item: filename, sha256, size, path
+        """
+        appid = str(appid)
+        rows = self.db.execute(
+            "SELECT f.filename, f.sha256, f.stored_at, b.size FROM app_files f "
+            "LEFT JOIN blobs b ON b.sha256 = f.sha256 WHERE f.appid = ?", (appid,)
+        ).fetchall()
+
+        if not rows or any(size is None for _, _, _, size in rows) \
+                or min(stored_at for _, _, stored_at, _ in rows) < time.time() - max_age:
+            self._count(hit=False)
+            return []
+
+        arquivos = []
+        for filename, sha256, _, size in rows:
+            path = self.blob_path(sha256)
+            if not path.exists() or path.stat().st_size != size:
+                # Blob removido/alterado fora do store: índice do appid não é mais confiável
+                logger.warning(f"⚠️ Artefato {sha256[:12]} ausente ou alterado, descartando índice de {appid}")
+                self.invalidate(appid)
+                self._count(hit=False)
+                return []
+            arquivos.append({"filename": filename, "sha256": sha256, "size": size, "path": str(path)})
+
+        self.db.execute(
+            f"UPDATE blobs SET last_used = ? WHERE sha256 IN ({','.join('?' * len(arquivos))})",
+            [time.time()] + [a["sha256"] for a in arquivos]
+        )
+        self._count(hit=True)
+        return arquivos
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    # -------------------- MANUTENÇÃO --------------------
+    def invalidate(self, appid: Optional[str] = None):
+        """Remove o índice de um appid (ou de todos); blobs órfãos saem no próximo despejo"""
+        with self._lock:
+            if appid is None:
+                self.db.execute("DELETE FROM app_files")
+            else:
+                self.db.execute("DELETE FROM app_files WHERE appid = ?", (str(appid),))
+
+    def _evict_locked(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        removidos = 0
+        for sha256, size in self.db.execute("SELECT sha256, size FROM blobs ORDER BY last_used").fetchall():
+            if total <= self.max_bytes:
+                break
+            with self.db.transaction() as conn:
+                # Appids que usavam o blob ficam incompletos: remove o índice inteiro deles
+                conn.execute(
+                    "DELETE FROM app_files WHERE appid IN (SELECT appid FROM app_files WHERE sha256 = ?)",
+                    (sha256,)
+                )
+                conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            try:
+                self.blob_path(sha256).unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            removidos += 1
+
+        logger.info(f"🧹 Store de artefatos: {removidos} blobs despejados (LRU)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        blobs, total = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs").fetchone()
+        appids, referencias = self.db.execute(
+            "SELECT COUNT(DISTINCT appid), COUNT(*) FROM app_files").fetchone()
+        stats = {
+            "blobs": blobs,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "appids": appids,
+            "file_references": referencias,
+            "deduplicated_files": max(0, referencias - blobs)
+        }
+        with self._lock:
+            stats.update(hits=self.hits, misses=self.misses)
+        return stats
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_ARTIFACT_STORE: Optional[ArtifactStore] = None
+_ARTIFACT_STORE_LOCK = threading.Lock()
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Retorna o store SINGLETON de artefatos"""
+    global _ARTIFACT_STORE
+    if _ARTIFACT_STORE is None:
+        with _ARTIFACT_STORE_LOCK:
+            if _ARTIFACT_STORE is None:
+                _ARTIFACT_STORE = ArtifactStore()
+    return _ARTIFACT_STORE
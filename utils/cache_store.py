@@ -0,0 +1,446 @@
+# utils/cache_store.py - CACHE PERSISTENTE UNIFICADO (SQLite/WAL)
+# Backend único para todos os caches do programa: buscas, downloads,
+# verificações de APIs, nomes de jogos e DLCs.
+
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURAÇÕES --------------------
+CACHE_DIR = Path(__file__).parent.parent / "cache"
+CACHE_DB_FILE = CACHE_DIR / "cache_store.db"
+
+SQLITE_TIMEOUT = 30
+# Entradas expiradas continuam disponíveis como fallback por este período
+EXPIRED_RETENTION = 7 * 86400
+
+# Camada LRU em memória na frente do SQLite
+MEMORY_CACHE_MAX_ENTRIES = 4096
+MEMORY_CACHE_DEFAULT_TTL = 300
+# TTL da camada em memória por namespace (segundos)
+MEMORY_CACHE_TTLS: Dict[str, float] = {
+    "download": 86400,
+    "api_check": 1800,
+    "search": 3600,
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace  TEXT NOT NULL,
+    key        TEXT NOT NULL,
+    value      TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries (namespace, expires_at);
+"""
+
+
+class SQLiteDatabase:
+    """
+    Conexões SQLite por thread com WAL habilitado.
+    Leitores não bloqueiam escritores e cada escrita é uma transação atômica.
+    """
+
+    def __init__(self, db_path: Path, schema: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._schema = schema
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), timeout=SQLITE_TIMEOUT, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={SQLITE_TIMEOUT * 1000}")
+        return conn
+
+    def _init_schema(self):
+        conn = self.connection()
+        conn.executescript(self._schema)
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql: str, params: Iterable = ()) -> sqlite3.Cursor:
+        return self.connection().execute(sql, tuple(params))
+
+    def transaction(self) -> "_Transaction":
+        return _Transaction(self.connection())
+
+
+class _Transaction:
+    """Context manager de transação explícita (BEGIN IMMEDIATE / COMMIT / ROLLBACK)"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.conn.execute("COMMIT")
+        else:
+            self.conn.execute("ROLLBACK")
+        return False
+
+
+class LRUCache:
+    """
+    ⚡ CACHE LRU EM MEMÓRIA COM TTL POR NAMESPACE
+    Guarda entradas (inclusive ausências) para que leituras repetidas da
+    mesma chave não toquem o disco. O valor fica serializado em JSON e é
+    decodificado a cada leitura: quem altera o objeto recebido não corrompe
+    o que os próximos leitores vão ver.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_entries: int = MEMORY_CACHE_MAX_ENTRIES,
+                 namespace_ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = MEMORY_CACHE_DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.namespace_ttls = dict(namespace_ttls or {})
+        self.default_ttl = default_ttl
+        self._data: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def ttl_for(self, namespace: str) -> float:
+        return self.namespace_ttls.get(namespace, self.default_ttl)
+
+    def get(self, namespace: str, key: str) -> Any:
+        """Retorna a entrada, None para ausência conhecida ou LRUCache._MISSING"""
+        k = (namespace, key)
+        with self._lock:
+            item = self._data.get(k)
+            if item is None:
+                self.misses += 1
+                return self._MISSING
+            valid_until, entry = item
+            if valid_until <= time.time():
+                del self._data[k]
+                self.misses += 1
+                return self._MISSING
+            self._data.move_to_end(k)
+            self.hits += 1
+            return entry
+
+    def put(self, namespace: str, key: str, entry: Optional[Dict[str, Any]]):
+        valid_until = time.time() + self.ttl_for(namespace)
+        if entry is not None and entry.get("expires_at") is not None:
+            valid_until = min(valid_until, entry["expires_at"])
+        k = (namespace, key)
+        with self._lock:
+            self._data[k] = (valid_until, entry)
+            self._data.move_to_end(k)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, namespace: Optional[str] = None, key: Optional[str] = None):
+        with self._lock:
+            if namespace is None:
+                self._data.clear()
+            elif key is not None:
+                self._data.pop((namespace, key), None)
+            else:
+                for k in [k for k in self._data if k[0] == namespace]:
+                    del self._data[k]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "namespace_ttls": dict(self.namespace_ttls)
+            }
+
+
+class CacheStore:
+    """
+    🗄️ CACHE CHAVE/VALOR PERSISTENTE COM TTL
+    Cada cache usa um namespace próprio; leituras são buscas pontuais por chave
+    e escritas atualizam apenas a entrada alterada.
+    """
+
+    def __init__(self, db_path: Optional[Path] = None, memory: Optional[LRUCache] = None):
+        self.db = SQLiteDatabase(db_path or CACHE_DB_FILE, _SCHEMA)
+        self.memory = memory or LRUCache(namespace_ttls=MEMORY_CACHE_TTLS)
+        self._purge_old_entries()
+
+    # -------------------- LEITURA --------------------
+    def get_entry(self, namespace: str, key: str) -> Optional[Dict[str, Any]]:
+        """Retorna a entrada completa (valor, idade, expiração) mesmo se expirada"""
+        key = str(key)
+        cached = self.memory.get(namespace, key)
+        if cached is not LRUCache._MISSING:
+            return self._with_age(cached)
+
+        try:
+            row = self.db.execute(
+                "SELECT value, created_at, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+        except Exception as e:
+            logger.debug(f"Erro lendo cache {namespace}/{key}: {e}")
+            return None
+
+        entry = None
+        if row:
+            value, created_at, expires_at = row
+            entry = {"raw": value, "created_at": created_at, "expires_at": expires_at}
+
+        # Entradas expiradas ficam só no disco (fallback); ausências também são lembradas
+        if entry is None or entry["expires_at"] is None or entry["expires_at"] > time.time():
+            self.memory.put(namespace, key, entry)
+        return self._with_age(entry)
+
+    @staticmethod
+    def _with_age(entry: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if entry is None:
+            return None
+        try:
+            value = json.loads(entry["raw"])
+        except Exception:
+            return None
+        now = time.time()
+        expires_at = entry["expires_at"]
+        return {
+            "value": value,
+            "created_at": entry["created_at"],
+            "expires_at": expires_at,
+            "age": now - entry["created_at"],
+            "expired": expires_at is not None and expires_at <= now
+        }
+
+    def get(self, namespace: str, key: str, default: Any = None, allow_expired: bool = False) -> Any:
+        entry = self.get_entry(namespace, key)
+        if entry is None or (entry["expired"] and not allow_expired):
+            return default
+        return entry["value"]
+
+    def get_many(self, namespace: str, keys: Iterable[str], allow_expired: bool = False) -> Dict[str, Any]:
+        keys = [str(k) for k in keys]
+        result: Dict[str, Any] = {}
+        if not keys:
+            return result
+
+        now = time.time()
+        try:
+            # Limite de variáveis do SQLite: consulta em blocos
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.db.execute(
+                    f"SELECT key, value, expires_at FROM cache_entries "
+                    f"WHERE namespace = ? AND key IN ({placeholders})",
+                    [namespace] + chunk
+                ).fetchall()
+                for key, value, expires_at in rows:
+                    if not allow_expired and expires_at is not None and expires_at <= now:
+                        continue
+                    try:
+                        result[key] = json.loads(value)
+                    except Exception:
+                        continue
+        except Exception as e:
+            logger.debug(f"Erro lendo cache em lote {namespace}: {e}")
+        return result
+
+    def items(self, namespace: str, allow_expired: bool = False) -> Dict[str, Any]:
+        """Todas as entradas de um namespace"""
+        now = time.time()
+        result: Dict[str, Any] = {}
+        try:
+            rows = self.db.execute(
+                "SELECT key, value, expires_at FROM cache_entries WHERE namespace = ?",
+                (namespace,)
+            ).fetchall()
+            for key, value, expires_at in rows:
+                if not allow_expired and expires_at is not None and expires_at <= now:
+                    continue
+                try:
+                    result[key] = json.loads(value)
+                except Exception:
+                    continue
+        except Exception as e:
+            logger.debug(f"Erro listando cache {namespace}: {e}")
+        return result
+
+    def count(self, namespace: Optional[str] = None) -> int:
+        try:
+            if namespace is None:
+                row = self.db.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+            else:
+                row = self.db.execute("SELECT COUNT(*) FROM cache_entries WHERE namespace = ?",
+                                      (namespace,)).fetchone()
+            return int(row[0]) if row else 0
+        except Exception:
+            return 0
+
+    # -------------------- ESCRITA --------------------
+    def set(self, namespace: str, key: str, value: Any, ttl: Optional[float] = None,
+            created_at: Optional[float] = None) -> bool:
+        return self.set_many(namespace, {str(key): value}, ttl=ttl, created_at=created_at)
+
+    def set_many(self, namespace: str, entries: Dict[str, Any], ttl: Optional[float] = None,
+                 created_at: Optional[float] = None) -> bool:
+        """Grava várias entradas em uma única transação"""
+        if not entries:
+            return True
+        created = created_at if created_at is not None else time.time()
+        expires = created + ttl if ttl is not None else None
+        try:
+            rows = [(namespace, str(k), json.dumps(v, ensure_ascii=False), created, expires)
+                    for k, v in entries.items()]
+            with self.db.transaction() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+            for _, k, raw, _, _ in rows:
+                self.memory.put(namespace, k, {"raw": raw, "created_at": created, "expires_at": expires})
+            return True
+        except Exception as e:
+            logger.debug(f"Erro gravando cache {namespace}: {e}")
+            self.memory.invalidate(namespace)
+            return False
+
+    def delete(self, namespace: str, key: str) -> bool:
+        self.memory.invalidate(namespace, str(key))
+        try:
+            self.db.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+                            (namespace, str(key)))
+            return True
+        except Exception as e:
+            logger.debug(f"Erro removendo cache {namespace}/{key}: {e}")
+            return False
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """Limpa um namespace (ou todo o cache se namespace=None)"""
+        self.memory.invalidate(namespace)
+        try:
+            if namespace is None:
+                cur = self.db.execute("DELETE FROM cache_entries")
+            else:
+                cur = self.db.execute("DELETE FROM cache_entries WHERE namespace = ?", (namespace,))
+            return cur.rowcount
+        except Exception as e:
+            logger.debug(f"Erro limpando cache {namespace}: {e}")
+            return 0
+
+    def _purge_old_entries(self):
+        """Remove entradas expiradas há mais tempo que EXPIRED_RETENTION"""
+        try:
+            cur = self.db.execute(
+                "DELETE FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at < ?",
+                (time.time() - EXPIRED_RETENTION,)
+            )
+            if cur.rowcount:
+                logger.info(f"🧹 {cur.rowcount} entradas antigas removidas do cache")
+        except Exception as e:
+            logger.debug(f"Erro limpando entradas antigas: {e}")
+
+    # -------------------- MIGRAÇÃO DOS CACHES JSON --------------------
+    def import_legacy_json(self, namespace: str, json_path: Path, ttl: Optional[float] = None,
+                           convert: Optional[Callable[[str, Any], Optional[Tuple[Any, float]]]] = None) -> int:
+        """
+        Importa um cache JSON antigo (arquivo inteiro) para o namespace.
+        `convert(key, data)` retorna (valor, timestamp) ou None para ignorar a entrada.
+        O arquivo é renomeado para .migrated para não ser importado novamente.
+        """
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache legado ilegível {json_path.name}: {e}")
+            legacy = {}
+
+        imported = 0
+        now = time.time()
+        grouped: Dict[float, Dict[str, Any]] = {}
+        if isinstance(legacy, dict):
+            for key, data in legacy.items():
+                try:
+                    converted = convert(key, data) if convert else (data, now)
+                except Exception:
+                    converted = None
+                if converted is None:
+                    continue
+                value, timestamp = converted
+                grouped.setdefault(timestamp or now, {})[str(key)] = value
+
+        for timestamp, entries in grouped.items():
+            if self.set_many(namespace, entries, ttl=ttl, created_at=timestamp):
+                imported += len(entries)
+
+        try:
+            json_path.replace(json_path.with_suffix(json_path.suffix + ".migrated"))
+        except Exception as e:
+            logger.debug(f"Erro renomeando cache legado {json_path}: {e}")
+
+        if imported:
+            logger.info(f"📦 {imported} entradas migradas de {json_path.name} para '{namespace}'")
+        return imported
+
+    # -------------------- STATUS --------------------
+    def get_stats(self) -> Dict[str, Any]:
+        namespaces: Dict[str, int] = {}
+        try:
+            for ns, total in self.db.execute(
+                    "SELECT namespace, COUNT(*) FROM cache_entries GROUP BY namespace").fetchall():
+                namespaces[ns] = total
+        except Exception as e:
+            logger.debug(f"Erro obtendo estatísticas do cache: {e}")
+        return {
+            "backend": "sqlite_wal",
+            "db_path": str(self.db.db_path),
+            "namespaces": namespaces,
+            "total_entries": sum(namespaces.values()),
+            "memory": self.memory.get_stats()
+        }
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_CACHE_STORE_INSTANCE: Optional[CacheStore] = None
+_CACHE_STORE_LOCK = threading.Lock()
+
+
+def get_cache_store() -> CacheStore:
+    """Retorna a instância SINGLETON do cache persistente"""
+    global _CACHE_STORE_INSTANCE
+    if _CACHE_STORE_INSTANCE is None:
+        with _CACHE_STORE_LOCK:
+            if _CACHE_STORE_INSTANCE is None:
+                _CACHE_STORE_INSTANCE = CacheStore()
+                logger.info(f"🗄️ Cache persistente inicializado: {CACHE_DB_FILE}")
+    return _CACHE_STORE_INSTANCE
@@ -9,12 +9,17 @@ import json
 import time
 import logging
 import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Set
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+
+from utils.cache_store import get_cache_store
+from utils.appinfo_index import get_appinfo_index
+from utils.app_metadata import get_app_metadata
+from utils.steamtools_lua import apply_steamtools_edits, get_steamtools_lua_cache
+from utils.fs_watcher import KIND_STPLUG, get_fs_watcher
 
 logger = logging.getLogger("DLCManager")
 logger.setLevel(logging.INFO)
@@ -23,26 +28,18 @@ if not logger.handlers:
     h.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
     logger.addHandler(h)
 
-# ============================================================
-# HTTP SESSION ROBUSTA
-# ============================================================
+# Namespace do cache persistente (SQLite compartilhado)
+DLC_LIST_CACHE_NAMESPACE = "dlc_lists"
+DLC_DETAILS_CACHE_NAMESPACE = "dlc_details"
+# Última lista de ids de DLC vista por jogo (base do refresh incremental)
+DLC_IDS_CACHE_NAMESPACE = "dlc_ids"
 
-session = requests.Session()
-adapter = HTTPAdapter(
-    pool_connections=16,
-    pool_maxsize=32,
-    max_retries=Retry(
-        total=3,
-        backoff_factor=0.5,
-        status_forcelist=[429, 500, 502, 503, 504],
-    )
-)
-session.mount("http://", adapter)
-session.mount("https://", adapter)
-session.headers.update({
-    "User-Agent": "SteamGameLoader/10.1 (DLC-System)",
-    "Accept": "application/json",
-})
+# Detalhes de DLC mudam pouco: cache por DLC com TTL longo
+DLC_DETAILS_TTL = 7 * 86400
+# Buscas simultâneas de detalhes (o ritmo na Steam Store é limitado pela camada HTTP)
+DLC_DETAILS_WORKERS = 8
+# No refresh incremental, detalhes mais antigos que isso são revalidados em segundo plano
+DLC_DETAILS_REVALIDATE_AFTER = 86400
 
 # ============================================================
 # DLC MANAGER DEFINITIVO - VERSÃO 10.1 CORRIGIDA
@@ -58,12 +55,35 @@ class DLCManager:
         
         # Cache de jogos detectados via FixManager
         self.games_cache: Dict[str, Any] = {}    # {ts, games_by_appid}
+        # Incrementada a cada invalidação: montagem que começou antes dela não grava o cache
+        self._games_generation = 0
         
         self.ttl_dlcs = 3600      # 1h
         self.ttl_games = 600       # 10min
         
+        # Cache persistente: listas de DLC sobrevivem a reinicializações
+        self.store = get_cache_store()
+        
+        # Pool limitado para buscar detalhes de várias DLCs em paralelo
+        self.details_executor = ThreadPoolExecutor(max_workers=DLC_DETAILS_WORKERS,
+                                                   thread_name_prefix="dlc_details")
+        self._revalidating: Set[str] = set()
+        
+        # Mudanças no stplug-in invalidam o cache de jogos (contagem de DLCs)
+        get_fs_watcher().subscribe(self._on_fs_change, kinds=(KIND_STPLUG,))
+        
         logger.info("✅ DLCManager v10.1 CORRIGIDO inicializado.")
 
+    def _on_fs_change(self, kind: str, path: str, names: Set[str]):
+        """Evento do fs_watcher: só o Steamtools.lua afeta as DLCs instaladas."""
+        if names and "Steamtools.lua" not in names:
+            return
+        get_steamtools_lua_cache().invalidate(Path(path) / "Steamtools.lua")
+        with self._lock:
+            self.games_cache.pop("games", None)
+            self._games_generation += 1
+        logger.debug("👁️ Steamtools.lua alterado: cache de jogos invalidado")
+
     # ============================================================
     # STEAM PATH
     # ============================================================
@@ -115,13 +135,14 @@ class DLCManager:
         with self._lock:
             c = self.games_cache.get("games")
             if c and not force_refresh:
-                if now - c["ts"] < self.ttl_games:
+                if self._games_cache_fresh(c, now):
                     return {
                         "success": True,
                         "games": list(c["data"].values()),
                         "games_by_appid": c["data"],
                         "from_cache": True,
                     }
+            geracao = self._games_generation
 
         try:
             from utils.fix_manager import get_fix_manager
@@ -148,10 +169,13 @@ class DLCManager:
                 }
 
             with self._lock:
-                self.games_cache["games"] = {
-                    "ts": now,
-                    "data": final_map
-                }
+                # Steamtools.lua mudou durante a montagem: o resultado pode já estar velho
+                if geracao == self._games_generation:
+                    self.games_cache["games"] = {
+                        "ts": now,
+                        "fm_cache_time": fm.cache_time,
+                        "data": final_map
+                    }
 
             return {
                 "success": True,
@@ -169,6 +193,22 @@ class DLCManager:
                 "games_by_appid": {}
             }
 
+    def _games_cache_fresh(self, c: Dict[str, Any], now: float) -> bool:
+        """
+        Com o stplug-in observado o cache não expira por tempo: vale enquanto o
+        cache do FixManager do qual foi derivado continuar o mesmo.
+        Sem observador, vale o TTL.
+        """
+        root = self.get_steam_path()
+        if not root or not get_fs_watcher().is_watching_path(Path(root) / "config" / "stplug-in"):
+            return now - c["ts"] < self.ttl_games
+        try:
+            from utils.fix_manager import get_fix_manager
+            fm = get_fix_manager()
+            return fm._cache_valid() and c.get("fm_cache_time") == fm.cache_time
+        except Exception:
+            return False
+
     # ============================================================
     # LISTAR DLCs - VERSÃO DEFINITIVA CORRIGIDA
     # ============================================================
@@ -177,8 +217,12 @@ class DLCManager:
         """API simples para o frontend."""
         return self.get_game_dlcs(appid, force_refresh=False)
 
-    def get_game_dlcs(self, appid: str, force_refresh: bool = False) -> List[Dict[str, Any]]:
-        """Obtém TODAS as DLCs de um jogo - VERSÃO CORRIGIDA COM CONTAGEM PRECISA."""
+    def get_game_dlcs(self, appid: str, force_refresh: bool = False, incremental: bool = True) -> List[Dict[str, Any]]:
+        """
+        Obtém TODAS as DLCs de um jogo - VERSÃO CORRIGIDA COM CONTAGEM PRECISA.
+        force_refresh relê a lista de ids do jogo e, por padrão, é incremental:
+        só ids novos são buscados; incremental=False rebusca todos os detalhes.
+        """
         now = time.time()
         cache_key = f"dlc_{appid}"
 
@@ -193,95 +237,137 @@ class DLCManager:
                     logger.debug(f"📦 Cache válido para {appid}: {len(dlcs)} DLCs")
                     return dlcs
 
+        # CACHE PERSISTENTE (sobrevive a reinicializações)
+        if not force_refresh:
+            stored = self.store.get_entry(DLC_LIST_CACHE_NAMESPACE, str(appid))
+            if stored and not stored["expired"]:
+                dlcs = stored["value"]
+                with self._lock:
+                    self.dlc_cache[cache_key] = {
+                        "ts": stored["created_at"],
+                        "dlcs": dlcs,
+                        "count": len(dlcs)
+                    }
+                logger.debug(f"🗄️ Cache persistente para {appid}: {len(dlcs)} DLCs")
+                return dlcs
+
         logger.info(f"🔄 Buscando DLCs para appid {appid}")
-        dlcs = self._fetch_all_steam_dlcs(appid)
+        dlcs = self._fetch_all_steam_dlcs(appid, incremental=incremental)
+        if dlcs is None:
+            # Falha na busca: nada é gravado; serve a última lista conhecida (mesmo expirada)
+            anterior = self.store.get(DLC_LIST_CACHE_NAMESPACE, str(appid), allow_expired=True)
+            logger.warning(f"⚠️ Busca de DLCs para {appid} falhou; "
+                           f"{'usando lista anterior' if anterior is not None else 'sem lista anterior'}")
+            return anterior if anterior is not None else []
+        self._store_dlc_list(appid, dlcs, now)
 
+        logger.info(f"✅ Retornando {len(dlcs)} DLCs válidas para appid {appid}")
+        return dlcs
+
+    def _store_dlc_list(self, appid: str, dlcs: List[Dict[str, Any]], ts: Optional[float] = None):
+        ts = ts or time.time()
         with self._lock:
-            self.dlc_cache[cache_key] = {
-                "ts": now,
+            self.dlc_cache[f"dlc_{appid}"] = {
+                "ts": ts,
                 "dlcs": dlcs,
                 "count": len(dlcs)
             }
+        self.store.set(DLC_LIST_CACHE_NAMESPACE, str(appid), dlcs, ttl=self.ttl_dlcs, created_at=ts)
+
+    def _fetch_dlc_ids(self, appid: str, appinfo) -> Optional[List[str]]:
+        """Lista atual de ids de DLC do jogo (appinfo.vdf local ou Steam Store), sem
+        duplicatas; None se a Steam Store não respondeu."""
+        # Lista de DLCs do appinfo.vdf local: evita a chamada à Steam Store
+        # (lista vazia pode ser entrada incompleta, então a API ainda é consultada)
+        dlc_ids = appinfo.get_dlcs(appid)
+        
+        if dlc_ids:
+            logger.info(f"🗂️ {appid}: lista de DLCs obtida do appinfo.vdf local")
+        else:
+            logger.info(f"🌐 Buscando DLCs para {appid}")
+            # Erros de rede propagam: a lista anterior ("dlc_ids") não é sobrescrita
+            dlc_ids = get_app_metadata().get_dlc_ids(appid, raise_errors=True)
+            if dlc_ids is None:
+                logger.warning(f"API Steam falhou para {appid}")
+                return None
+        
+        # REMOVER DUPLICATAS E VALIDAR IDs
+        unique_dlc_ids = []
+        seen_ids: Set[str] = set()
+        
+        for dlc_id in dlc_ids:
+            dlc_str = str(dlc_id).strip()
+            if dlc_str.isdigit() and dlc_str not in seen_ids:
+                unique_dlc_ids.append(dlc_str)
+                seen_ids.add(dlc_str)
+        
+        return unique_dlc_ids
 
-        logger.info(f"✅ Retornando {len(dlcs)} DLCs válidas para appid {appid}")
-        return dlcs
+    def _build_dlc_list(self, dlc_ids: List[str], details: Dict[str, Dict[str, Any]], appinfo) -> List[Dict[str, Any]]:
+        processed_dlcs: List[Dict[str, Any]] = []
+        
+        for dlc_id in dlc_ids:
+            try:
+                dlc_info = details.get(dlc_id) or self._local_dlc_details(dlc_id, appinfo)
+                # VALIDAÇÃO CRÍTICA: Verificar se é realmente uma DLC
+                if dlc_info and dlc_info.get("id") and self._is_valid_dlc(dlc_info):
+                    processed_dlcs.append(dlc_info)
+            except Exception as e:
+                logger.debug(f"⚠️ DLC {dlc_id} ignorada: {str(e)[:60]}")
+                continue
+        
+        return processed_dlcs
 
-    def _fetch_all_steam_dlcs(self, appid: str) -> List[Dict[str, Any]]:
+    def _fetch_all_steam_dlcs(self, appid: str, incremental: bool = True) -> Optional[List[Dict[str, Any]]]:
         """
         Busca TODAS as DLCs da Steam API - VERSÃO CORRIGIDA.
-        Retorna APENAS DLCs válidas e únicas.
+        Retorna APENAS DLCs válidas e únicas, ou None se a busca falhou
+        (para que uma falha transitória não seja gravada como "sem DLCs").
+        No modo incremental a lista atual é comparada com a anterior ("dlc_ids"):
+        só as adicionadas vão à rede e as mantidas são revalidadas em segundo plano.
         """
-        url = f"https://store.steampowered.com/api/appdetails?appids={appid}"
-        
         try:
-            logger.info(f"🌐 Buscando DLCs para {appid}")
-            r = session.get(url, timeout=20)
-            r.raise_for_status()
-            
-            data = r.json().get(str(appid), {})
-            if not data.get("success"):
-                logger.warning(f"API Steam falhou para {appid}")
-                return []
-            
-            dlc_ids = data.get("data", {}).get("dlc", []) or []
+            appinfo = get_appinfo_index(self.get_steam_path())
+            unique_dlc_ids = self._fetch_dlc_ids(appid, appinfo)
+            if unique_dlc_ids is None:
+                # Lista anterior ("dlc_ids") preservada para o próximo refresh incremental
+                return None
+            previous_ids = self.store.get(DLC_IDS_CACHE_NAMESPACE, str(appid))
+            self.store.set(DLC_IDS_CACHE_NAMESPACE, str(appid), unique_dlc_ids)
             
-            if not dlc_ids:
+            if not unique_dlc_ids:
                 logger.info(f"ℹ️ {appid} não tem DLCs na Steam")
                 return []
             
-            # REMOVER DUPLICATAS E VALIDAR IDs
-            unique_dlc_ids = []
-            seen_ids: Set[str] = set()
-            
-            for dlc_id in dlc_ids:
-                dlc_str = str(dlc_id).strip()
-                if dlc_str.isdigit() and dlc_str not in seen_ids:
-                    unique_dlc_ids.append(dlc_str)
-                    seen_ids.add(dlc_str)
-            
             logger.info(f"🎯 {appid}: {len(unique_dlc_ids)} DLCs únicas identificadas")
             
-            # BUSCAR DETALHES DE CADA DLC - SEM LIMITES
-            processed_dlcs: List[Dict[str, Any]] = []
-            valid_ids: Set[str] = set()
+            kept_ids: List[str] = []
+            if previous_ids is not None:
+                previous = set(previous_ids)
+                kept_ids = [d for d in unique_dlc_ids if d in previous]
+                added = len(unique_dlc_ids) - len(kept_ids)
+                removed = len(previous - set(unique_dlc_ids))
+                logger.info(f"🔀 {appid}: +{added} / -{removed} DLCs desde a última atualização")
             
-            for idx, dlc_id in enumerate(unique_dlc_ids, 1):
-                try:
-                    # EVITAR PROCESSAMENTO DUPLICADO
-                    if dlc_id in valid_ids:
-                        continue
-                    
-                    dlc_info = self._fetch_dlc_details(dlc_id)
-                    if dlc_info and dlc_info.get("id"):
-                        # VALIDAÇÃO CRÍTICA: Verificar se é realmente uma DLC
-                        if self._is_valid_dlc(dlc_info):
-                            processed_dlcs.append(dlc_info)
-                            valid_ids.add(dlc_id)
-                        
-                    # LOG DE PROGRESSO
-                    if len(unique_dlc_ids) > 20 and idx % 20 == 0:
-                        logger.debug(f"📊 {appid}: {idx}/{len(unique_dlc_ids)} DLCs processadas")
-                        
-                    # DELAY MÍNIMO PARA NÃO SOBRECARREGAR
-                    if idx % 5 == 0:
-                        time.sleep(0.01)
-                        
-                except Exception as e:
-                    logger.debug(f"⚠️ DLC {dlc_id} ignorada: {str(e)[:60]}")
-                    continue
+            # BUSCAR DETALHES (cache por DLC + pool paralelo para as nunca vistas)
+            details = self._get_dlc_details_many(unique_dlc_ids, refetch=not incremental)
+            processed_dlcs = self._build_dlc_list(unique_dlc_ids, details, appinfo)
+            
+            if incremental and kept_ids:
+                self._schedule_revalidation(appid, kept_ids)
             
             logger.info(f"✅ {appid}: {len(processed_dlcs)} DLCs válidas encontradas")
             return processed_dlcs
             
         except requests.exceptions.Timeout:
             logger.error(f"⏰ Timeout ao buscar DLCs para {appid}")
-            return []
+            return None
         except requests.exceptions.RequestException as e:
             logger.error(f"🌐 Erro de rede ao buscar DLCs para {appid}: {e}")
-            return []
+            return None
         except Exception as e:
             logger.error(f"💥 Erro inesperado ao buscar DLCs para {appid}: {e}")
-            return []
+            return None
 
     def _is_valid_dlc(self, dlc_info: Dict[str, Any]) -> bool:
         """Valida se a DLC é real e não um artefato da API."""
@@ -301,43 +387,100 @@ class DLCManager:
         
         return True
 
-    def _fetch_dlc_details(self, dlc_id: str) -> Optional[Dict[str, Any]]:
-        """Busca detalhes completos de uma DLC específica."""
-        url = f"https://store.steampowered.com/api/appdetails?appids={dlc_id}"
+    def _get_dlc_details_many(self, dlc_ids: List[str], refetch: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Detalhes de várias DLCs: cache persistente primeiro, rede só para as ausentes."""
+        details = {} if refetch else self.store.get_many(DLC_DETAILS_CACHE_NAMESPACE, dlc_ids)
+        missing = [dlc_id for dlc_id in dlc_ids if dlc_id not in details]
+        
+        if not missing:
+            logger.info(f"🗄️ {len(details)} detalhes de DLC servidos do cache")
+            return details
+        
+        logger.info(f"🌐 Buscando detalhes de {len(missing)} DLCs ({len(details)} em cache)")
+        fetched: Dict[str, Dict[str, Any]] = {}
+        # refetch ignora também o payload compartilhado de appdetails
+        max_age = 0 if refetch else None
+        results = self.details_executor.map(lambda d: self._fetch_dlc_details(d, max_age=max_age), missing)
+        for dlc_id, dlc_info in zip(missing, results):
+            if dlc_info:
+                fetched[dlc_id] = dlc_info
         
+        # Falhas não são gravadas: a DLC volta a ser consultada na próxima vez
+        self.store.set_many(DLC_DETAILS_CACHE_NAMESPACE, fetched, ttl=DLC_DETAILS_TTL)
+        details.update(fetched)
+        return details
+
+    def _schedule_revalidation(self, appid: str, dlc_ids: List[str]):
+        with self._lock:
+            if appid in self._revalidating:
+                return
+            self._revalidating.add(appid)
+        threading.Thread(target=self._revalidate_dlc_details, args=(appid, dlc_ids),
+                         daemon=True, name=f"dlc_revalidate_{appid}").start()
+
+    def _revalidate_dlc_details(self, appid: str, dlc_ids: List[str]):
+        """Rebusca em segundo plano detalhes antigos e atualiza a lista do jogo se algo mudou."""
         try:
-            r = session.get(url, timeout=10)
-            r.raise_for_status()
-            
-            data = r.json().get(dlc_id, {})
-            if not data.get("success"):
-                return None
-            
-            dlc_data = data.get("data", {})
-            
-            # Extrair informações detalhadas
-            price_info = dlc_data.get("price_overview", {})
-            release_info = dlc_data.get("release_date", {})
+            stale = []
+            for dlc_id in dlc_ids:
+                entry = self.store.get_entry(DLC_DETAILS_CACHE_NAMESPACE, dlc_id)
+                if entry is None or entry["age"] > DLC_DETAILS_REVALIDATE_AFTER:
+                    stale.append(dlc_id)
+            if not stale:
+                return
             
-            return {
-                "id": dlc_id,
-                "appid": dlc_id,
-                "name": dlc_data.get("name", f"DLC {dlc_id}"),
-                "description": dlc_data.get("short_description", ""),
-                "type": dlc_data.get("type", "dlc"),
-                "price": price_info.get("final_formatted", "N/A"),
-                "original_price": price_info.get("initial_formatted", "N/A"),
-                "discount_percent": price_info.get("discount_percent", 0),
-                "is_free": dlc_data.get("is_free", False),
-                "release_date": release_info.get("date", ""),
-                "coming_soon": release_info.get("coming_soon", False),
-                "header_image": dlc_data.get("header_image", ""),
-                "capsule_image": dlc_data.get("capsule_image", ""),
-            }
+            logger.info(f"♻️ {appid}: revalidando {len(stale)} DLCs em segundo plano")
+            changed: Dict[str, Dict[str, Any]] = {}
+            refreshed: Dict[str, Dict[str, Any]] = {}
+            results = self.details_executor.map(
+                lambda d: self._fetch_dlc_details(d, max_age=DLC_DETAILS_REVALIDATE_AFTER), stale)
+            for dlc_id, dlc_info in zip(stale, results):
+                if not dlc_info:
+                    continue
+                refreshed[dlc_id] = dlc_info
+                if self.store.get(DLC_DETAILS_CACHE_NAMESPACE, dlc_id, allow_expired=True) != dlc_info:
+                    changed[dlc_id] = dlc_info
+            self.store.set_many(DLC_DETAILS_CACHE_NAMESPACE, refreshed, ttl=DLC_DETAILS_TTL)
             
-        except requests.exceptions.Timeout:
-            logger.debug(f"Timeout ao buscar detalhes da DLC {dlc_id}")
+            if changed:
+                current_ids = self.store.get(DLC_IDS_CACHE_NAMESPACE, str(appid)) or dlc_ids
+                appinfo = get_appinfo_index(self.get_steam_path())
+                details = self.store.get_many(DLC_DETAILS_CACHE_NAMESPACE, current_ids)
+                self._store_dlc_list(appid, self._build_dlc_list(current_ids, details, appinfo))
+                logger.info(f"♻️ {appid}: {len(changed)} DLCs atualizadas após revalidação")
+        except Exception as e:
+            logger.debug(f"Revalidação de DLCs de {appid} falhou: {e}")
+        finally:
+            with self._lock:
+                self._revalidating.discard(appid)
+
+    def _local_dlc_details(self, dlc_id: str, appinfo) -> Optional[Dict[str, Any]]:
+        """Detalhes mínimos da DLC a partir do appinfo.vdf (quando a Steam Store falha)."""
+        entry = appinfo.get(dlc_id)
+        if not entry or not entry.get("name"):
             return None
+        
+        return {
+            "id": dlc_id,
+            "appid": dlc_id,
+            "name": entry["name"],
+            "description": "",
+            "type": (entry.get("type") or "dlc").lower(),
+            "price": "N/A",
+            "original_price": "N/A",
+            "discount_percent": 0,
+            "is_free": False,
+            "release_date": "",
+            "coming_soon": False,
+            "header_image": f"https://cdn.cloudflare.steamstatic.com/steam/apps/{dlc_id}/header.jpg",
+            "capsule_image": "",
+            "source": "appinfo"
+        }
+
+    def _fetch_dlc_details(self, dlc_id: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Detalhes de uma DLC a partir do serviço compartilhado de metadados (appdetails)."""
+        try:
+            return get_app_metadata().get_dlc_summary(dlc_id, max_age=max_age)
         except Exception as e:
             logger.debug(f"Erro ao buscar DLC {dlc_id}: {str(e)[:50]}")
             return None
@@ -358,28 +501,15 @@ class DLCManager:
         fpath = stplug / "Steamtools.lua"
 
         try:
-            lines = fpath.read_text(encoding="utf-8").splitlines() if fpath.exists() else []
-        except Exception as e:
-            logger.error(f"Erro ao ler Steamtools.lua: {e}")
-            return {"success": False, "error": f"Erro ao ler arquivo: {e}"}
-
-        # Verificar DLCs já instaladas
-        installed = set(self.get_installed_dlcs(appid))
-        to_add = [dlc_id for dlc_id in dlc_ids if dlc_id not in installed]
-
-        if not to_add:
-            return {"success": True, "message": "Todas as DLCs já estão instaladas.", "installed": 0}
-
-        # Adicionar novas DLCs
-        for dlc_id in to_add:
-            lines.append(f"addappid({dlc_id}, 1)")
-
-        try:
-            fpath.write_text("\n".join(lines) + "\n", encoding="utf-8")
+            diff = apply_steamtools_edits(fpath, add=dlc_ids)
         except Exception as e:
             logger.error(f"Erro ao escrever Steamtools.lua: {e}")
             return {"success": False, "error": f"Erro ao salvar arquivo: {e}"}
 
+        to_add = diff["added"]
+        if not to_add:
+            return {"success": True, "message": "Todas as DLCs já estão instaladas.", "installed": 0, "diff": diff}
+
         # Limpar cache
         with self._lock:
             self.dlc_cache.pop(f"dlc_{appid}", None)
@@ -391,6 +521,7 @@ class DLCManager:
             "success": True,
             "installed": len(to_add),
             "dlcs_added": to_add,
+            "diff": diff,
             "message": f"{len(to_add)} DLC(s) instalada(s) com sucesso."
         }
 
@@ -404,36 +535,10 @@ class DLCManager:
         if not stplug:
             return []
         
-        fpath = stplug / "Steamtools.lua"
-        if not fpath.exists():
-            return []
-        
-        try:
-            content = fpath.read_text(encoding="utf-8", errors="ignore")
-            installed: List[str] = []
-            seen_ids: Set[str] = set()
-            
-            for line in content.splitlines():
-                line_clean = line.strip().replace(" ", "")
-                if line_clean.startswith("addappid("):
-                    try:
-                        # Extrair: addappid(123456,1)
-                        parts = line_clean[9:-1].split(",")  # Remove "addappid(" e ")"
-                        if parts and parts[0].isdigit():
-                            dlc_id = parts[0]
-                            # EVITAR DUPLICATAS
-                            if dlc_id not in seen_ids:
-                                installed.append(dlc_id)
-                                seen_ids.add(dlc_id)
-                    except Exception:
-                        continue
-            
-            logger.debug(f"📁 {appid}: {len(installed)} DLCs instaladas únicas")
-            return installed
-            
-        except Exception as e:
-            logger.error(f"Erro ao ler DLCs instaladas para {appid}: {e}")
-            return []
+        # Índice em memória: o arquivo só é relido quando mtime/tamanho mudam
+        installed = list(get_steamtools_lua_cache().get(stplug / "Steamtools.lua").appids)
+        logger.debug(f"📁 {appid}: {len(installed)} DLCs instaladas únicas")
+        return installed
 
     # ============================================================
     # REMOVER DLCs
@@ -449,39 +554,17 @@ class DLCManager:
         if not fpath.exists():
             return {"success": True, "message": "Nenhuma DLC instalada.", "removed": 0}
 
-        try:
-            lines = fpath.read_text(encoding="utf-8").splitlines()
-        except Exception as e:
-            return {"success": False, "error": f"Erro ao ler arquivo: {e}"}
-
         # Se não especificar DLCs, remove todas do appid
         if not dlc_ids:
-            installed = self.get_installed_dlcs(appid)
-            if not installed:
+            dlc_ids = get_steamtools_lua_cache().get(fpath).appids
+            if not dlc_ids:
                 return {"success": True, "message": "Nenhuma DLC instalada.", "removed": 0}
-            dlc_ids = installed
-
-        new_lines = []
-        removed_count = 0
-        
-        for line in lines:
-            line_stripped = line.strip()
-            should_keep = True
-            
-            # Verifica se é uma linha de DLC a ser removida
-            for dlc_id in dlc_ids:
-                if f"addappid({dlc_id}," in line_stripped.replace(" ", ""):
-                    should_keep = False
-                    removed_count += 1
-                    break
-            
-            if should_keep:
-                new_lines.append(line)
 
         try:
-            fpath.write_text("\n".join(new_lines), encoding="utf-8")
+            diff = apply_steamtools_edits(fpath, remove=dlc_ids)
         except Exception as e:
             return {"success": False, "error": f"Erro ao salvar arquivo: {e}"}
+        removed_count = diff["lines_removed"]
 
         # Limpar cache
         with self._lock:
@@ -493,9 +576,78 @@ class DLCManager:
         return {
             "success": True,
             "removed": removed_count,
+            "dlcs_removed": diff["removed"],
+            "diff": diff,
             "message": f"{removed_count} DLC(s) removida(s)."
         }
 
+    # ============================================================
+    # OPERAÇÕES EM LOTE
+    # ============================================================
+
+    def bulk_apply(self, install: Optional[Dict[str, List[str]]] = None,
+                   uninstall: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
+        """
+        Instala/remove DLCs de vários jogos em uma única transação no
+        Steamtools.lua ({appid: [dlc_ids]}) e invalida o cache uma só vez.
+        """
+        install = {str(k): [str(d) for d in (v or [])] for k, v in (install or {}).items()}
+        uninstall = {str(k): [str(d) for d in (v or [])] for k, v in (uninstall or {}).items()}
+
+        games: Dict[str, Dict[str, Any]] = {}
+        for appid in dict.fromkeys(list(install) + list(uninstall)):
+            if not install.get(appid) and not uninstall.get(appid):
+                games[appid] = {"success": False, "error": "Nenhuma DLC especificada."}
+        to_add = [d for appid, ids in install.items() if appid not in games for d in ids]
+        to_remove = [d for appid, ids in uninstall.items() if appid not in games for d in ids]
+
+        if not to_add and not to_remove:
+            return {"success": False, "error": "Nenhuma DLC especificada.", "games": games}
+
+        stplug = self._get_stplug()
+        if not stplug:
+            return {"success": False, "error": "stplug-in não encontrado."}
+
+        try:
+            diff = apply_steamtools_edits(stplug / "Steamtools.lua", add=to_add, remove=to_remove)
+        except Exception as e:
+            logger.error(f"Erro ao aplicar lote no Steamtools.lua: {e}")
+            return {"success": False, "error": f"Erro ao salvar arquivo: {e}"}
+
+        added, removed = set(diff["added"]), set(diff["removed"])
+        already, not_found = set(diff["already_present"]), set(diff["not_found"])
+        for appid in dict.fromkeys(list(install) + list(uninstall)):
+            if appid in games:
+                continue
+            inst, rem = install.get(appid, []), uninstall.get(appid, [])
+            games[appid] = {
+                "success": True,
+                "installed": len([d for d in inst if d in added]),
+                "dlcs_added": [d for d in inst if d in added],
+                "already_installed": [d for d in inst if d in already],
+                "removed": len([d for d in rem if d in removed]),
+                "dlcs_removed": [d for d in rem if d in removed],
+                "not_found": [d for d in rem if d in not_found]
+            }
+
+        # Uma única invalidação para todo o lote
+        with self._lock:
+            for appid in games:
+                self.dlc_cache.pop(f"dlc_{appid}", None)
+            self.games_cache.pop("games", None)
+
+        logger.info(f"📦 Lote de DLCs: {len(games)} jogos, +{len(added)} / -{len(removed)} "
+                    f"em {diff['elapsed_ms']}ms")
+
+        return {
+            "success": True,
+            "games": games,
+            "total_installed": len(added),
+            "total_removed": diff["lines_removed"],
+            "diff": diff,
+            "message": f"{len(added)} DLC(s) instalada(s), {diff['lines_removed']} removida(s)."
+        }
+
     # ============================================================
     # STATUS - VERSÃO CORRIGIDA
     # ============================================================
@@ -521,6 +673,9 @@ class DLCManager:
             "total_games": total_games,
             "games_with_dlc": games_with_dlc,
             "dlc_cache_size": len(self.dlc_cache),
+            "dlc_cache_persisted": self.store.count(DLC_LIST_CACHE_NAMESPACE),
+            "dlc_details_persisted": self.store.count(DLC_DETAILS_CACHE_NAMESPACE),
+            "steamtools_lua": get_steamtools_lua_cache().get_stats(),
             "total_dlcs_cached": total_dlcs_cached,
             "from_cache": games_info.get("from_cache", False),
             "version": "DLCManager v10.1 CORRIGIDO",
@@ -536,6 +691,10 @@ class DLCManager:
         with self._lock:
             self.dlc_cache.clear()
             self.games_cache.clear()
+        self.store.clear(DLC_LIST_CACHE_NAMESPACE)
+        self.store.clear(DLC_DETAILS_CACHE_NAMESPACE)
+        self.store.clear(DLC_IDS_CACHE_NAMESPACE)
+        get_app_metadata().invalidate()
         
         logger.info("🧹 Cache do DLC Manager limpo completamente")
         return {
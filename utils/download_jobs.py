@@ -0,0 +1,279 @@
+# utils/download_jobs.py - FILA ASSÍNCRONA DE DOWNLOADS
+# A rota apenas enfileira o download e devolve um job_id; um pool limitado de
+# workers executa os jobs e o progresso (fase, bytes, fonte) é consultado por
+# polling, no mesmo modelo do FIX_DOWNLOAD_STATE do fix_manager.
+
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURAÇÕES --------------------
+MAX_DOWNLOAD_WORKERS = 3
+JOB_RETENTION = 3600          # jobs finalizados ficam consultáveis por 1h
+MAX_BATCH_SIZE = 100
+BATCH_PROBE_WAIT = 30         # tempo máximo que um job do lote espera a verificação conjunta
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_COMPLETED = "completed"
+STATUS_FAILED = "failed"
+FINAL_STATUSES = (STATUS_COMPLETED, STATUS_FAILED)
+
+
+class DownloadJobQueue:
+    """
+    📬 FILA DE JOBS DE DOWNLOAD
+    - submit(appid) enfileira e retorna imediatamente
+    - appids idênticos enviados juntos compartilham o mesmo job
+    - get_status(job_id) retorna fase, bytes e fonte em tempo real
+    """
+
+    def __init__(self, run_download: Callable[..., Dict[str, Any]],
+                 create_context: Optional[Callable[[str], Any]] = None,
+                 max_workers: int = MAX_DOWNLOAD_WORKERS):
+        self.run_download = run_download
+        self.create_context = create_context
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="download_job")
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._active_by_appid: Dict[str, str] = {}
+        self._callbacks: Dict[str, List[Callable[[Dict[str, Any]], Any]]] = {}
+        self._batches: Dict[str, Dict[str, Any]] = {}
+
+    # -------------------- ESTADO THREAD-SAFE --------------------
+    def _set_job_state(self, job_id: str, update: Dict[str, Any]) -> None:
+        with self._lock:
+            state = self._jobs.get(job_id, {})
+            state.update(update)
+            state["updated_at"] = time.time()
+            self._jobs[job_id] = state
+
+    def _get_job_state(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._jobs.get(job_id, {}))
+
+    def _purge_finished(self) -> None:
+        limite = time.time() - JOB_RETENTION
+        with self._lock:
+            for job_id in [j for j, st in self._jobs.items()
+                           if st.get("status") in FINAL_STATUSES and st.get("updated_at", 0) < limite]:
+                del self._jobs[job_id]
+            for batch_id in [b for b, batch in self._batches.items()
+                             if batch["created_at"] < limite and not any(j in self._jobs for j in batch["jobs"].values())]:
+                del self._batches[batch_id]
+
+    # -------------------- API PÚBLICA --------------------
+    def submit(self, appid: str, on_complete: Optional[Callable[[Dict[str, Any]], Any]] = None,
+               context: Any = None, wait_for: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """Enfileira o download de um appid (ou reaproveita o job ativo do mesmo appid)"""
+        appid = str(appid)
+        self._purge_finished()
+
+        with self._lock:
+            job_id = self._active_by_appid.get(appid)
+            if job_id:
+                # O job ativo já tem seu finalizador; registrar outro faria
+                # a finalização (arquivos, log) rodar uma vez por duplicata
+                state = dict(self._jobs.get(job_id, {}))
+                logger.info(f"🔁 AppID {appid} já está na fila (job {job_id})")
+                return {"success": True, "job_id": job_id, "deduplicated": True, "state": state}
+
+            job_id = uuid.uuid4().hex[:12]
+            now = time.time()
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "appid": appid,
+                "status": STATUS_QUEUED,
+                "phase": "na_fila",
+                "bytes_read": 0,
+                "total_bytes": 0,
+                "source": None,
+                "created_at": now,
+                "updated_at": now,
+                "result": None
+            }
+            self._active_by_appid[appid] = job_id
+            self._callbacks[job_id] = [on_complete] if on_complete else []
+            state = dict(self._jobs[job_id])
+
+        if context is None and callable(self.create_context):
+            context = self.create_context(appid)
+
+        self.executor.submit(self._worker, job_id, appid, context, wait_for)
+        logger.info(f"📥 Download de {appid} enfileirado (job {job_id})")
+        return {"success": True, "job_id": job_id, "deduplicated": False, "state": state, "context": context}
+
+    def submit_batch(self, appids: List[str], on_complete: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                     probe_batch: Optional[Callable[[List[Any]], Any]] = None) -> Dict[str, Any]:
+        """
+        Enfileira um lote de appids. A verificação de disponibilidade de todos
+        os novos jobs é feita em UMA passada (probe_batch) e os workers do
+        lote aguardam esse resultado antes de começar a baixar.
+        """
+        appids = list(dict.fromkeys(str(a) for a in appids))[:MAX_BATCH_SIZE]
+        batch_id = uuid.uuid4().hex[:12]
+        probe_done = threading.Event()
+        jobs: Dict[str, str] = {}
+        contexts: List[Any] = []
+
+        for appid in appids:
+            submitted = self.submit(appid, on_complete=on_complete, wait_for=probe_done)
+            jobs[appid] = submitted["job_id"]
+            if not submitted["deduplicated"] and submitted.get("context") is not None:
+                contexts.append(submitted["context"])
+
+        with self._lock:
+            self._batches[batch_id] = {"batch_id": batch_id, "jobs": jobs, "created_at": time.time()}
+
+        if callable(probe_batch) and contexts:
+            threading.Thread(target=self._run_batch_probe, args=(batch_id, probe_batch, contexts, probe_done),
+                             daemon=True).start()
+        else:
+            probe_done.set()
+
+        logger.info(f"📦 Lote {batch_id} enfileirado: {len(jobs)} appids ({len(contexts)} novos)")
+        return {"success": True, "batch_id": batch_id, "jobs": jobs}
+
+    def _run_batch_probe(self, batch_id: str, probe_batch: Callable[[List[Any]], Any],
+                         contexts: List[Any], probe_done: threading.Event) -> None:
+        try:
+            probe_batch(contexts)
+        except Exception as e:
+            logger.error(f"❌ Verificação do lote {batch_id} falhou: {e}")
+        finally:
+            probe_done.set()
+
+    def get_batch_status(self, batch_id: str) -> Dict[str, Any]:
+        """Progresso agregado e resultado por appid de um lote"""
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return {"success": False, "error": f"Lote {batch_id} não encontrado"}
+            jobs = {appid: dict(self._jobs.get(job_id, {"job_id": job_id, "status": "expired"}))
+                    for appid, job_id in batch["jobs"].items()}
+
+        por_status: Dict[str, int] = {}
+        bytes_read = total_bytes = 0
+        for job in jobs.values():
+            por_status[job.get("status")] = por_status.get(job.get("status"), 0) + 1
+            bytes_read += job.get("bytes_read", 0)
+            total_bytes += job.get("total_bytes", 0)
+        finalizados = sum(por_status.get(st, 0) for st in FINAL_STATUSES)
+
+        return {
+            "success": True,
+            "batch_id": batch_id,
+            "total": len(jobs),
+            "finished": finalizados,
+            "done": finalizados == len(jobs),
+            "progress": round(finalizados / len(jobs), 3) if jobs else 1.0,
+            "jobs_by_status": por_status,
+            "bytes_read": bytes_read,
+            "total_bytes": total_bytes,
+            "created_at": batch["created_at"],
+            "jobs": jobs
+        }
+
+    def get_status(self, job_id: str) -> Dict[str, Any]:
+        state = self._get_job_state(job_id)
+        if not state:
+            return {"success": False, "error": f"Job {job_id} não encontrado"}
+        return {"success": True, "job": state}
+
+    def get_active_job(self, appid: str) -> Optional[str]:
+        with self._lock:
+            return self._active_by_appid.get(str(appid))
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return sorted((dict(st) for st in self._jobs.values()), key=lambda st: st.get("created_at", 0))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            por_status: Dict[str, int] = {}
+            for st in self._jobs.values():
+                por_status[st.get("status")] = por_status.get(st.get("status"), 0) + 1
+            return {
+                "max_workers": self.max_workers,
+                "active_appids": len(self._active_by_appid),
+                "batches": len(self._batches),
+                "jobs_by_status": por_status
+            }
+
+    # -------------------- WORKER --------------------
+    def _worker(self, job_id: str, appid: str, context: Any, wait_for: Optional[threading.Event] = None) -> None:
+        if wait_for is not None and not wait_for.is_set():
+            self._set_job_state(job_id, {"phase": "verificando_lote"})
+            wait_for.wait(BATCH_PROBE_WAIT)
+
+        self._set_job_state(job_id, {"status": STATUS_RUNNING, "phase": "iniciando", "started_at": time.time()})
+
+        if context is not None and hasattr(context, "on_update"):
+            context.on_update = lambda ctx: self._set_job_state(job_id, {
+                "phase": ctx.phase,
+                "bytes_read": ctx.bytes_read,
+                "total_bytes": ctx.total_bytes,
+                "source": ctx.source
+            })
+
+        try:
+            if context is not None:
+                result = self.run_download(appid, context=context)
+            else:
+                result = self.run_download(appid)
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} ({appid}) falhou: {e}")
+            result = {"success": False, "appid": appid, "error": f"Erro no job de download: {e}"}
+
+        result = result or {"success": False, "appid": appid, "error": "Resultado vazio"}
+
+        with self._lock:
+            callbacks = self._callbacks.pop(job_id, [])
+
+        # Callbacks podem transformar o resultado (ex.: resposta final da rota)
+        final = result
+        for callback in callbacks:
+            try:
+                transformed = callback(result)
+                if isinstance(transformed, dict):
+                    final = transformed
+            except Exception as e:
+                logger.error(f"❌ Callback do job {job_id} falhou: {e}")
+
+        self._set_job_state(job_id, {
+            "status": STATUS_COMPLETED if result.get("success") else STATUS_FAILED,
+            "phase": "concluido" if result.get("success") else "falhou",
+            "source": result.get("source"),
+            "finished_at": time.time(),
+            "result": final
+        })
+        with self._lock:
+            if self._active_by_appid.get(appid) == job_id:
+                del self._active_by_appid[appid]
+        logger.info(f"🏁 Job {job_id} ({appid}) finalizado: {'✅' if result.get('success') else '❌'}")
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_DOWNLOAD_JOB_QUEUE: Optional[DownloadJobQueue] = None
+_DOWNLOAD_JOB_QUEUE_LOCK = threading.Lock()
+
+
+def get_download_job_queue(run_download: Optional[Callable[..., Dict[str, Any]]] = None,
+                           create_context: Optional[Callable[[str], Any]] = None) -> DownloadJobQueue:
+    """Retorna a fila SINGLETON de downloads (funções usadas apenas na primeira criação)"""
+    global _DOWNLOAD_JOB_QUEUE
+    if _DOWNLOAD_JOB_QUEUE is None:
+        with _DOWNLOAD_JOB_QUEUE_LOCK:
+            if _DOWNLOAD_JOB_QUEUE is None:
+                if run_download is None:
+                    from .download_manager import baixar_manifesto, criar_contexto_download
+                    run_download = baixar_manifesto
+                    create_context = create_context or criar_contexto_download
+                _DOWNLOAD_JOB_QUEUE = DownloadJobQueue(run_download, create_context)
+    return _DOWNLOAD_JOB_QUEUE
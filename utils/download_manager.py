@@ -9,9 +9,17 @@ import os
 import sys
 import json
 import zipfile
+import threading
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Optional, Tuple, Any, Iterator, Callable
 from datetime import datetime
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+
+from .cache_store import get_cache_store
+from .endpoint_health import get_endpoint_health
+from .artifact_store import get_artifact_store
+from .http_client import get_http_session, get_http_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -89,29 +97,58 @@ DOWNLOAD_TIMEOUT = 25
 GIT_TIMEOUT = 45
 API_TIMEOUT = 12
 MAX_RETRIES = 3
-REQUEST_DELAY = 0.5
 
-# -------------------- CACHE MANAGER (COPIADO DO STORE_SEARCH) --------------------
+# Verificação de disponibilidade concorrente
+PROBE_TIMEOUT = 8
+PROBE_DEADLINE = 12                # por API, contado do início real da sondagem;
+                                   # também é o limite de espera na fila do pool
+PROBE_POLL_INTERVAL = 0.25
+PROBE_MAX_WORKERS = 6
+PROGRESS_REPORT_INTERVAL = 0.25    # segundos entre atualizações de bytes no contexto
+
+# ZIPs até este tamanho ficam inteiramente em memória (acima disso, arquivo temporário)
+IN_MEMORY_ZIP_THRESHOLD = 32 * 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+ARTIFACT_SOURCE_NAME = "artifact_store"
+
+# Lotes de download
+MAX_CONNECTIONS_PER_HOST = 2
+BATCH_PROBE_WORKERS = 4
+
+# -------------------- CACHE MANAGER (BACKEND SQLITE COMPARTILHADO) --------------------
+DOWNLOAD_CACHE_NAMESPACE = "download"
+API_CHECK_CACHE_NAMESPACE = "api_check"
+DOWNLOAD_CACHE_TTL = 86400
+API_CHECK_CACHE_TTL = 1800
+
 class CacheManager:
     def __init__(self):
         self.cache_dir = Path(__file__).parent.parent / "cache"
         self.download_cache_file = self.cache_dir / "download_cache.json"
         self.api_check_cache_file = self.cache_dir / "api_check_cache.json"
         self._ensure_cache_dir()
+        self.store = get_cache_store()
+        self._migrate_legacy_files()
 
     def _ensure_cache_dir(self):
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
+    def _migrate_legacy_files(self):
+        """Importa os caches JSON antigos para o backend SQLite (apenas uma vez)"""
+        def _convert(key, data):
+            if not isinstance(data, dict):
+                return None
+            return data, data.get('timestamp', 0)
+
+        self.store.import_legacy_json(DOWNLOAD_CACHE_NAMESPACE, self.download_cache_file,
+                                      ttl=DOWNLOAD_CACHE_TTL, convert=_convert)
+        self.store.import_legacy_json(API_CHECK_CACHE_NAMESPACE, self.api_check_cache_file,
+                                      ttl=API_CHECK_CACHE_TTL, convert=_convert)
+
     def get_cached_download(self, appid: str) -> Optional[str]:
         try:
-            if not self.download_cache_file.exists():
-                return None
-            with open(self.download_cache_file, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
-            data = cache.get(str(appid))
-            if not data:
-                return None
-            if time.time() - data.get('timestamp', 0) < 86400:
+            data = self.store.get(DOWNLOAD_CACHE_NAMESPACE, str(appid))
+            if data:
                 return data.get('source')
         except Exception as e:
             logger.debug(f"Erro ao ler cache de download: {e}")
@@ -119,28 +156,16 @@ class CacheManager:
 
     def save_download_cache(self, appid: str, source: str):
         try:
-            cache = {}
-            if self.download_cache_file.exists():
-                with open(self.download_cache_file, 'r', encoding='utf-8') as f:
-                    cache = json.load(f)
-            cache[str(appid)] = {'source': source, 'timestamp': time.time(), 'appid': str(appid)}
-            with open(self.download_cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache, f, indent=2, ensure_ascii=False)
+            self.store.set(DOWNLOAD_CACHE_NAMESPACE, str(appid),
+                           {'source': source, 'timestamp': time.time(), 'appid': str(appid)},
+                           ttl=DOWNLOAD_CACHE_TTL)
         except Exception as e:
             logger.debug(f"Erro ao salvar cache de download: {e}")
 
     def get_cached_api_check(self, appid: str) -> Optional[Dict]:
         """Cache para verificação de disponibilidade em APIs"""
         try:
-            if not self.api_check_cache_file.exists():
-                return None
-            with open(self.api_check_cache_file, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
-            data = cache.get(str(appid))
-            if not data:
-                return None
-            if time.time() - data.get('timestamp', 0) < 1800:
-                return data
+            return self.store.get(API_CHECK_CACHE_NAMESPACE, str(appid))
         except Exception as e:
             logger.debug(f"Erro ao ler cache de API check: {e}")
         return None
@@ -148,41 +173,107 @@ class CacheManager:
     def save_api_check_cache(self, appid: str, available_apis: List[str]):
         """Salva cache de APIs disponíveis para um appid"""
         try:
-            cache = {}
-            if self.api_check_cache_file.exists():
-                with open(self.api_check_cache_file, 'r', encoding='utf-8') as f:
-                    cache = json.load(f)
-            cache[str(appid)] = {
+            self.store.set(API_CHECK_CACHE_NAMESPACE, str(appid), {
                 'available_apis': available_apis,
                 'timestamp': time.time(),
                 'appid': str(appid)
-            }
-            with open(self.api_check_cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache, f, indent=2, ensure_ascii=False)
+            }, ttl=API_CHECK_CACHE_TTL)
         except Exception as e:
             logger.debug(f"Erro ao salvar cache de API check: {e}")
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do cache (camada LRU em memória + entradas persistidas)"""
+        return {
+            "memory": self.store.memory.get_stats(),
+            "download_entries": self.store.count(DOWNLOAD_CACHE_NAMESPACE),
+            "api_check_entries": self.store.count(API_CHECK_CACHE_NAMESPACE)
+        }
+
+# -------------------- CONTEXTO POR REQUISIÇÃO DE DOWNLOAD --------------------
+# Contadores globais: quantas verificações foram executadas e quantas foram
+# reaproveitadas do contexto da própria requisição
+_PROBE_STATS = {"probes_executed": 0, "probes_reused": 0}
+_PROBE_STATS_LOCK = threading.Lock()
+
+def _registrar_verificacao(reaproveitada: bool):
+    with _PROBE_STATS_LOCK:
+        _PROBE_STATS["probes_reused" if reaproveitada else "probes_executed"] += 1
+
+def get_probe_stats() -> Dict[str, int]:
+    with _PROBE_STATS_LOCK:
+        return dict(_PROBE_STATS)
+
+class DownloadContext:
+    """
+    Contexto de UMA requisição de download.
+    Carrega o resultado da verificação de disponibilidade pela rota, pelo
+    DownloadManager e pelo processamento de arquivos, garantindo que cada
+    appid seja verificado no máximo uma vez por requisição.
+    """
+
+    def __init__(self, appid: str, bypass_artifacts: bool = False):
+        self.appid = str(appid)
+        # Ignora o store local de artefatos e baixa de novo das fontes
+        self.bypass_artifacts = bypass_artifacts
+        self.available_apis: Optional[List[Dict]] = None
+        self.probe_count = 0
+        self.source: Optional[str] = None
+        self.phase = "criado"
+        self.files_processed = 0
+        self.bytes_read = 0
+        self.total_bytes = 0
+        self.created_at = time.time()
+        # Serializa a sondagem: quem chega depois (ex.: worker que desistiu de
+        # esperar o lote) aguarda a sondagem em curso e reaproveita o resultado
+        self.probe_lock = threading.Lock()
+        # Callback opcional notificado a cada atualização (ex.: fila de jobs)
+        self.on_update: Optional[Callable[["DownloadContext"], None]] = None
+
+    @property
+    def probed(self) -> bool:
+        return self.available_apis is not None
+
+    @property
+    def available_api_names(self) -> List[str]:
+        return [api["name"] for api in (self.available_apis or [])]
+
+    def update(self, **fields):
+        """Atualiza campos do contexto (fase, fonte, arquivos processados...)"""
+        for key, value in fields.items():
+            setattr(self, key, value)
+        if self.on_update is not None:
+            try:
+                self.on_update(self)
+            except Exception as e:
+                logging.getLogger(__name__).debug(f"Callback de contexto falhou: {e}")
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "appid": self.appid,
+            "phase": self.phase,
+            "source": self.source,
+            "available_apis": self.available_api_names,
+            "probe_count": self.probe_count,
+            "bypass_artifacts": self.bypass_artifacts,
+            "files_processed": self.files_processed,
+            "bytes_read": self.bytes_read,
+            "total_bytes": self.total_bytes,
+            "elapsed": round(time.time() - self.created_at, 3)
+        }
+
+def criar_contexto_download(appid: str, bypass_artifacts: bool = False) -> DownloadContext:
+    """Cria o contexto de uma nova requisição de download"""
+    return DownloadContext(appid, bypass_artifacts=bypass_artifacts)
+
 # -------------------- CLIENTE STEAM (HERDADO DO STORE_SEARCH) --------------------
 class SteamAPIClient:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (compatible; SteamGameLoader/1.0)",
-            "Accept": "application/json",
-            "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8"
-        })
-        self.last_request_time = 0
+        # Sessão compartilhada com TODO o tráfego da Steam Store; o token bucket
+        # do host é aplicado pela própria sessão, entre threads e instâncias
+        self.session = get_http_session("steam_store")
         self.cache_manager = CacheManager()
 
-    def _rate_limit(self):
-        now = time.time()
-        diff = now - self.last_request_time
-        if diff < REQUEST_DELAY:
-            time.sleep(REQUEST_DELAY - diff)
-        self.last_request_time = time.time()
-
     def make_request(self, url: str, params: Dict = None, timeout: int = API_TIMEOUT) -> Optional[Dict]:
-        self._rate_limit()
         for attempt in range(MAX_RETRIES):
             try:
                 logger.debug(f"Request {url} params={params} attempt={attempt+1}")
@@ -206,7 +297,7 @@ class SteamAPIClient:
                 code = getattr(e.response, "status_code", None)
                 logger.warning(f"HTTPError {code} {url}")
                 if code == 429:
-                    time.sleep(2 ** attempt)
+                    # O bucket já foi pausado pelo adapter; a próxima tentativa aguarda a liberação
                     continue
                 if attempt == MAX_RETRIES - 1:
                     raise
@@ -240,11 +331,17 @@ class DownloadManager:
         self.logger = logger
         self.cache_manager = CacheManager()
         self.steam_client = SteamAPIClient()
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "SteamGameLoader/2.0",
-            "Accept": "*/*"
-        })
+        self.session = get_http_session("downloads")
+        # Pool compartilhado para as verificações HEAD (limita concorrência global)
+        self.probe_executor = ThreadPoolExecutor(max_workers=PROBE_MAX_WORKERS,
+                                                 thread_name_prefix="api_probe")
+        # Saúde dos endpoints (ordenação adaptativa + circuit breaker)
+        self.endpoint_health = get_endpoint_health()
+        # Cópias locais dos .lua/.manifest já instalados (reinstalação sem rede)
+        self.artifact_store = get_artifact_store()
+        # Semáforos por host: limita downloads simultâneos no mesmo servidor
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
         
         # ✅ MARCA COMO INICIALIZADO UMA ÚNICA VEZ
         _DOWNLOAD_MANAGER_INITIALIZED = True
@@ -419,128 +516,263 @@ class DownloadManager:
             return False, "", str(e)
 
     # -------------------- VERIFICAÇÃO UNIFICADA DE APIS --------------------
-    def _verificar_disponibilidade_appid(self, appid: str) -> List[Dict]:
+    def _verificar_endpoint(self, api_config: Dict, appid: str) -> Tuple[bool, float]:
+        """
+        Verificação HEAD de uma única API
+        Retorna (tem_conteudo, latência em segundos)
+        """
+        api_name = api_config["name"]
+        download_url = api_config["url"].replace("<appid>", str(appid))
+        inicio = time.time()
+        try:
+            head_response = self.session.head(download_url, timeout=PROBE_TIMEOUT, allow_redirects=True)
+            latencia = time.time() - inicio
+            # Qualquer resposta abaixo de 500 (inclusive 404) significa endpoint saudável
+            self.endpoint_health.record(api_name, head_response.status_code < 500, latencia)
+            if head_response.status_code == api_config["success_code"]:
+                content_length = head_response.headers.get('Content-Length')
+                
+                # Verificar se é um arquivo válido (não página de erro)
+                if content_length and int(content_length) > 100:
+                    self.logger.info(f"✅ API {api_name} tem conteúdo para AppID {appid} ({latencia:.2f}s)")
+                    return True, latencia
+                self.logger.debug(f"⚠️ API {api_name} retornou conteúdo muito pequeno")
+            else:
+                self.logger.debug(f"❌ API {api_name} retornou código {head_response.status_code}")
+            return False, latencia
+        except Exception as e:
+            self.logger.debug(f"⚠️ Erro no HEAD para {api_name}: {e}")
+            latencia = time.time() - inicio
+            self.endpoint_health.record(api_name, False, latencia)
+            return False, latencia
+
+    def _iterar_disponibilidade_appid(self, appid: str, deadline: float = PROBE_DEADLINE,
+                                      status: Optional[Dict[str, Any]] = None) -> Iterator[Dict]:
+        """
+        Dispara a verificação HEAD em TODAS as APIs ao mesmo tempo
+        e entrega cada API disponível assim que ela responde (ordem de velocidade)
+        O prazo de cada API conta a partir do início real da sondagem; APIs
+        que nem começaram dentro do mesmo prazo (fila do pool compartilhado
+        cheia) também expiram. Em ambos os casos status["deadline_hit"] fica True
+        """
+        apis = []
+        for api in EXTERNAL_APIS:
+            if not api.get("enabled", True):
+                continue
+            if not self.endpoint_health.allow_request(api["name"]):
+                self.logger.info(f"🚫 API {api['name']} ignorada: circuito aberto")
+                continue
+            apis.append(api)
+        
+        inicios: Dict[str, float] = {}
+        
+        def _sondar(api_config: Dict) -> Tuple[bool, float]:
+            inicios[api_config["name"]] = time.monotonic()
+            return self._verificar_endpoint(api_config, appid)
+        
+        futures = {self.probe_executor.submit(_sondar, api_config): api_config for api_config in apis}
+        pendentes = set(futures)
+        limite_fila = time.monotonic() + deadline
+        try:
+            while pendentes:
+                concluidos, pendentes = wait(pendentes, timeout=PROBE_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in concluidos:
+                    api_config = futures[future]
+                    try:
+                        disponivel, _ = future.result()
+                    except Exception as e:
+                        self.logger.debug(f"❌ Erro verificando API {api_config['name']}: {e}")
+                        continue
+                    if disponivel:
+                        yield api_config
+                
+                agora = time.monotonic()
+                expirados = set()
+                for f in pendentes:
+                    inicio = inicios.get(futures[f]["name"])
+                    if (agora - inicio > deadline) if inicio is not None else agora > limite_fila:
+                        expirados.add(f)
+                if expirados:
+                    pendentes -= expirados
+                    if status is not None:
+                        status["deadline_hit"] = True
+                    self.logger.warning(f"⏰ Prazo de {deadline}s esgotado na verificação de {appid}; "
+                                        f"sem resposta: {[futures[f]['name'] for f in expirados]}")
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def verificar_disponibilidade_lote(self, contexts: List[DownloadContext]) -> Dict[str, List[str]]:
+        """
+        Verificação de disponibilidade de VÁRIOS appids em uma única passada
+        concorrente; o resultado fica em cada contexto para os jobs do lote
+        """
+        pendentes = [ctx for ctx in contexts if not ctx.probed]
+        if pendentes:
+            inicio = time.time()
+            with ThreadPoolExecutor(max_workers=min(BATCH_PROBE_WORKERS, len(pendentes)),
+                                    thread_name_prefix="batch_probe") as executor:
+                futures = {executor.submit(self._verificar_disponibilidade_appid, ctx.appid, ctx): ctx
+                           for ctx in pendentes}
+                for future in as_completed(futures):
+                    ctx = futures[future]
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self.logger.debug(f"Verificação em lote falhou para {ctx.appid}: {e}")
+                        with ctx.probe_lock:
+                            if not ctx.probed:
+                                ctx.available_apis = []
+            self.logger.info(f"🔍 Verificação em lote de {len(pendentes)} appids em {time.time() - inicio:.2f}s")
+        
+        return {ctx.appid: ctx.available_api_names for ctx in contexts}
+
+    def _get_host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlparse(url).netloc.lower()
+        with self._host_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST)
+                self._host_semaphores[host] = semaphore
+            return semaphore
+
+    def _verificar_disponibilidade_appid(self, appid: str, context: Optional[DownloadContext] = None) -> List[Dict]:
         """
-        Verifica em TODAS as APIs se o appid está disponível
-        Retorna lista de APIs que têm o conteúdo disponível
+        Verifica em TODAS as APIs (concorrentemente) se o appid está disponível
+        Retorna lista de APIs que têm o conteúdo disponível, da mais rápida à mais lenta
+        Com `context`, o resultado é reaproveitado pelo restante da requisição
         """
+        if context is None:
+            apis_disponiveis = self._executar_verificacao(appid)
+            _registrar_verificacao(reaproveitada=False)
+            return apis_disponiveis
+        
+        with context.probe_lock:
+            if context.probed:
+                _registrar_verificacao(reaproveitada=True)
+                return context.available_apis
+            
+            apis_disponiveis = self._executar_verificacao(appid)
+            _registrar_verificacao(reaproveitada=False)
+            context.available_apis = apis_disponiveis
+            context.probe_count += 1
+            return apis_disponiveis
+
+    def _executar_verificacao(self, appid: str) -> List[Dict]:
+        """Verificação propriamente dita (cache persistente ou sondagem HEAD)"""
         cache = self.cache_manager
         cached = cache.get_cached_api_check(appid)
         if cached:
             self.logger.info(f"✅ Usando cache de verificação para AppID {appid}")
-            return [api for api in EXTERNAL_APIS if api["name"] in cached.get('available_apis', [])]
-        
-        apis_disponiveis = []
+            apis_por_nome = {api["name"]: api for api in EXTERNAL_APIS}
+            return [apis_por_nome[nome] for nome in cached.get('available_apis', []) if nome in apis_por_nome]
         
-        for api_config in EXTERNAL_APIS:
-            if not api_config.get("enabled", True):
-                continue
-                
-            api_name = api_config["name"]
-            url_template = api_config["url"]
-            success_code = api_config["success_code"]
-            
-            try:
-                download_url = url_template.replace("<appid>", str(appid))
-                
-                # Verificação HEAD rápida
-                try:
-                    head_response = self.session.head(download_url, timeout=8, allow_redirects=True)
-                    if head_response.status_code == success_code:
-                        content_type = head_response.headers.get('Content-Type', '')
-                        content_length = head_response.headers.get('Content-Length')
-                        
-                        # Verificar se é um arquivo válido (não página de erro)
-                        if content_length and int(content_length) > 100:
-                            apis_disponiveis.append(api_config)
-                            self.logger.info(f"✅ API {api_name} tem conteúdo para AppID {appid}")
-                            continue
-                        else:
-                            self.logger.debug(f"⚠️ API {api_name} retornou conteúdo muito pequeno")
-                    else:
-                        self.logger.debug(f"❌ API {api_name} retornou código {head_response.status_code}")
-                except Exception as e:
-                    self.logger.debug(f"⚠️ Erro no HEAD para {api_name}: {e}")
-                
-            except Exception as e:
-                self.logger.debug(f"❌ Erro verificando API {api_name}: {e}")
-                continue
+        inicio = time.time()
+        status: Dict[str, Any] = {}
+        apis_disponiveis = list(self._iterar_disponibilidade_appid(appid, status=status))
+        self.logger.info(f"🔍 Verificação de {appid} concluída em {time.time() - inicio:.2f}s: "
+                         f"{[api['name'] for api in apis_disponiveis]}")
         
-        # Salvar no cache
-        if apis_disponiveis:
+        # Salvar no cache (preserva a ordem de resposta); resultado parcial por
+        # prazo esgotado não é persistido para não excluir espelhos lentos
+        if apis_disponiveis and not status.get("deadline_hit"):
             cache.save_api_check_cache(appid, [api["name"] for api in apis_disponiveis])
         
         return apis_disponiveis
 
     # -------------------- DOWNLOAD UNIFICADO DE APIS --------------------
-    def _baixar_de_apis_unificado(self, appid: str) -> Tuple[bool, Optional[str], str]:
+    def _baixar_de_apis_unificado(self, appid: str, context: Optional[DownloadContext] = None) -> Tuple[bool, Optional[Any], str]:
         """
         Função UNIFICADA para baixar de TODAS as APIs
         Tenta na ordem das APIs disponíveis
+        O ZIP é baixado para um buffer (em memória até IN_MEMORY_ZIP_THRESHOLD,
+        depois em disco) e entregue direto à extração, sem diretório temporário
         """
-        temp_dir = None
-        
         try:
             # Primeiro verifica quais APIs têm o conteúdo
-            apis_disponiveis = self._verificar_disponibilidade_appid(appid)
+            apis_disponiveis = self._verificar_disponibilidade_appid(appid, context)
             
             if not apis_disponiveis:
                 self.logger.warning(f"❌ NENHUMA API TEM CONTEÚDO ZIP para AppID {appid}")
                 return False, None, "nenhuma"
             
-            temp_dir = tempfile.mkdtemp(prefix=f"steam_unified_{appid}_")
+            # Ordem adaptativa: fontes mais saudáveis primeiro, circuitos abertos ficam de fora
+            apis_disponiveis = [
+                api for api in self.endpoint_health.order_sources(apis_disponiveis)
+                if not self.endpoint_health.is_open(api["name"])
+            ]
+            if not apis_disponiveis:
+                self.logger.warning(f"🚫 Todas as APIs disponíveis para {appid} estão com circuito aberto")
+                return False, None, "nenhuma"
             
             for api_config in apis_disponiveis:
                 api_name = api_config["name"]
                 url_template = api_config["url"]
+                inicio_download = time.time()
+                buffer = None
                 
                 try:
                     download_url = url_template.replace("<appid>", str(appid))
-                    destino = os.path.join(temp_dir, f"{appid}_{api_name.replace(' ', '_')}.zip")
                     
                     self.logger.info(f"🔄 BAIXANDO ZIP DE {api_name}: {download_url}")
                     
-                    response = self.session.get(download_url, stream=True, timeout=DOWNLOAD_TIMEOUT)
-                    response.raise_for_status()
-                    
-                    # Verificar tamanho do conteúdo
-                    content_length = response.headers.get('Content-Length')
-                    if content_length and int(content_length) < 100:
-                        self.logger.warning(f"⚠️ Conteúdo ZIP muito pequeno da API {api_name}: {content_length} bytes")
-                        continue
-                    
-                    # Fazer download
-                    with open(destino, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
+                    # Limite de conexões simultâneas por host (compartilhado entre jobs)
+                    host_slot = self._get_host_semaphore(download_url)
+                    host_slot.acquire()
+                    response = None
+                    try:
+                        response = self.session.get(download_url, stream=True, timeout=DOWNLOAD_TIMEOUT)
+                        response.raise_for_status()
+                        
+                        # Verificar tamanho do conteúdo
+                        content_length = response.headers.get('Content-Length')
+                        if content_length and int(content_length) < 100:
+                            self.logger.warning(f"⚠️ Conteúdo ZIP muito pequeno da API {api_name}: {content_length} bytes")
+                            self.endpoint_health.record(api_name, False, time.time() - inicio_download)
+                            continue
+                        
+                        # Fazer download (progresso reportado ao contexto, com throttle)
+                        total_bytes = int(content_length) if content_length and content_length.isdigit() else 0
+                        bytes_read = 0
+                        ultimo_reporte = 0.0
+                        if context is not None:
+                            context.update(source=api_name, bytes_read=0, total_bytes=total_bytes)
+                        buffer = tempfile.SpooledTemporaryFile(max_size=IN_MEMORY_ZIP_THRESHOLD,
+                                                               prefix=f"steam_unified_{appid}_")
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
                             if chunk:
-                                f.write(chunk)
+                                buffer.write(chunk)
+                                bytes_read += len(chunk)
+                                if context is not None and time.time() - ultimo_reporte >= PROGRESS_REPORT_INTERVAL:
+                                    ultimo_reporte = time.time()
+                                    context.update(bytes_read=bytes_read)
+                        if context is not None:
+                            context.update(bytes_read=bytes_read)
+                    finally:
+                        # Devolve a conexão ao pool também nos desvios (ZIP pequeno, erro no stream)
+                        if response is not None:
+                            response.close()
+                        host_slot.release()
                     
-                    # Verificar se arquivo é válido
-                    if os.path.exists(destino) and os.path.getsize(destino) > 100:
-                        self.logger.info(f"✅ DOWNLOAD ZIP BEM-SUCEDIDO de {api_name}: {os.path.getsize(destino)} bytes")
-                        
-                        # Verificar se é ZIP válido (se for arquivo zip)
-                        if destino.lower().endswith('.zip'):
-                            try:
-                                with zipfile.ZipFile(destino, 'r') as zip_test:
-                                    if zip_test.testzip() is None:
-                                        return True, destino, api_name
-                                    else:
-                                        self.logger.warning(f"⚠️ ZIP corrompido da API {api_name}")
-                                        continue
-                            except zipfile.BadZipFile:
-                                self.logger.warning(f"⚠️ Arquivo não é ZIP válido da API {api_name}")
-                                # Retorna mesmo assim, pode ser outro formato
-                                return True, destino, api_name
-                        else:
-                            return True, destino, api_name
+                    # Verificação leve (diretório central); o CRC de cada membro
+                    # é conferido durante a extração, na mesma leitura
+                    buffer.seek(0)
+                    if bytes_read > 100 and zipfile.is_zipfile(buffer):
+                        buffer.seek(0)
+                        self.logger.info(f"✅ DOWNLOAD ZIP BEM-SUCEDIDO de {api_name}: {bytes_read} bytes"
+                                         f"{' (em memória)' if bytes_read <= IN_MEMORY_ZIP_THRESHOLD else ''}")
+                        self.endpoint_health.record(api_name, True, time.time() - inicio_download)
+                        return True, buffer, api_name
                     
-                    self.logger.debug(f"❌ Arquivo ZIP inválido da API {api_name}")
-                    if os.path.exists(destino):
-                        os.remove(destino)
+                    self.logger.warning(f"⚠️ Arquivo não é ZIP válido da API {api_name}")
+                    self.endpoint_health.record(api_name, False, time.time() - inicio_download)
+                    buffer.close()
                         
                 except Exception as e:
                     self.logger.debug(f"❌ Erro baixando ZIP de {api_name}: {e}")
+                    self.endpoint_health.record(api_name, False, time.time() - inicio_download)
+                    if buffer is not None:
+                        buffer.close()
                     continue
             
             # Se chegou aqui, nenhuma API funcionou
@@ -550,12 +782,6 @@ class DownloadManager:
         except Exception as e:
             self.logger.error(f"💥 ERRO CRÍTICO NO SISTEMA UNIFICADO DE APIS: {e}")
             return False, None, "erro"
-        finally:
-            # Limpeza se falhou
-            if temp_dir and os.path.exists(temp_dir):
-                files = list(Path(temp_dir).glob("*"))
-                if not files or all(f.stat().st_size == 0 for f in files):
-                    shutil.rmtree(temp_dir, ignore_errors=True)
 
     # -------------------- MÉTODO GIT TRADICIONAL (MANTIDO PARA COMPATIBILIDADE) --------------------
     def _baixar_via_git_tradicional(self, appid: str) -> Tuple[bool, Optional[str]]:
@@ -602,27 +828,31 @@ class DownloadManager:
             return False, None
 
     # -------------------- FUNÇÃO MULTI-FONTE CORRIGIDA --------------------
-    def baixar_manifesto_multi_fonte(self, appid: str) -> Tuple[Optional[str], str, List[str]]:
+    def baixar_manifesto_multi_fonte(self, appid: str, context: Optional[DownloadContext] = None) -> Tuple[Optional[Any], str, List[str]]:
         """
         🚀 FUNÇÃO PRINCIPAL DE DOWNLOAD MULTI-FONTE
         Versão integrada e compatível com store_search.py
+        Retorna o buffer do ZIP (APIs unificadas) ou o caminho baixado (GitHub/git)
         """
+        if context is None:
+            context = DownloadContext(appid)
+        context.update(phase="baixando")
         self.logger.info(f"🔍 INICIANDO BUSCA MULTI-FONTE para AppID {appid}...")
         
         # 📦 1. TENTAR APIS UNIFICADAS (ZIPs)
         self.logger.info("🔄 TENTANDO APIS UNIFICADAS (ZIPs completos)...")
-        success, caminho, fonte_api = self._baixar_de_apis_unificado(appid)
+        success, caminho, fonte_api = self._baixar_de_apis_unificado(appid, context)
         if success and caminho:
             self.logger.info(f"✅ SUCESSO VIA API UNIFICADA: {fonte_api}")
-            apis_disponiveis = self._verificar_disponibilidade_appid(appid)
-            nomes_apis = [api["name"] for api in apis_disponiveis]
-            return caminho, fonte_api, nomes_apis
+            context.update(source=fonte_api)
+            return caminho, fonte_api, context.available_api_names
         
         # 📄 2. TENTAR DOWNLOAD INDIVIDUAL DE ARQUIVOS (MÉTODO EXCLUSIVO)
         self.logger.info("📥 TENTANDO DOWNLOAD INDIVIDUAL DE ARQUIVOS GITHUB...")
         success, caminho_individual = self._baixar_arquivos_individuais_github(appid)
         if success and caminho_individual:
             self.logger.info(f"✅ SUCESSO VIA DOWNLOAD INDIVIDUAL GITHUB: {caminho_individual}")
+            context.update(source="github_individual")
             return caminho_individual, "github_individual", ["github_individual"]
         
         # 🔧 3. TENTAR CLONE DE BRANCH ESPECÍFICA (MÉTODO EXCLUSIVO)
@@ -630,6 +860,7 @@ class DownloadManager:
         success, caminho_git_branch = self._baixar_via_git_clone_branch_especifica(appid)
         if success and caminho_git_branch:
             self.logger.info(f"✅ SUCESSO VIA CLONE DE BRANCH ESPECÍFICA: {caminho_git_branch}")
+            context.update(source="git_branch")
             return caminho_git_branch, "git_branch", ["git_branch"]
         
         # 🌀 4. TENTAR GIT TRADICIONAL (FALLBACK)
@@ -637,10 +868,11 @@ class DownloadManager:
         success, caminho_git_trad = self._baixar_via_git_tradicional(appid)
         if success and caminho_git_trad:
             self.logger.info(f"✅ SUCESSO VIA GIT TRADICIONAL: {caminho_git_trad}")
+            context.update(source="git_tradicional")
             return caminho_git_trad, "git_tradicional", ["git_tradicional"]
         
         # ❌ SE TUDO FALHOU
-        apis_disponiveis = self._verificar_disponibilidade_appid(appid)
+        apis_disponiveis = self._verificar_disponibilidade_appid(appid, context)
         nomes_apis = [api["name"] for api in apis_disponiveis]
         
         if apis_disponiveis:
@@ -651,16 +883,26 @@ class DownloadManager:
         return None, "nenhuma", nomes_apis
 
     # -------------------- FUNÇÃO PRINCIPAL DE DOWNLOAD --------------------
-    def baixar_manifesto(self, appid: str) -> Dict[str, Any]:
+    def baixar_manifesto(self, appid: str, context: Optional[DownloadContext] = None) -> Dict[str, Any]:
         """
         🚀 FUNÇÃO PRINCIPAL DE DOWNLOAD - COMPATÍVEL COM STORE_SEARCH
         Esta função substitui a função de mesmo nome no store_search.py
         """
+        if context is None:
+            context = DownloadContext(appid)
         try:
             self.logger.info(f"🎮 INICIANDO DOWNLOAD COMPLETO para AppID: {appid}")
             
+            # Reinstalação: arquivos já baixados antes saem do store local, sem rede
+            if context.bypass_artifacts:
+                self.logger.info(f"⏭️ bypass_artifacts: ignorando store de artefatos para {appid}")
+            else:
+                resultado_local = self._instalar_do_artifact_store(appid, context)
+                if resultado_local is not None:
+                    return resultado_local
+            
             # Buscar fontes
-            caminho_download, fonte, apis_disponiveis = self.baixar_manifesto_multi_fonte(appid)
+            caminho_download, fonte, apis_disponiveis = self.baixar_manifesto_multi_fonte(appid, context)
             
             if not caminho_download:
                 error_msg = "❌ FALHA NO DOWNLOAD DE TODAS AS FONTES"
@@ -672,20 +914,39 @@ class DownloadManager:
                 else:
                     mensagem_erro += ". Nenhuma API tem conteúdo para este AppID."
                 
+                context.update(phase="falhou")
                 return {
                     "success": False,
                     "appid": appid,
                     "error": mensagem_erro,
                     "source": "nenhuma",
-                    "apis_disponiveis": apis_disponiveis
+                    "apis_disponiveis": apis_disponiveis,
+                    "probe_count": context.probe_count
                 }
             
+            # ZIP das APIs unificadas: buffer extraído em passada única
+            if hasattr(caminho_download, "read"):
+                self.logger.info(f"✅ DOWNLOAD CONCLUÍDO via {fonte} (buffer)")
+                try:
+                    from .file_processing import process_downloaded_archive
+                    processing_result = process_downloaded_archive(caminho_download, appid, context=context,
+                                                                   source_name=f"{appid}_{fonte}.zip")
+                except ImportError:
+                    processing_result = {
+                        "success": False,
+                        "error": "Processamento de arquivos não disponível",
+                        "files_processed": 0
+                    }
+                finally:
+                    caminho_download.close()
+                return self._resultado_download(appid, fonte, apis_disponiveis, processing_result, context)
+            
             self.logger.info(f"✅ DOWNLOAD CONCLUÍDO via {fonte}: {caminho_download}")
             
             # Processar download (usando file_processing existente)
             try:
                 from .file_processing import process_downloaded_game_files
-                processing_result = process_downloaded_game_files(caminho_download, appid)
+                processing_result = process_downloaded_game_files(caminho_download, appid, context=context)
             except ImportError:
                 # Fallback se file_processing não estiver disponível
                 processing_result = {
@@ -706,32 +967,75 @@ class DownloadManager:
             except Exception as e:
                 self.logger.warning(f"⚠️ Erro na limpeza: {e}")
             
-            # Resultado final
-            result = {
-                "success": True,
-                "appid": appid,
-                "source": fonte,
-                "apis_disponiveis": apis_disponiveis,
-                "processing_result": processing_result,
-                "message": f"Download concluído via {fonte} - {processing_result.get('files_processed', 0)} arquivos processados"
-            }
-            
-            self.logger.info(f"🎯 PROCESSO FINALIZADO COM SUCESSO via {fonte}")
-            return result
+            return self._resultado_download(appid, fonte, apis_disponiveis, processing_result, context)
             
         except Exception as e:
             self.logger.error(f"💥 ERRO CRÍTICO em baixar_manifesto: {e}")
             import traceback
             self.logger.error(f"💥 TRACEBACK: {traceback.format_exc()}")
             
+            context.update(phase="falhou")
             return {
                 "success": False,
                 "appid": appid,
                 "error": f"Erro crítico: {e}",
                 "source": "erro",
-                "apis_disponiveis": []
+                "apis_disponiveis": [],
+                "probe_count": context.probe_count
             }
 
+    def _instalar_do_artifact_store(self, appid: str, context: DownloadContext) -> Optional[Dict[str, Any]]:
+        """Instala o appid a partir do store de artefatos (None se não houver cópia local válida)"""
+        try:
+            arquivos = self.artifact_store.get_files(appid)
+            if not arquivos:
+                return None
+            
+            from .file_processing import install_stored_artifacts
+            inicio = time.time()
+            context.update(phase="baixando", source=ARTIFACT_SOURCE_NAME)
+            processing_result = install_stored_artifacts(arquivos, appid, context=context)
+            if not processing_result.get("success"):
+                self.logger.warning(f"⚠️ Store local falhou para {appid}, baixando da rede: "
+                                    f"{processing_result.get('error')}")
+                self.artifact_store.invalidate(appid)
+                return None
+            
+            self.logger.info(f"🗃️ {appid} instalado do store local em {(time.time() - inicio) * 1000:.0f}ms")
+            return self._resultado_download(appid, ARTIFACT_SOURCE_NAME, [], processing_result, context,
+                                            armazenar=False)
+        except ImportError:
+            return None
+        except Exception as e:
+            self.logger.debug(f"Store de artefatos indisponível para {appid}: {e}")
+            return None
+
+    def _resultado_download(self, appid: str, fonte: str, apis_disponiveis: List[str],
+                            processing_result: Dict[str, Any], context: DownloadContext,
+                            armazenar: bool = True) -> Dict[str, Any]:
+        """Monta o resultado final de um download concluído"""
+        # Guardar os arquivos instalados para reinstalações futuras sem rede
+        if armazenar and processing_result.get("success"):
+            try:
+                instalados = [item.get("to") for item in processing_result.get("moved_files", [])]
+                self.artifact_store.put_files(appid, [p for p in instalados if p])
+            except Exception as e:
+                self.logger.debug(f"Não foi possível armazenar artefatos de {appid}: {e}")
+        
+        context.update(phase="concluido")
+        result = {
+            "success": True,
+            "appid": appid,
+            "source": fonte,
+            "apis_disponiveis": apis_disponiveis,
+            "probe_count": context.probe_count,
+            "processing_result": processing_result,
+            "message": f"Download concluído via {fonte} - {processing_result.get('files_processed', 0)} arquivos processados"
+        }
+        
+        self.logger.info(f"🎯 PROCESSO FINALIZADO COM SUCESSO via {fonte}")
+        return result
+
     # -------------------- UTILITÁRIOS --------------------
     def _limpar_diretorio_temp(self, caminho: str) -> bool:
         """Limpar diretório temporário"""
@@ -743,14 +1047,24 @@ class DownloadManager:
             self.logger.debug(f"Erro limpando temp {caminho}: {e}")
         return False
 
+    def _get_live_status(self) -> Dict[str, Any]:
+        """Campos de status que mudam a cada requisição (não entram no cache global)"""
+        return {
+            "cache_stats": self.cache_manager.get_stats(),
+            "endpoint_health": self.endpoint_health.snapshot(),
+            "probe_stats": get_probe_stats(),
+            "artifact_store": self.artifact_store.get_stats(),
+            "http_pools": get_http_metrics()
+        }
+
     def get_system_status(self) -> Dict[str, Any]:
         """✅ CORREÇÃO: Status do sistema de download COM CACHE"""
         global _SYSTEM_STATUS_CACHE
         
-        # ✅ SE JÁ TEM CACHE, RETORNA DIRETO
+        # ✅ SE JÁ TEM CACHE, RETORNA DIRETO (campos dinâmicos sempre atualizados)
         if _SYSTEM_STATUS_CACHE is not None:
             self.logger.debug("Retornando cache de status do sistema")
-            return _SYSTEM_STATUS_CACHE
+            return {**_SYSTEM_STATUS_CACHE, **self._get_live_status()}
             
         try:
             # Verificar status das APIs externas (APENAS UMA VEZ)
@@ -798,7 +1112,7 @@ class DownloadManager:
             # ✅ SALVAR NO CACHE GLOBAL
             _SYSTEM_STATUS_CACHE = status_result
             
-            return status_result
+            return {**status_result, **self._get_live_status()}
             
         except Exception as e:
             self.logger.debug(f"Erro get_system_status: {e}")
@@ -815,22 +1129,27 @@ def criar_gerenciador_download() -> DownloadManager:
     return _DOWNLOAD_MANAGER_INSTANCE
 
 # ✅ CORREÇÃO: Função de compatibilidade usando Singleton
-def baixar_manifesto(appid: str) -> Dict[str, Any]:
+def baixar_manifesto(appid: str, context: Optional[DownloadContext] = None) -> Dict[str, Any]:
     """
     FUNÇÃO DE COMPATIBILIDADE DIRETA COM SINGLETON
     Permite que o código existente continue funcionando sem alterações
     """
     manager = criar_gerenciador_download()  # ✅ Usa singleton agora
-    return manager.baixar_manifesto(appid)
+    return manager.baixar_manifesto(appid, context)
 
 # ✅ CORREÇÃO: Função de compatibilidade usando Singleton
-def _verificar_disponibilidade_appid(appid: str) -> List[Dict]:
+def _verificar_disponibilidade_appid(appid: str, context: Optional[DownloadContext] = None) -> List[Dict]:
     """
     FUNÇÃO DE COMPATIBILIDADE DIRETA COM SINGLETON
     Para uso do store_search.py sem quebrar
     """
     manager = criar_gerenciador_download()  # ✅ Usa singleton agora
-    return manager._verificar_disponibilidade_appid(appid)
+    return manager._verificar_disponibilidade_appid(appid, context)
+
+def verificar_disponibilidade_lote(contexts: List[DownloadContext]) -> Dict[str, List[str]]:
+    """Verificação única e concorrente de disponibilidade para um lote de downloads"""
+    manager = criar_gerenciador_download()
+    return manager.verificar_disponibilidade_lote(contexts)
 
 # ✅ CORREÇÃO: Função para resetar cache (útil para testes)
 def reset_download_cache():
@@ -0,0 +1,234 @@
+# utils/endpoint_health.py - SAÚDE DAS APIS EXTERNAS + CIRCUIT BREAKER
+# Modelo persistido por endpoint: janela móvel de resultados, latência p50/p95
+# e falhas consecutivas. Usado pelo DownloadManager para ordenar as fontes e
+# pular temporariamente as que falham sem parar.
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from .cache_store import get_cache_store
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURAÇÕES --------------------
+HEALTH_CACHE_NAMESPACE = "endpoint_health"
+HEALTH_WINDOW = 50                # últimas N requisições por endpoint
+FAILURE_THRESHOLD = 5             # falhas consecutivas para abrir o circuito
+OPEN_COOLDOWN = 120               # segundos até o primeiro teste half-open
+MAX_OPEN_COOLDOWN = 1800          # limite do backoff exponencial
+HALF_OPEN_PROBE_TIMEOUT = 60      # libera nova sonda se a anterior não reportar
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+
+def _percentil(valores: List[float], p: float) -> Optional[float]:
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    idx = min(len(ordenados) - 1, max(0, int(round(p * (len(ordenados) - 1)))))
+    return ordenados[idx]
+
+
+class EndpointHealth:
+    """Estado de saúde de um endpoint"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.samples: Deque[Tuple[bool, float]] = deque(maxlen=HEALTH_WINDOW)
+        self.consecutive_failures = 0
+        self.state = STATE_CLOSED
+        self.opened_at = 0.0
+        self.cooldown = OPEN_COOLDOWN
+        self.half_open_since = 0.0
+        self.last_success = 0.0
+        self.last_failure = 0.0
+
+    # -------------------- MÉTRICAS --------------------
+    @property
+    def success_rate(self) -> Optional[float]:
+        if not self.samples:
+            return None
+        return sum(1 for ok, _ in self.samples if ok) / len(self.samples)
+
+    def latencies(self) -> List[float]:
+        return [lat for ok, lat in self.samples if ok]
+
+    def score(self) -> float:
+        """Pontuação para ordenação: taxa de sucesso penalizada pela latência"""
+        # Sem histórico: neutro (nem prioriza nem penaliza)
+        rate = self.success_rate
+        if rate is None:
+            rate = 0.75
+        p50 = _percentil(self.latencies(), 0.5)
+        penalidade = min((p50 or 0.0) / 10.0, 1.0) * 0.25
+        return rate - penalidade
+
+    # -------------------- SERIALIZAÇÃO --------------------
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "samples": [[1 if ok else 0, round(lat, 4)] for ok, lat in self.samples],
+            "consecutive_failures": self.consecutive_failures,
+            "state": self.state,
+            "opened_at": self.opened_at,
+            "cooldown": self.cooldown,
+            "last_success": self.last_success,
+            "last_failure": self.last_failure
+        }
+
+    @classmethod
+    def from_dict(cls, name: str, data: Dict[str, Any]) -> "EndpointHealth":
+        health = cls(name)
+        for ok, lat in data.get("samples", [])[-HEALTH_WINDOW:]:
+            health.samples.append((bool(ok), float(lat)))
+        health.consecutive_failures = int(data.get("consecutive_failures", 0))
+        health.state = data.get("state", STATE_CLOSED)
+        # Um half-open interrompido volta para open (nova sonda quando o cooldown vencer)
+        if health.state == STATE_HALF_OPEN:
+            health.state = STATE_OPEN
+        health.opened_at = float(data.get("opened_at", 0.0))
+        health.cooldown = float(data.get("cooldown", OPEN_COOLDOWN))
+        health.last_success = float(data.get("last_success", 0.0))
+        health.last_failure = float(data.get("last_failure", 0.0))
+        return health
+
+    def snapshot(self) -> Dict[str, Any]:
+        lats = self.latencies()
+        rate = self.success_rate
+        reopen_in = 0.0
+        if self.state == STATE_OPEN:
+            reopen_in = max(0.0, self.opened_at + self.cooldown - time.time())
+        return {
+            "state": self.state,
+            "samples": len(self.samples),
+            "success_rate": round(rate, 3) if rate is not None else None,
+            "latency_p50": round(_percentil(lats, 0.5), 3) if lats else None,
+            "latency_p95": round(_percentil(lats, 0.95), 3) if lats else None,
+            "consecutive_failures": self.consecutive_failures,
+            "score": round(self.score(), 3),
+            "reopen_in": round(reopen_in, 1)
+        }
+
+
+class EndpointHealthTracker:
+    """
+    🩺 RASTREADOR DE SAÚDE DOS ENDPOINTS
+    closed -> (FAILURE_THRESHOLD falhas seguidas) -> open
+    open -> (cooldown) -> half_open (uma única sonda liberada)
+    half_open -> sucesso: closed | falha: open com cooldown dobrado
+    """
+
+    def __init__(self):
+        self.store = get_cache_store()
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointHealth] = {}
+        for name, data in self.store.items(HEALTH_CACHE_NAMESPACE).items():
+            try:
+                self._endpoints[name] = EndpointHealth.from_dict(name, data)
+            except Exception as e:
+                logger.debug(f"Estado de saúde inválido para {name}: {e}")
+
+    def _get(self, name: str) -> EndpointHealth:
+        health = self._endpoints.get(name)
+        if health is None:
+            health = EndpointHealth(name)
+            self._endpoints[name] = health
+        return health
+
+    def _persist(self, health: EndpointHealth):
+        self.store.set(HEALTH_CACHE_NAMESPACE, health.name, health.to_dict())
+
+    # -------------------- CIRCUIT BREAKER --------------------
+    def allow_request(self, name: str) -> bool:
+        """Informa se o endpoint pode receber uma requisição agora"""
+        with self._lock:
+            health = self._get(name)
+            now = time.time()
+            if health.state == STATE_CLOSED:
+                return True
+            if health.state == STATE_OPEN:
+                if now - health.opened_at >= health.cooldown:
+                    health.state = STATE_HALF_OPEN
+                    health.half_open_since = now
+                    logger.info(f"🔌 {name}: circuito half-open, liberando sonda de teste")
+                    return True
+                return False
+            # half-open: apenas uma sonda por vez
+            if now - health.half_open_since >= HALF_OPEN_PROBE_TIMEOUT:
+                health.half_open_since = now
+                return True
+            return False
+
+    def is_open(self, name: str) -> bool:
+        """Circuito aberto e ainda em cooldown (não altera o estado)"""
+        with self._lock:
+            health = self._get(name)
+            return health.state == STATE_OPEN and time.time() - health.opened_at < health.cooldown
+
+    def record(self, name: str, success: bool, latency: float):
+        """Registra o resultado de uma requisição ao endpoint"""
+        with self._lock:
+            health = self._get(name)
+            now = time.time()
+            health.samples.append((bool(success), float(latency)))
+
+            if success:
+                health.last_success = now
+                health.consecutive_failures = 0
+                if health.state != STATE_CLOSED:
+                    logger.info(f"✅ {name}: circuito fechado novamente")
+                health.state = STATE_CLOSED
+                health.cooldown = OPEN_COOLDOWN
+            else:
+                health.last_failure = now
+                health.consecutive_failures += 1
+                if health.state == STATE_HALF_OPEN:
+                    health.state = STATE_OPEN
+                    health.opened_at = now
+                    health.cooldown = min(health.cooldown * 2, MAX_OPEN_COOLDOWN)
+                    logger.warning(f"🚫 {name}: sonda half-open falhou, circuito aberto por {health.cooldown:.0f}s")
+                elif health.state == STATE_CLOSED and health.consecutive_failures >= FAILURE_THRESHOLD:
+                    health.state = STATE_OPEN
+                    health.opened_at = now
+                    logger.warning(f"🚫 {name}: {health.consecutive_failures} falhas seguidas, "
+                                   f"circuito aberto por {health.cooldown:.0f}s")
+            self._persist(health)
+
+    # -------------------- ORDENAÇÃO --------------------
+    def order_sources(self, apis: List[Dict]) -> List[Dict]:
+        """Reordena as fontes pela pontuação de saúde (ordem original desempata)"""
+        with self._lock:
+            scores = {api["name"]: self._get(api["name"]).score() for api in apis}
+        return sorted(apis, key=lambda api: -scores[api["name"]])
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {name: health.snapshot() for name, health in self._endpoints.items()}
+
+    def reset(self, name: Optional[str] = None):
+        with self._lock:
+            if name is None:
+                self._endpoints.clear()
+                self.store.clear(HEALTH_CACHE_NAMESPACE)
+            else:
+                self._endpoints.pop(name, None)
+                self.store.delete(HEALTH_CACHE_NAMESPACE, name)
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_HEALTH_TRACKER: Optional[EndpointHealthTracker] = None
+_HEALTH_TRACKER_LOCK = threading.Lock()
+
+
+def get_endpoint_health() -> EndpointHealthTracker:
+    """Retorna o rastreador SINGLETON de saúde dos endpoints"""
+    global _HEALTH_TRACKER
+    if _HEALTH_TRACKER is None:
+        with _HEALTH_TRACKER_LOCK:
+            if _HEALTH_TRACKER is None:
+                _HEALTH_TRACKER = EndpointHealthTracker()
+    return _HEALTH_TRACKER
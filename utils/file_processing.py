@@ -10,6 +10,7 @@ import rarfile
 import tempfile
 import re
 import json
+import hashlib
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
@@ -525,17 +526,16 @@ class SteamBackend:
             
             if ext == '.zip':
                 with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                    # ✅ VERIFICAR INTEGRIDADE PRIMEIRO
-                    bad_file = zip_ref.testzip()
-                    if bad_file is not None:
-                        error_msg = f"❌ Arquivo ZIP corrompido: {bad_file}"
+                    # ✅ EXTRAIR TODOS OS ARQUIVOS (o CRC de cada membro é
+                    # verificado na própria leitura; BadZipFile aborta a extração)
+                    try:
+                        zip_ref.extractall(extract_dir)
+                    except zipfile.BadZipFile as e:
+                        error_msg = f"❌ Arquivo ZIP corrompido: {e}"
                         self.logger.error(error_msg)
                         self._processing_results['processing_log'].append(error_msg)
                         return False, []
                     
-                    # ✅ EXTRAIR TODOS OS ARQUIVOS
-                    zip_ref.extractall(extract_dir)
-                    
                     # ✅ VERIFICAR ARQUIVOS EXTRAÍDOS
                     for file_info in zip_ref.infolist():
                         if not file_info.is_dir():
@@ -588,6 +588,209 @@ class SteamBackend:
             self._processing_results['processing_log'].append(error_msg)
             return False, []
 
+    def process_archive_stream(self, archive_file, source_name: str = "download.zip") -> Dict[str, Any]:
+        """
+        📦 EXTRAÇÃO EM PASSADA ÚNICA DE UM ZIP JÁ ABERTO (arquivo ou buffer)
+        Apenas membros .lua/.manifest são lidos; o CRC é verificado durante a
+        leitura e cada membro vai para um temporário no próprio destino. Só
+        depois que TODOS passam na verificação os destinos são substituídos
+        (os.replace), preservando o backup dos arquivos existentes.
+        """
+        try:
+            self._is_processing = True
+            self._processed_count = 0
+            self._error_count = 0
+            self._processing_results = self._initialize_results()
+
+            if not self._validate_initial_conditions():
+                error_msg = "❌ Condições iniciais não atendidas - verifique diretórios Steam"
+                self.logger.error(error_msg)
+                return self._create_error_result(error_msg)
+
+            staged: List[Tuple[str, str, str]] = []  # (membro, temporário, destino)
+            try:
+                with zipfile.ZipFile(archive_file, 'r') as zip_ref:
+                    membros = [info for info in zip_ref.infolist()
+                               if not info.is_dir()
+                               and not self._is_system_file(os.path.basename(info.filename))
+                               and os.path.basename(info.filename).lower().endswith(('.lua', '.manifest'))]
+                    ignorados = sum(1 for info in zip_ref.infolist() if not info.is_dir()) - len(membros)
+
+                    msg = f"📦 {source_name}: {len(membros)} arquivos .lua/.manifest ({ignorados} ignorados)"
+                    self.logger.info(msg)
+                    self._processing_results['processing_log'].append(msg)
+
+                    for index, info in enumerate(membros):
+                        if not self._is_processing:
+                            break
+                        filename = os.path.basename(info.filename)
+                        self._update_progress(index, len(membros), filename)
+
+                        dest_dir = self._get_destination_directory(filename)
+                        if not dest_dir:
+                            self._handle_processing_error(f"Sem destino para {filename}")
+                            continue
+
+                        temp_path = self._stage_archive_member(zip_ref, info, dest_dir)
+                        staged.append((info.filename, temp_path, os.path.join(dest_dir, filename)))
+
+                    cancelado = not self._is_processing
+
+            except Exception as e:
+                # CRC inválido, ZIP truncado ou erro de escrita: nada foi instalado
+                for _, temp_path, _ in staged:
+                    self._remove_quietly(temp_path)
+                error_msg = f"❌ Falha na extração de {source_name}: {e}"
+                self.logger.error(error_msg)
+                return self._create_error_result(error_msg)
+
+            if cancelado:
+                # Cancelado no meio da extração: descartar o que já foi preparado
+                for _, temp_path, _ in staged:
+                    self._remove_quietly(temp_path)
+                error_msg = f"❌ Extração de {source_name} cancelada - nenhum arquivo instalado"
+                self.logger.warning(error_msg)
+                return self._create_error_result(error_msg)
+
+            # ✅ TODOS OS MEMBROS VERIFICADOS: SUBSTITUIR DESTINOS
+            for member_name, temp_path, dest_path in staged:
+                file_result = self._commit_staged_file(member_name, temp_path, dest_path, source_name)
+                self._collect_results(file_result)
+                if file_result.get('success'):
+                    self._processing_results['extracted_files'].append(member_name)
+
+            return self._finalize_processing()
+
+        except Exception as e:
+            return self._handle_critical_error(e)
+
+    def install_stored_files(self, files: List[Dict[str, Any]], source_name: str = "artifact_store") -> Dict[str, Any]:
+        """
+        🗃️ INSTALAR ARQUIVOS DO STORE LOCAL DE ARTEFATOS
+        `files`: itens com filename, path e sha256. Mesmo fluxo de
+        process_archive_stream: copia verificada para temporários e só então
+        os.replace em todos os destinos.
+        """
+        try:
+            self._is_processing = True
+            self._processed_count = 0
+            self._error_count = 0
+            self._processing_results = self._initialize_results()
+
+            if not self._validate_initial_conditions():
+                error_msg = "❌ Condições iniciais não atendidas - verifique diretórios Steam"
+                self.logger.error(error_msg)
+                return self._create_error_result(error_msg)
+
+            staged: List[Tuple[str, str, str]] = []
+            try:
+                for index, item in enumerate(files):
+                    filename = item['filename']
+                    self._update_progress(index, len(files), filename)
+
+                    dest_dir = self._get_destination_directory(filename)
+                    if not dest_dir:
+                        self._handle_processing_error(f"Sem destino para {filename}")
+                        continue
+
+                    staged.append((filename, self._stage_stored_file(item, dest_dir),
+                                   os.path.join(dest_dir, filename)))
+            except Exception as e:
+                for _, temp_path, _ in staged:
+                    self._remove_quietly(temp_path)
+                error_msg = f"❌ Falha copiando artefatos ({source_name}): {e}"
+                self.logger.error(error_msg)
+                return self._create_error_result(error_msg)
+
+            for member_name, temp_path, dest_path in staged:
+                self._collect_results(self._commit_staged_file(member_name, temp_path, dest_path, source_name))
+
+            return self._finalize_processing()
+
+        except Exception as e:
+            return self._handle_critical_error(e)
+
+    def _stage_stored_file(self, item: Dict[str, Any], dest_dir: str) -> str:
+        """Copia um blob para um temporário no destino conferindo o SHA-256"""
+        fd, temp_path = tempfile.mkstemp(prefix=".steamloader_", suffix=".tmp", dir=dest_dir)
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as temp_file, open(item['path'], 'rb') as blob:
+                for chunk in iter(lambda: blob.read(64 * 1024), b""):
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            if item.get('sha256') and digest.hexdigest() != item['sha256']:
+                raise IOError(f"hash divergente em {item['filename']}")
+            return temp_path
+        except Exception:
+            self._remove_quietly(temp_path)
+            raise
+
+    def _stage_archive_member(self, zip_ref: zipfile.ZipFile, info: zipfile.ZipInfo, dest_dir: str) -> str:
+        """Lê um membro do ZIP (verificando o CRC) para um temporário no diretório de destino"""
+        fd, temp_path = tempfile.mkstemp(prefix=".steamloader_", suffix=".tmp", dir=dest_dir)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file, zip_ref.open(info, 'r') as member:
+                shutil.copyfileobj(member, temp_file, 64 * 1024)
+            if os.path.getsize(temp_path) != info.file_size:
+                raise zipfile.BadZipFile(f"tamanho inconsistente em {info.filename}")
+            return temp_path
+        except Exception:
+            self._remove_quietly(temp_path)
+            raise
+
+    def _commit_staged_file(self, member_name: str, temp_path: str, dest_path: str,
+                            source_name: str) -> Dict[str, Any]:
+        """Substitui o destino pelo temporário verificado (com backup do arquivo atual)"""
+        filename = os.path.basename(dest_path)
+        try:
+            if os.path.exists(dest_path):
+                if not self.overwrite_existing:
+                    self._remove_quietly(temp_path)
+                    return {'success': False, 'file': member_name,
+                            'error': "Arquivo já existe e overwrite desabilitado"}
+                if self.make_backup:
+                    backup_path = dest_path + '.backup'
+                    shutil.copy2(dest_path, backup_path)
+                    backup_msg = f"📦 Backup criado: {backup_path}"
+                    self.logger.info(backup_msg)
+                    self._processing_results['processing_log'].append(backup_msg)
+
+            os.replace(temp_path, dest_path)
+            final_size = os.path.getsize(dest_path)
+            dest_name = os.path.basename(os.path.dirname(dest_path))
+
+            success_msg = f"✅ {filename} → {dest_name} ({final_size} bytes)"
+            self.logger.info(success_msg)
+            self._processing_results['processing_log'].append(success_msg)
+
+            result = {
+                'success': True,
+                'file': member_name,
+                'moved': [(f"{source_name}:{member_name}", dest_path)],
+                'final_size': final_size,
+                'destination': dest_name,
+                'destination_path': dest_path
+            }
+            appid = self._extract_appid_from_filename(filename)
+            if appid:
+                result['appid'] = appid
+            return result
+
+        except Exception as e:
+            self._remove_quietly(temp_path)
+            error_msg = f"❌ Falha ao instalar {filename}: {e}"
+            self.logger.error(error_msg)
+            self._processing_results['processing_log'].append(error_msg)
+            return {'success': False, 'file': member_name, 'error': error_msg}
+
+    def _remove_quietly(self, path: str):
+        try:
+            if path and os.path.exists(path):
+                os.remove(path)
+        except OSError as e:
+            self.logger.debug(f"⚠️ Não foi possível remover {path}: {e}")
+
     def _process_single_file_direct(self, file_path: str) -> Optional[Dict[str, Any]]:
         """🎯 PROCESSAMENTO DIRETO DE ARQUIVO - CORAÇÃO DO SISTEMA CORRIGIDO DEFINITIVO"""
         try:
@@ -1249,13 +1452,80 @@ def process_zip_upload(zip_file_path: str) -> Dict[str, Any]:
     return processor.process_zip_upload(zip_file_path)
 
 # ✅ FUNÇÃO DE PROCESSAMENTO COMPATÍVEL COM STORE_SEARCH
-def process_downloaded_game_files(file_path: str, appid: str = None) -> Dict[str, Any]:
+def process_downloaded_game_files(file_path: str, appid: str = None, context: Any = None) -> Dict[str, Any]:
     """
     ✅ FUNÇÃO DE PROCESSAMENTO COMPATÍVEL COM STORE_SEARCH
     Processa arquivos baixados e os move para os diretórios Steam corretos
+    `context` (DownloadContext) recebe a fase e o total de arquivos processados
     """
     backend = SteamBackend()
+    if context is not None:
+        context.update(phase="processando")
     
+    try:
+        result = _process_downloaded_path(backend, file_path)
+        if context is not None:
+            context.update(files_processed=result.get('files_processed', 0))
+            result['download_context'] = context.to_dict()
+        return result
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Erro no processamento: {str(e)}',
+            'files_processed': 0
+        }
+
+
+def process_downloaded_archive(archive_file, appid: str = None, context: Any = None,
+                               source_name: str = "download.zip") -> Dict[str, Any]:
+    """
+    ✅ PROCESSA UM ZIP BAIXADO DIRETO DO BUFFER (sem diretório temporário)
+    Extração em passada única com verificação de CRC - ver SteamBackend.process_archive_stream
+    """
+    backend = SteamBackend()
+    if context is not None:
+        context.update(phase="processando")
+
+    try:
+        result = backend.process_archive_stream(archive_file, source_name)
+        result['files_processed'] = result.get('successful_files', 0)
+        if context is not None:
+            context.update(files_processed=result['files_processed'])
+            result['download_context'] = context.to_dict()
+        return result
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Erro no processamento: {str(e)}',
+            'files_processed': 0
+        }
+
+
+def install_stored_artifacts(files: List[Dict[str, Any]], appid: str = None, context: Any = None) -> Dict[str, Any]:
+    """
+    ✅ REINSTALA UM APPID A PARTIR DO STORE LOCAL DE ARTEFATOS (sem rede)
+    """
+    backend = SteamBackend()
+    if context is not None:
+        context.update(phase="processando")
+
+    try:
+        result = backend.install_stored_files(files)
+        result['files_processed'] = result.get('successful_files', 0)
+        if context is not None:
+            context.update(files_processed=result['files_processed'])
+            result['download_context'] = context.to_dict()
+        return result
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'Erro no processamento: {str(e)}',
+            'files_processed': 0
+        }
+
+
+def _process_downloaded_path(backend: "SteamBackend", file_path: str) -> Dict[str, Any]:
+    """Processa um arquivo ou diretório baixado com o backend informado"""
     try:
         # Se for um diretório, processar todos os arquivos
         if os.path.isdir(file_path):
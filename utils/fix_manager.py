@@ -18,13 +18,17 @@ import re
 import os
 import zipfile
 import threading
-import urllib.request
-import urllib.error
 import time
 from typing import Dict, Any, Optional, List, Set
 from pathlib import Path
 from datetime import datetime
 
+from utils.http_client import coalesced_get, get_http_session
+from utils.app_names import get_app_name_resolver
+from utils.app_metadata import get_app_metadata
+from utils.fs_watcher import KIND_STEAMAPPS, get_fs_watcher
+from utils.library_index import get_library_index
+
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.NullHandler())
 
@@ -64,30 +68,33 @@ def _get_unfix_state(appid: int) -> Dict[str, Any]:
 # ============================================================
 
 class SimpleHTTPClient:
+    """Fachada fina sobre a sessão compartilhada "fixes" (pool + keep-alive)"""
+
     def __init__(self, label: str) -> None:
         self.label = label
-        self.default_headers = {
-            "User-Agent": "SteamGameLoader/1.0",
-            "Accept": "*/*"
-        }
+        self.session = get_http_session("fixes")
+        self.default_headers = dict(self.session.headers)
 
     def head(self, url: str, timeout: int = 10) -> Dict[str, Any]:
         try:
-            req = urllib.request.Request(url, method="HEAD", headers=self.default_headers)
-            resp = urllib.request.urlopen(req, timeout=timeout)
-            status = getattr(resp, "status", 200)
-            data = {"status_code": int(status), "headers": dict(resp.getheaders())}
+            resp = self.session.head(url, timeout=timeout, allow_redirects=True)
+            data = {"status_code": int(resp.status_code), "headers": dict(resp.headers)}
             resp.close()
             return data
-        except urllib.error.HTTPError as e:
-            return {"status_code": e.code, "headers": dict(e.headers or {})}
         except Exception as e:
             return {"status_code": 0, "headers": {}, "error": str(e)}
 
+    def get_json(self, url: str, timeout: int = 10) -> Optional[Any]:
+        # Chamadas simultâneas à mesma URL compartilham uma única requisição
+        resp = coalesced_get("fixes", url, timeout=timeout)
+        resp.raise_for_status()
+        return resp.json()
+
     def download_stream(self, url: str, timeout: int = 30):
         try:
-            req = urllib.request.Request(url, headers=self.default_headers)
-            return urllib.request.urlopen(req, timeout=timeout)
+            resp = self.session.get(url, timeout=timeout, stream=True)
+            resp.raise_for_status()
+            return resp
         except Exception as e:
             logger.error("download_stream failed: %s", e)
             raise
@@ -303,63 +310,14 @@ def _parse_libraryfolders_vdf(vdf_path: str) -> List[str]:
 # ============================================================
 
 def scan_steam_games(steam_root: str) -> List[Dict[str, Any]]:
+    """
+    Jogos instalados (appmanifest_*.acf de todas as bibliotecas).
+    Servido pelo índice incremental: só manifestos alterados são relidos.
+    """
     games: List[Dict[str, Any]] = []
 
     try:
-        if not steam_root or not os.path.exists(steam_root):
-            return []
-
-        steam_root = os.path.abspath(steam_root)
-        steamapps_main = os.path.join(steam_root, "steamapps")
-        library_vdf = os.path.join(steamapps_main, "libraryfolders.vdf")
-
-        libraries = [steam_root]
-
-        if os.path.isfile(library_vdf):
-            libraries.extend(_parse_libraryfolders_vdf(library_vdf))
-
-        seen = {}
-
-        for library in libraries:
-            steamapps_dir = os.path.join(library, "steamapps")
-            if not os.path.isdir(steamapps_dir):
-                continue
-
-            for fname in os.listdir(steamapps_dir):
-                if not fname.startswith("appmanifest_") or not fname.endswith(".acf"):
-                    continue
-
-                manifest_path = os.path.join(steamapps_dir, fname)
-                try:
-                    with open(manifest_path, "r", encoding="utf-8", errors="ignore") as f:
-                        content = f.read()
-
-                    appid_m = re.search(r'"appid"\s*"(\d+)"', content)
-                    name_m = re.search(r'"name"\s*"(.+?)"', content)
-                    installdir_m = re.search(r'"installdir"\s*"(.+?)"', content)
-
-                    if not appid_m or not installdir_m:
-                        continue
-
-                    appid = int(appid_m.group(1))
-                    name = name_m.group(1) if name_m else f"App {appid}"
-                    installdir = installdir_m.group(1)
-                    install_path = os.path.join(library, "steamapps", "common", installdir)
-                    install_path = os.path.abspath(install_path)
-
-                    if appid not in seen:
-                        seen[appid] = True
-                        games.append({
-                            "appid": appid,
-                            "name": name,
-                            "installdir": installdir,
-                            "library": library,
-                            "install_path": install_path
-                        })
-
-                except Exception as e:
-                    logger.debug("Erro lendo manifesto %s: %s", manifest_path, e)
-
+        games = get_library_index().scan(steam_root)
     except Exception as e:
         logger.exception("scan_steam_games: %s", e)
 
@@ -482,22 +440,21 @@ def detect_lua_plugins(steam_root: Optional[str]) -> List[Dict[str, Any]]:
 # FETCH APP NAME
 # ============================================================
 
-def fetch_app_name(appid: int) -> Optional[str]:
-    url = f"https://store.steampowered.com/api/appdetails?appids={appid}&l=english"
-    client = ensure_http_client("AppName")
-
+def _fetch_app_name_remote(appid: str) -> Optional[str]:
     try:
-        req = urllib.request.Request(url, headers=client.default_headers)
-        with urllib.request.urlopen(req, timeout=8) as resp:
-            raw = resp.read().decode("utf-8", errors="ignore")
-            data = json.loads(raw)
-            entry = data.get(str(appid), {})
-            if entry.get("success") and entry.get("data", {}).get("name"):
-                return entry["data"]["name"]
+        return get_app_metadata().get_name(appid)
     except Exception:
-        pass
+        return None
 
-    return None
+
+def fetch_app_name(appid: int) -> Optional[str]:
+    """Nome do app: cache de nomes e appmanifest .acf primeiro, Steam Store só em falta"""
+    try:
+        resolved = get_app_name_resolver().resolve(appid, fetch_remote=_fetch_app_name_remote)
+        return resolved[0] if resolved else None
+    except Exception as e:
+        logger.debug(f"Resolução de nome falhou para {appid}: {e}")
+        return _fetch_app_name_remote(str(appid))
 
 
 # ============================================================
@@ -603,15 +560,14 @@ def _download_and_extract_fix(appid: int, download_url: str, install_path: str,
         client = ensure_http_client("FixDownload")
         resp = client.download_stream(download_url)
 
-        total = int(resp.getheader("Content-Length") or 0)
+        total = int(resp.headers.get("Content-Length") or 0)
         _set_fix_download_state(appid, {"totalBytes": total})
 
         downloaded = 0
-        with open(temp_zip, "wb") as f:
-            while True:
-                chunk = resp.read(8192)
+        with resp, open(temp_zip, "wb") as f:
+            for chunk in resp.iter_content(chunk_size=8192):
                 if not chunk:
-                    break
+                    continue
 
                 st = _get_fix_download_state(appid)
                 if st.get("status") == "cancelled":
@@ -642,6 +598,7 @@ def _download_and_extract_fix(appid: int, download_url: str, install_path: str,
             pass
 
         _set_fix_download_state(appid, {"status": "completed", "success": True, "files_extracted": len(extracted)})
+        _invalidate_installed_games_cache()
         logger.info("Fix aplicado (%s): %d arquivos", game_name, len(extracted))
 
     except Exception as e:
@@ -744,6 +701,7 @@ def _unfix_worker(appid: int, install_path: str):
             pass
 
         _set_unfix_state(appid, {"status": "completed", "success": True, "files_removed": removed})
+        _invalidate_installed_games_cache()
 
     except Exception as e:
         logger.error("unfix worker error: %s", e)
@@ -893,7 +851,13 @@ class FixManager:
         # Cache interno apenas do UNIFIED
         self.cache_data: Optional[List[Dict[str, Any]]] = None
         self.cache_time = 0
-        self.cache_ttl = 300  # 5 minutos
+        self.cache_ttl = 300  # 5 minutos (sem fs_watcher ativo)
+        # Incrementada a cada invalidação: varredura que começou antes dela não grava o cache
+        self._cache_generation = 0
+        self._cache_lock = threading.Lock()
+        
+        # appmanifest .acf criados/alterados/removidos invalidam o cache
+        get_fs_watcher().subscribe(self._on_fs_change, kinds=(KIND_STEAMAPPS,))
         
         # Inicializar gerenciador local
         self.local_fixes = get_local_fixes_manager()
@@ -902,7 +866,24 @@ class FixManager:
                    self.steam_path, len(self.local_fixes.fixes_map))
 
     def _cache_valid(self) -> bool:
-        return self.cache_data is not None and (time.time() - self.cache_time) < self.cache_ttl
+        if self.cache_data is None:
+            return False
+        # Com o steamapps de TODAS as bibliotecas observado, o cache vale até um evento invalidá-lo
+        if self.steam_path and get_fs_watcher().is_watching_path(
+                *get_library_index().steamapps_dirs(str(self.steam_path))):
+            return True
+        return (time.time() - self.cache_time) < self.cache_ttl
+
+    def _invalidate_cache(self):
+        with self._cache_lock:
+            self.cache_data = None
+            self.cache_time = 0
+            self._cache_generation += 1
+
+    def _on_fs_change(self, kind: str, path: str, names: Set[str]):
+        if not names or any(n.endswith(".acf") or n == "libraryfolders.vdf" for n in names):
+            self._invalidate_cache()
+            logger.debug("👁️ steamapps alterado (%s): cache de jogos invalidado", path)
 
     def get_installed_games(self, force_refresh: bool = False) -> Dict[str, Any]:
         if not force_refresh and self._cache_valid():
@@ -911,11 +892,15 @@ class FixManager:
         if not self.steam_path or not self.steam_path.exists():
             return {"success": False, "error": "Steam não detectado", "games": []}
 
+        geracao = self._cache_generation
         res = get_installed_games_unified(str(self.steam_path))
 
         if res.get("success"):
-            self.cache_data = res["games"]
-            self.cache_time = time.time()
+            with self._cache_lock:
+                # Invalidação durante a varredura: o resultado pode já estar velho
+                if geracao == self._cache_generation:
+                    self.cache_data = res["games"]
+                    self.cache_time = time.time()
 
         return res
 
@@ -1004,7 +989,7 @@ class FixManager:
         res = apply_game_fix(appid, url, info["install_path"], actual_fix_type, info["gameName"])
 
         if res.get("success"):
-            self.cache_data = None
+            self._invalidate_cache()
 
         return res
 
@@ -1028,7 +1013,7 @@ class FixManager:
         res = unfix_game(appid, gi["install_path"])
 
         if res.get("success"):
-            self.cache_data = None
+            self._invalidate_cache()
 
         return res
 
@@ -1070,16 +1055,15 @@ class FixManager:
             p = Path(p)
             if p.exists():
                 self.steam_path = p
-                self.cache_data = None
-                self.cache_time = 0
+                self._invalidate_cache()
                 return True
         except Exception:
             pass
         return False
 
     def clear_cache(self):
-        self.cache_data = None
-        self.cache_time = 0
+        self._invalidate_cache()
+        get_library_index().invalidate()
 
         with FIX_DOWNLOAD_LOCK:
             FIX_DOWNLOAD_STATE.clear()
@@ -1117,6 +1101,11 @@ class FixManager:
 
 _fix_manager_instance: Optional[FixManager] = None
 
+def _invalidate_installed_games_cache():
+    """Fix aplicado/removido em segundo plano: o log no jogo mudou"""
+    if _fix_manager_instance is not None:
+        _fix_manager_instance._invalidate_cache()
+
 def get_fix_manager(steam_path: Optional[str] = None) -> FixManager:
     global _fix_manager_instance
     if _fix_manager_instance is None:
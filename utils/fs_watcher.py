@@ -0,0 +1,394 @@
+# utils/fs_watcher.py - OBSERVADOR DE MUDANÇAS NO SISTEMA DE ARQUIVOS
+# Observa config/stplug-in, depotcache e o steamapps de cada biblioteca e
+# publica eventos de mudança para os assinantes (caches do DLCManager,
+# FixManager, detecção de jogos .lua...). Com o observador ativo, os caches
+# deixam de depender de TTL: só são invalidados quando algo muda de fato.
+# Backend: inotify (Linux, via ctypes) ou snapshot de mtimes por polling.
+
+import os
+import time
+import select
+import struct
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURAÇÕES --------------------
+POLL_INTERVAL = 2.0           # segundos entre snapshots no modo polling
+DEBOUNCE = 0.3                # agrupa rajadas de eventos do mesmo diretório
+RESCAN_MISSING_INTERVAL = 10  # tenta observar diretórios que ainda não existem
+
+KIND_STPLUG = "stplug-in"
+KIND_DEPOTCACHE = "depotcache"
+KIND_STEAMAPPS = "steamapps"
+
+FsCallback = Callable[[str, str, Set[str]], None]
+
+# -------------------- INOTIFY (ctypes) --------------------
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_WATCH_MASK = (_IN_CLOSE_WRITE | _IN_ATTRIB | _IN_MOVED_FROM | _IN_MOVED_TO |
+               _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    """libc com inotify, ou None (Windows/macOS ou libc sem suporte)"""
+    if not hasattr(os, "uname") or os.uname().sysname != "Linux":
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class _InotifyBackend:
+    name = "inotify"
+
+    def __init__(self, libc):
+        self.libc = libc
+        self.fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self.fd < 0:
+            import ctypes
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+        self.wds: Dict[int, str] = {}
+
+    def add(self, path: str) -> bool:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            return False
+        self.wds[wd] = path
+        return True
+
+    def remove(self, path: str):
+        for wd, atual in list(self.wds.items()):
+            if atual == path:
+                self.libc.inotify_rm_watch(self.fd, wd)
+                self.wds.pop(wd, None)
+
+    def has(self, path: str) -> bool:
+        return path in self.wds.values()
+
+    def wait(self, timeout: float) -> List[Tuple[str, str]]:
+        """(diretório, nome) alterados; nome vazio = o próprio diretório"""
+        legivel, _, _ = select.select([self.fd], [], [], timeout)
+        if not legivel:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        eventos = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            nome = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                # Fila estourou: considera todos os diretórios alterados
+                eventos.extend((path, "") for path in self.wds.values())
+                continue
+            path = self.wds.get(wd)
+            if path is None:
+                continue
+            if mask & (_IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                if mask & _IN_MOVE_SELF:
+                    # O kernel mantém o wd no diretório movido; o caminho não é mais ele
+                    self.libc.inotify_rm_watch(self.fd, wd)
+                self.wds.pop(wd, None)
+                nome = ""
+            eventos.append((path, nome))
+        return eventos
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class _PollingBackend:
+    """
+    Snapshot {nome: (mtime_ns, tamanho)} por diretório. Diretórios "rasos"
+    (depotcache: arquivos só criados/removidos) comparam apenas o mtime do
+    próprio diretório e só listam o conteúdo quando ele muda.
+    """
+    name = "polling"
+
+    def __init__(self, shallow: Set[str]):
+        self.shallow = shallow
+        self.snapshots: Dict[str, Tuple[Optional[int], Dict[str, Tuple[int, int]]]] = {}
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _scan(path: str) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                snapshot[entry.name] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def add(self, path: str) -> bool:
+        try:
+            self.snapshots[path] = (os.stat(path).st_mtime_ns, self._scan(path))
+            return True
+        except OSError:
+            return False
+
+    def remove(self, path: str):
+        self.snapshots.pop(path, None)
+
+    def has(self, path: str) -> bool:
+        return path in self.snapshots
+
+    def wait(self, timeout: float) -> List[Tuple[str, str]]:
+        if self._stop.wait(min(timeout, POLL_INTERVAL)):
+            return []
+        eventos = []
+        for path, (dir_mtime, anterior) in list(self.snapshots.items()):
+            try:
+                mtime = os.stat(path).st_mtime_ns
+                if path in self.shallow and mtime == dir_mtime:
+                    continue
+                atual = self._scan(path)
+            except OSError:
+                self.snapshots.pop(path, None)
+                eventos.append((path, ""))
+                continue
+            self.snapshots[path] = (mtime, atual)
+            for nome in set(anterior) | set(atual):
+                if anterior.get(nome) != atual.get(nome):
+                    eventos.append((path, nome))
+        return eventos
+
+    def close(self):
+        self._stop.set()
+
+
+class FsWatcher:
+    """
+    👁️ OBSERVADOR DE DIRETÓRIOS DA STEAM
+    - subscribe(callback, kinds): callback(kind, path, nomes_alterados)
+    - is_watching(kind): True se algum diretório daquele tipo está sendo observado
+    - is_watching_path(path): True se AQUELE diretório está sendo observado
+      (os caches só podem dispensar TTL para os diretórios cobertos)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: List[Tuple[FsCallback, Optional[Set[str]]]] = []
+        self._targets: Dict[str, str] = {}      # path -> kind
+        self._watched: Set[str] = set()
+        self._backend = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.steam_path: Optional[str] = None
+        self.events_published = 0
+
+    # -------------------- ASSINANTES --------------------
+    def subscribe(self, callback: FsCallback, kinds: Optional[Iterable[str]] = None) -> FsCallback:
+        with self._lock:
+            self._subscribers.append((callback, set(kinds) if kinds else None))
+        return callback
+
+    def unsubscribe(self, callback: FsCallback):
+        with self._lock:
+            self._subscribers = [(cb, k) for cb, k in self._subscribers if cb is not callback]
+
+    def _publish(self, kind: str, path: str, names: Set[str]):
+        self.events_published += 1
+        logger.debug(f"👁️ {kind}: {len(names)} alteração(ões) em {path}")
+        with self._lock:
+            assinantes = list(self._subscribers)
+        for callback, kinds in assinantes:
+            if kinds is not None and kind not in kinds:
+                continue
+            try:
+                callback(kind, path, names)
+            except Exception as e:
+                logger.warning(f"⚠️ Assinante de {kind} falhou: {e}")
+
+    # -------------------- ALVOS --------------------
+    def _compute_targets(self, steam_path: str) -> Dict[str, str]:
+        alvos = {
+            os.path.join(steam_path, "config", "stplug-in"): KIND_STPLUG,
+            os.path.join(steam_path, "config", "depotcache"): KIND_DEPOTCACHE,
+            os.path.join(steam_path, "depotcache"): KIND_DEPOTCACHE,
+        }
+        bibliotecas = [os.path.abspath(steam_path)]
+        try:
+            from .fix_manager import _parse_libraryfolders_vdf
+            library_vdf = os.path.join(steam_path, "steamapps", "libraryfolders.vdf")
+            if os.path.isfile(library_vdf):
+                bibliotecas.extend(_parse_libraryfolders_vdf(library_vdf))
+        except Exception as e:
+            logger.debug(f"libraryfolders.vdf ilegível: {e}")
+        for biblioteca in dict.fromkeys(bibliotecas):
+            alvos[os.path.join(biblioteca, "steamapps")] = KIND_STEAMAPPS
+        return alvos
+
+    def _sync_watches(self):
+        """Observa alvos novos/que passaram a existir e larga os que sumiram"""
+        for path in list(self._watched):
+            if path not in self._targets:
+                self._backend.remove(path)
+                self._watched.discard(path)
+        for path in self._targets:
+            if path not in self._watched and os.path.isdir(path) and self._backend.add(path):
+                self._watched.add(path)
+
+    def is_watching(self, *kinds: str) -> bool:
+        if not self._thread or not self._thread.is_alive():
+            return False
+        with self._lock:
+            ativos = {self._targets[p] for p in self._watched if p in self._targets}
+        return all(kind in ativos for kind in kinds)
+
+    def is_watching_path(self, *paths: Any) -> bool:
+        if not paths or not self._thread or not self._thread.is_alive():
+            return False
+        with self._lock:
+            observados = {os.path.normcase(os.path.abspath(p)) for p in self._watched}
+        return all(os.path.normcase(os.path.abspath(str(p))) in observados for p in paths)
+
+    # -------------------- CICLO DE VIDA --------------------
+    def start(self, steam_path: str, force_polling: bool = False) -> bool:
+        if not steam_path or not os.path.isdir(steam_path):
+            logger.warning("⚠️ Observador de arquivos não iniciado: Steam não encontrado")
+            return False
+        if self._thread and self._thread.is_alive():
+            return True
+
+        self.steam_path = steam_path
+        self._targets = self._compute_targets(steam_path)
+        libc = None if force_polling else _load_inotify()
+        try:
+            self._backend = _InotifyBackend(libc) if libc else None
+        except OSError as e:
+            logger.debug(f"inotify indisponível: {e}")
+            self._backend = None
+        if self._backend is None:
+            shallow = {p for p, kind in self._targets.items() if kind == KIND_DEPOTCACHE}
+            self._backend = _PollingBackend(shallow)
+
+        with self._lock:
+            self._sync_watches()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fs_watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"👁️ Observador de arquivos ativo ({self._backend.name}): "
+                    f"{len(self._watched)}/{len(self._targets)} diretórios")
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._backend:
+            self._backend.close()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._thread = None
+        self._watched.clear()
+
+    def _run(self):
+        pendentes: Dict[str, Set[str]] = {}
+        ultimo_evento = 0.0
+        ultima_varredura = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                timeout = DEBOUNCE if pendentes else RESCAN_MISSING_INTERVAL
+                for path, nome in self._backend.wait(timeout):
+                    pendentes.setdefault(path, set()).add(nome)
+                    ultimo_evento = time.monotonic()
+
+                agora = time.monotonic()
+                if pendentes and agora - ultimo_evento >= DEBOUNCE:
+                    lote, pendentes = pendentes, {}
+                    self._dispatch(lote)
+
+                if agora - ultima_varredura >= RESCAN_MISSING_INTERVAL:
+                    ultima_varredura = agora
+                    with self._lock:
+                        self._sync_watches()
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logger.error(f"❌ Erro no observador de arquivos: {e}")
+                self._stop.wait(POLL_INTERVAL)
+
+    def _dispatch(self, lote: Dict[str, Set[str]]):
+        for path, nomes in lote.items():
+            kind = self._targets.get(path)
+            if kind is None:
+                continue
+            if "" in nomes and not self._backend.has(path):
+                # Observação perdida (diretório removido/movido): só volta a
+                # contar como observado depois de um novo add
+                with self._lock:
+                    self._watched.discard(path)
+                    if os.path.isdir(path) and self._backend.add(path):
+                        self._watched.add(path)
+            nomes.discard("")
+            # Bibliotecas adicionadas/removidas: recalcula os steamapps observados
+            if kind == KIND_STEAMAPPS and "libraryfolders.vdf" in nomes and self.steam_path:
+                with self._lock:
+                    self._targets = self._compute_targets(self.steam_path)
+                    self._sync_watches()
+            self._publish(kind, path, nomes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "active": bool(self._thread and self._thread.is_alive()),
+                "backend": self._backend.name if self._backend else None,
+                "watched": sorted(self._watched),
+                "missing": sorted(p for p in self._targets if p not in self._watched),
+                "subscribers": len(self._subscribers),
+                "events_published": self.events_published
+            }
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_FS_WATCHER: Optional[FsWatcher] = None
+_FS_WATCHER_LOCK = threading.Lock()
+
+
+def get_fs_watcher() -> FsWatcher:
+    """Retorna o observador SINGLETON de arquivos"""
+    global _FS_WATCHER
+    if _FS_WATCHER is None:
+        with _FS_WATCHER_LOCK:
+            if _FS_WATCHER is None:
+                _FS_WATCHER = FsWatcher()
+    return _FS_WATCHER
+
+
+def start_fs_watcher(steam_path: Optional[str] = None) -> bool:
+    """Inicia o observador para a instalação Steam informada (ou detectada)"""
+    if not steam_path:
+        from .fix_manager import detect_steam_root
+        steam_path = detect_steam_root()
+    return get_fs_watcher().start(steam_path)
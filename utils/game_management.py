@@ -5,11 +5,17 @@ import os
 import json
 import logging
 import shutil
-import requests
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Any
 from datetime import datetime
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .cache_store import get_cache_store
+from .app_names import get_app_name_resolver
+from .app_metadata import get_app_metadata
+from .fs_watcher import KIND_STPLUG, get_fs_watcher
 
 # Configuração de logging
 logger = logging.getLogger(__name__)
@@ -19,83 +25,97 @@ CACHE_DIR = Path(__file__).parent.parent / "cache"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 GAME_NAMES_CACHE_FILE = CACHE_DIR / "steam_games_cache.json"
+GAME_NAMES_CACHE_NAMESPACE = "game_names"
 
 # ================= CONSTANTES STEAM =================
 STEAM_API_BASE = "https://store.steampowered.com/api"
 
+# Resolução concorrente de nomes (a taxa por host é limitada pelo bucket "steam_store")
+NAME_RESOLVER_WORKERS = 8
+NAME_RESOLVE_TIMEOUT = 120
+
 # ================= FUNÇÕES AUXILIARES ESPECIALIZADAS =================
 
 def ensure_cache_dir():
     """Garante que o diretório de cache existe"""
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
+_NAMES_MIGRATED = False
+_NAMES_MIGRATION_LOCK = threading.Lock()
+
+def _is_real_name(appid: str, name: Any) -> bool:
+    # Placeholders "AppID X" (fallback sem rede) não são nomes reais
+    return isinstance(name, str) and bool(name) and name != f"AppID {appid}"
+
+def _legacy_name_entry(appid: str, name: Any) -> Optional[Tuple[str, float]]:
+    if not _is_real_name(appid, name):
+        return None
+    return name, time.time()
+
+def _get_names_store():
+    """Cache persistente compartilhado (migra o JSON antigo uma única vez)"""
+    global _NAMES_MIGRATED
+    store = get_cache_store()
+    if not _NAMES_MIGRATED:
+        with _NAMES_MIGRATION_LOCK:
+            if not _NAMES_MIGRATED:
+                store.import_legacy_json(GAME_NAMES_CACHE_NAMESPACE, GAME_NAMES_CACHE_FILE,
+                                         convert=_legacy_name_entry)
+                _NAMES_MIGRATED = True
+    return store
+
 def load_game_names_cache() -> Dict[str, str]:
     """Carrega cache de nomes de jogos"""
     ensure_cache_dir()
-    if GAME_NAMES_CACHE_FILE.exists():
-        try:
-            with open(GAME_NAMES_CACHE_FILE, 'r', encoding='utf-8') as f:
-                cache_data = json.load(f)
-                logger.info(f"📁 Cache de nomes carregado: {len(cache_data)} entradas")
-                return cache_data
-        except Exception as e:
-            logger.error(f"❌ Erro ao carregar cache de nomes: {e}")
+    try:
+        cache_data = {appid: name for appid, name in _get_names_store().items(GAME_NAMES_CACHE_NAMESPACE).items()
+                      if _is_real_name(appid, name)}
+        logger.info(f"📁 Cache de nomes carregado: {len(cache_data)} entradas")
+        return cache_data
+    except Exception as e:
+        logger.error(f"❌ Erro ao carregar cache de nomes: {e}")
     return {}
 
 def save_game_names_cache(cache: Dict[str, str]):
-    """Salva cache de nomes de jogos"""
+    """Salva cache de nomes de jogos (apenas nomes reais)"""
     try:
         ensure_cache_dir()
-        with open(GAME_NAMES_CACHE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(cache, f, indent=2, ensure_ascii=False)
-        logger.info(f"💾 Cache de nomes salvo: {len(cache)} entradas")
+        reais = {appid: name for appid, name in cache.items() if _is_real_name(appid, name)}
+        _get_names_store().set_many(GAME_NAMES_CACHE_NAMESPACE, reais)
+        logger.info(f"💾 Cache de nomes salvo: {len(reais)} entradas")
     except Exception as e:
         logger.error(f"❌ Erro ao salvar cache de nomes: {e}")
 
-def get_game_name_from_steam(appid: str, cache: Dict[str, str]) -> Tuple[str, bool]:
+def get_game_name_from_steam(appid: str, cache: Dict[str, str], steam_path: Optional[str] = None) -> Tuple[str, bool]:
     """Obtém nome do jogo da API Steam - Versão otimizada"""
     # Verificar cache primeiro
     if appid in cache:
         logger.debug(f"📦 Nome do jogo {appid} encontrado no cache")
         return cache[appid], True
     
+    # Camadas locais (cache persistente + appmanifest .acf) antes da rede
+    local = get_app_name_resolver().lookup_local(appid, steam_path)
+    if local:
+        cache[appid] = local[0]
+        logger.debug(f"📚 Nome do jogo {appid} resolvido localmente ({local[1]})")
+        return local[0], True
+    
     try:
-        url = f"{STEAM_API_BASE}/appdetails?appids={appid}"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-            'Accept': 'application/json',
-        }
-        
         logger.info(f"🌐 Buscando nome do jogo {appid} na API Steam...")
-        response = requests.get(url, headers=headers, timeout=10)
+        real_name = get_app_metadata().get_name(appid)
         
-        if response.status_code == 200:
-            data = response.json()
-            app_data = data.get(str(appid), {})
+        if real_name:
+            # Limitar tamanho do nome se necessário
+            if len(real_name) > 100:
+                real_name = real_name[:100] + "..."
             
-            if app_data.get('success', False):
-                game_data = app_data.get('data', {})
-                real_name = game_data.get('name')
-                
-                if real_name:
-                    # Limitar tamanho do nome se necessário
-                    if len(real_name) > 100:
-                        real_name = real_name[:100] + "..."
-                    
-                    cache[appid] = real_name
-                    logger.info(f"✅ Nome encontrado: {real_name} (AppID: {appid})")
-                    return real_name, True
-                else:
-                    logger.warning(f"⚠️ Nome não encontrado para AppID {appid}")
-            else:
-                logger.warning(f"⚠️ API Steam retornou success=False para AppID {appid}")
+            cache[appid] = real_name
+            get_app_name_resolver().remember(appid, real_name)
+            logger.info(f"✅ Nome encontrado: {real_name} (AppID: {appid})")
+            return real_name, True
         else:
-            logger.warning(f"⚠️ HTTP {response.status_code} para AppID {appid}")
+            logger.warning(f"⚠️ Nome não encontrado para AppID {appid}")
             
-    except requests.exceptions.Timeout:
-        logger.warning(f"⏰ Timeout ao buscar nome para AppID {appid}")
-    except requests.exceptions.ConnectionError:
-        logger.warning(f"🌐 Erro de conexão ao buscar nome para AppID {appid}")
     except Exception as e:
         logger.error(f"❌ Erro ao buscar nome do jogo {appid}: {e}")
     
@@ -104,6 +124,121 @@ def get_game_name_from_steam(appid: str, cache: Dict[str, str]) -> Tuple[str, bo
     cache[appid] = fallback_name
     return fallback_name, False
 
+class NameResolver:
+    """
+    🏷️ RESOLUÇÃO CONCORRENTE DE NOMES DE JOGOS
+    Pool limitado de workers; o ritmo de requisições à Steam Store é dado
+    pelo token bucket compartilhado da camada HTTP. Apenas nomes reais são
+    gravados no cache persistente (fallbacks "AppID X" não).
+    """
+    
+    def __init__(self, max_workers: int = NAME_RESOLVER_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="name_resolver")
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Any] = {}
+        self._resolved: Dict[str, Dict[str, Any]] = {}
+    
+    def _resolve(self, appid: str) -> Tuple[str, bool]:
+        try:
+            # Nomes encontrados já são gravados no cache pelo AppNameResolver
+            return get_game_name_from_steam(appid, {})
+        except Exception as e:
+            logger.debug(f"Falha resolvendo nome de {appid}: {e}")
+            return f"AppID {appid}", False
+    
+    def _finish(self, appid: str, future):
+        try:
+            name, found = future.result()
+        except Exception:
+            name, found = f"AppID {appid}", False
+        with self._lock:
+            self._pending.pop(appid, None)
+            self._resolved[appid] = {"name": name, "found": found, "resolved_at": time.time()}
+    
+    def submit(self, appids: List[str]) -> Dict[str, Any]:
+        """Agenda a resolução dos appids ainda não pendentes; retorna os futures"""
+        futures = {}
+        with self._lock:
+            for appid in appids:
+                appid = str(appid)
+                future = self._pending.get(appid)
+                if future is None:
+                    future = self.executor.submit(self._resolve, appid)
+                    self._pending[appid] = future
+                    future.add_done_callback(lambda f, a=appid: self._finish(a, f))
+                futures[appid] = future
+        return futures
+    
+    def resolve_all(self, appids: List[str], timeout: float = NAME_RESOLVE_TIMEOUT) -> Dict[str, Tuple[str, bool]]:
+        """Resolve vários appids concorrentemente e aguarda o resultado"""
+        futures = self.submit(appids)
+        wait(list(futures.values()), timeout=timeout)
+        resultado = {}
+        for appid, future in futures.items():
+            if future.done() and not future.exception():
+                resultado[appid] = future.result()
+            else:
+                resultado[appid] = (f"AppID {appid}", False)
+        return resultado
+    
+    def get_names(self, appids: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Nomes já resolvidos e appids ainda pendentes (para polling do frontend)"""
+        with self._lock:
+            pending = set(self._pending.keys())
+            resolved = dict(self._resolved)
+        if appids is not None:
+            wanted = {str(a) for a in appids}
+            pending &= wanted
+            resolved = {a: r for a, r in resolved.items() if a in wanted}
+            # appids fora do resolver: tenta o cache persistente
+            for appid in wanted - pending - set(resolved):
+                name = _get_names_store().get(GAME_NAMES_CACHE_NAMESPACE, appid)
+                if name:
+                    resolved[appid] = {"name": name, "found": True}
+        return {
+            "names": {a: r["name"] for a, r in resolved.items()},
+            "found": {a: r["found"] for a, r in resolved.items()},
+            "pending": sorted(pending)
+        }
+
+
+_NAME_RESOLVER: Optional[NameResolver] = None
+_NAME_RESOLVER_LOCK = threading.Lock()
+
+def get_name_resolver() -> NameResolver:
+    """Retorna o NameResolver SINGLETON"""
+    global _NAME_RESOLVER
+    if _NAME_RESOLVER is None:
+        with _NAME_RESOLVER_LOCK:
+            if _NAME_RESOLVER is None:
+                _NAME_RESOLVER = NameResolver()
+    return _NAME_RESOLVER
+
+# ================= CACHE DA DETECÇÃO (INVALIDADO PELO fs_watcher) =================
+
+_DETECTION_CACHE: Dict[str, List[Dict]] = {}
+_DETECTION_CACHE_LOCK = threading.Lock()
+# Incrementada a cada invalidação: detecção que começou antes dela não grava o cache
+_DETECTION_GENERATION = 0
+
+def _invalidate_detection_cache(*_event):
+    """Qualquer mudança no stplug-in descarta as detecções em cache"""
+    global _DETECTION_GENERATION
+    with _DETECTION_CACHE_LOCK:
+        _DETECTION_CACHE.clear()
+        _DETECTION_GENERATION += 1
+
+get_fs_watcher().subscribe(_invalidate_detection_cache, kinds=(KIND_STPLUG,))
+
+def _get_cached_detection(steam_path: Optional[str]) -> Optional[List[Dict]]:
+    # Sem observar ESTE stplug-in não há como saber se ele mudou
+    if not steam_path or not get_fs_watcher().is_watching_path(
+            os.path.join(str(steam_path), "config", "stplug-in")):
+        return None
+    with _DETECTION_CACHE_LOCK:
+        games = _DETECTION_CACHE.get(str(steam_path))
+        return [dict(g) for g in games] if games is not None else None
+
 def detect_lua_games(steam_path: str) -> List[Dict]:
     """Detecta jogos baseado APENAS em arquivos .lua - FOCO EXCLUSIVO"""
     games = []
@@ -199,11 +334,31 @@ class GameManager:
         self.detected_games = []
         logger.info(f"🎮 GameManager inicializado com Steam path: {steam_path}")
         
-    def detect_games(self, fetch_names: bool = True) -> Dict[str, Any]:
-        """Detecta jogos .lua e retorna resultado - VERSÃO ESPECIALIZADA"""
+    def detect_games(self, fetch_names: bool = True, names_pending: bool = False) -> Dict[str, Any]:
+        """
+        Detecta jogos .lua e retorna resultado - VERSÃO ESPECIALIZADA
+        Com `names_pending`, retorna imediatamente: nomes fora do cache ficam
+        com name_pending=True e são resolvidos em segundo plano (ver /api/games/names)
+        """
         try:
-            logger.info("🔍 Iniciando detecção de jogos .lua...")
             start_time = time.time()
+            cached_games = _get_cached_detection(self.steam_path) if fetch_names else None
+            if cached_games is not None:
+                self.detected_games = cached_games
+                logger.info(f"🗄️ {len(cached_games)} jogos .lua servidos do cache (stplug-in inalterado)")
+                return {
+                    'success': True,
+                    'games': cached_games,
+                    'total_games': len(cached_games),
+                    'total_size': sum(g['size'] for g in cached_games),
+                    'processing_time': f"{time.time() - start_time:.2f}s",
+                    'names_pending': 0,
+                    'from_cache': True,
+                    'message': f'Detectados {len(cached_games)} jogos .lua'
+                }
+            
+            logger.info("🔍 Iniciando detecção de jogos .lua...")
+            geracao = _DETECTION_GENERATION
             
             # Fase 1: Detecção de arquivos .lua
             games = detect_lua_games(self.steam_path)
@@ -218,40 +373,57 @@ class GameManager:
                 }
             
             # Fase 2: Buscar nomes se solicitado
+            pendentes = []
             if fetch_names:
                 name_cache = load_game_names_cache()
-                logger.info(f"📝 Buscando nomes para {len(games)} jogos...")
                 
+                app_names = get_app_name_resolver()
                 games_with_names = 0
-                for i, game in enumerate(games):
-                    try:
-                        real_name, from_cache = get_game_name_from_steam(game['appid'], name_cache)
+                for game in games:
+                    game['name_pending'] = False
+                    cached_name = name_cache.get(game['appid'])
+                    if not _is_real_name(game['appid'], cached_name):
+                        # Jogos instalados têm o nome no appmanifest .acf
+                        local = app_names.lookup_local(game['appid'], self.steam_path)
+                        cached_name = local[0] if local else None
+                    if cached_name:
+                        game['name'] = cached_name
+                        game['real_name'] = cached_name
+                        game['name_from_cache'] = True
+                        games_with_names += 1
+                    else:
+                        pendentes.append(game)
+                
+                logger.info(f"📝 {games_with_names} nomes do cache, {len(pendentes)} a resolver")
+                resolver = get_name_resolver()
+                
+                if pendentes and names_pending:
+                    # Retorna já; o frontend busca os nomes conforme forem resolvidos
+                    for game in pendentes:
+                        game['name_pending'] = True
+                    resolver.submit([g['appid'] for g in pendentes])
+                elif pendentes:
+                    resolvidos = resolver.resolve_all([g['appid'] for g in pendentes])
+                    for game in pendentes:
+                        real_name, found = resolvidos.get(game['appid'], (f"AppID {game['appid']}", False))
                         game['name'] = real_name
                         game['real_name'] = real_name
-                        game['name_from_cache'] = from_cache
-                        
-                        if from_cache:
-                            games_with_names += 1
-                            
-                        # Progresso a cada 10 jogos
-                        if (i + 1) % 10 == 0:
-                            logger.info(f"📊 Progresso: {i + 1}/{len(games)} jogos processados")
-                            
-                    except Exception as e:
-                        logger.error(f"❌ Erro ao processar jogo {game['appid']}: {e}")
-                        continue
-                
-                # Salvar cache atualizado
-                save_game_names_cache(name_cache)
-                logger.info(f"📊 Estatísticas: {games_with_names} nomes do cache")
+                        game['name_from_cache'] = found
+                    pendentes = []
             else:
                 # Manter nomes padrão se não buscar
                 for game in games:
                     game['name'] = f"AppID {game['appid']}"
                     game['real_name'] = None
                     game['name_from_cache'] = False
+                    game['name_pending'] = False
             
             self.detected_games = games
+            if fetch_names and not pendentes:
+                with _DETECTION_CACHE_LOCK:
+                    # stplug-in mudou durante a detecção: o resultado pode já estar velho
+                    if geracao == _DETECTION_GENERATION:
+                        _DETECTION_CACHE[str(self.steam_path)] = [dict(g) for g in games]
             
             elapsed_time = time.time() - start_time
             logger.info(f"✅ Detecção concluída: {len(games)} jogos .lua em {elapsed_time:.2f}s")
@@ -262,6 +434,7 @@ class GameManager:
                 'total_games': len(games),
                 'total_size': sum(g['size'] for g in games),
                 'processing_time': f"{elapsed_time:.2f}s",
+                'names_pending': len(pendentes),
                 'message': f'Detectados {len(games)} jogos .lua'
             }
             
@@ -425,6 +598,7 @@ class GameManager:
                     logger.error(f"❌ Erro ao remover {game['appid']}: {e}")
                     failed_games.append({'appid': game['appid'], 'error': str(e)})
             
+            _invalidate_detection_cache()
             logger.info(f"✅ Remoção finalizada: {removed_count}/{total} jogos")
             
             return {
@@ -502,7 +676,8 @@ class GameManager:
             game['name'] = real_name
             game['real_name'] = real_name
             game['name_from_cache'] = from_cache
-            save_game_names_cache(name_cache)
+            if _is_real_name(appid, real_name):
+                get_app_name_resolver().remember(appid, real_name)
             
             return game
             
@@ -0,0 +1,454 @@
+# utils/http_client.py - CAMADA HTTP COMPARTILHADA
+# Uma requests.Session por perfil (downloads, steam_store, dlc, fixes...), todas
+# com pool de conexões por host, keep-alive e política de retry configurável.
+# Os pools são instrumentados: cada host registra requisições e conexões novas,
+# o que dá a taxa de reaproveitamento de conexões.
+# Chamadas idênticas simultâneas podem ser agrupadas (single-flight): só uma
+# vai à rede e as demais recebem o mesmo resultado.
+
+import time
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# -------------------- PERFIS --------------------
+# requests/urllib3 falam apenas HTTP/1.1: o ganho vem de manter as conexões
+# vivas e compartilhadas entre todos os módulos.
+DEFAULT_USER_AGENT = "SteamGameLoader/2.0"
+
+HTTP_PROFILES: Dict[str, Dict[str, Any]] = {
+    "default": {
+        "headers": {"User-Agent": DEFAULT_USER_AGENT, "Accept": "*/*"},
+        "pool_connections": 8,
+        "pool_maxsize": 16,
+        "retry": {"total": 2, "connect": 2, "read": 0, "status": 0, "raise_on_status": False,
+                  "respect_retry_after_header": False, "backoff_factor": 0.3},
+    },
+    # Downloads de manifestos: o DownloadManager já alterna entre espelhos e
+    # mede a saúde de cada um, então só falhas de conexão são repetidas aqui
+    "downloads": {
+        "headers": {"User-Agent": DEFAULT_USER_AGENT, "Accept": "*/*"},
+        "pool_connections": 16,
+        "pool_maxsize": 16,
+        "retry": {"total": 1, "connect": 1, "read": 0, "status": 0, "raise_on_status": False,
+                  "respect_retry_after_header": False, "backoff_factor": 0.3},
+    },
+    # Store/API da Steam: o SteamAPIClient trata 429/5xx no próprio laço de tentativas
+    "steam_store": {
+        "headers": {
+            "User-Agent": "Mozilla/5.0 (compatible; SteamGameLoader/1.0)",
+            "Accept": "application/json",
+            "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8"
+        },
+        "pool_connections": 4,
+        "pool_maxsize": 16,
+        "retry": {"total": 2, "connect": 2, "read": 0, "status": 0, "raise_on_status": False,
+                  "respect_retry_after_header": False, "backoff_factor": 0.5},
+    },
+    "fixes": {
+        "headers": {"User-Agent": "SteamGameLoader/1.0", "Accept": "*/*"},
+        "pool_connections": 4,
+        "pool_maxsize": 8,
+        "retry": {"total": 2, "connect": 2, "read": 0, "backoff_factor": 0.5,
+                  "status_forcelist": [502, 503, 504], "allowed_methods": ["HEAD", "GET"]},
+    },
+}
+
+
+# -------------------- LIMITE DE TAXA (TOKEN BUCKET) --------------------
+# rate = fichas repostas por segundo, burst = fichas acumuladas no máximo.
+# Todo tráfego para os hosts de HOST_RATE_LIMITS passa pelo bucket
+# correspondente, independentemente do módulo/sessão que fez a requisição.
+RATE_LIMIT_PROFILES: Dict[str, Dict[str, float]] = {
+    "steam_store": {"rate": 2.0, "burst": 10},
+}
+HOST_RATE_LIMITS: Dict[str, str] = {
+    "store.steampowered.com": "steam_store",
+}
+RATE_LIMIT_429_PAUSE = 5.0        # pausa global quando o host responde 429 sem Retry-After
+RATE_LIMIT_MAX_WAIT = 60.0        # espera máxima por uma ficha antes de seguir mesmo assim
+
+
+class TokenBucket:
+    """
+    🪣 TOKEN BUCKET THREAD-SAFE
+    Permite rajadas de até `burst` requisições e depois `rate` por segundo.
+    Só dorme quem precisa esperar; as demais threads seguem sem serializar.
+    """
+
+    def __init__(self, name: str, rate: float, burst: float):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.waited_seconds = 0.0
+        self.pauses = 0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float = RATE_LIMIT_MAX_WAIT) -> bool:
+        """Consome uma ficha (esperando se necessário). False se o timeout venceu."""
+        inicio = time.monotonic()
+        esperou = False
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.acquired += 1
+                    if esperou:
+                        self.throttled += 1
+                        self.waited_seconds += now - inicio
+                    return True
+                espera = max(self._paused_until - now, (1 - self._tokens) / self.rate if self.rate > 0 else 1.0)
+            if now - inicio + espera > timeout:
+                return False
+            esperou = True
+            time.sleep(min(espera, 1.0))
+
+    def pause(self, seconds: float):
+        """Bloqueia novas fichas por `seconds` (ex.: após HTTP 429)"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self.pauses += 1
+        logger.warning(f"🪣 Limite '{self.name}' pausado por {seconds:.1f}s (HTTP 429)")
+
+    def configure(self, rate: Optional[float] = None, burst: Optional[float] = None):
+        with self._lock:
+            if rate is not None:
+                self.rate = float(rate)
+            if burst is not None:
+                self.burst = float(burst)
+                self._tokens = min(self._tokens, self.burst)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "tokens": round(self._tokens, 2),
+                "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 1),
+                "acquired": self.acquired,
+                "throttled": self.throttled,
+                "waited_seconds": round(self.waited_seconds, 2),
+                "pauses_429": self.pauses
+            }
+
+
+_RATE_LIMITERS: Dict[str, TokenBucket] = {}
+_RATE_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter(name: str) -> TokenBucket:
+    """Retorna o token bucket SINGLETON do perfil informado"""
+    limiter = _RATE_LIMITERS.get(name)
+    if limiter is None:
+        with _RATE_LIMITERS_LOCK:
+            limiter = _RATE_LIMITERS.get(name)
+            if limiter is None:
+                profile = RATE_LIMIT_PROFILES.get(name, {"rate": 2.0, "burst": 10})
+                limiter = TokenBucket(name, profile["rate"], profile["burst"])
+                _RATE_LIMITERS[name] = limiter
+    return limiter
+
+
+def configure_rate_limiter(name: str, rate: Optional[float] = None, burst: Optional[float] = None) -> None:
+    """Ajusta burst/refill de um limite (vale para todas as sessões imediatamente)"""
+    profile = RATE_LIMIT_PROFILES.setdefault(name, {"rate": 2.0, "burst": 10})
+    if rate is not None:
+        profile["rate"] = rate
+    if burst is not None:
+        profile["burst"] = burst
+    get_rate_limiter(name).configure(rate, burst)
+
+
+def _retry_after_seconds(response) -> float:
+    try:
+        return max(1.0, float(response.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return RATE_LIMIT_429_PAUSE
+
+
+# -------------------- MÉTRICAS DE POOL --------------------
+class PoolMetrics:
+    """Contadores por host: requisições enviadas x conexões TCP/TLS abertas"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def _host(self, host: str) -> Dict[str, int]:
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = {"requests": 0, "new_connections": 0}
+            self._hosts[host] = stats
+        return stats
+
+    def record_request(self, host: str):
+        with self._lock:
+            self._host(host)["requests"] += 1
+
+    def record_connection(self, host: str):
+        with self._lock:
+            self._host(host)["new_connections"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            hosts = {host: dict(stats) for host, stats in self._hosts.items()}
+        total_requests = sum(s["requests"] for s in hosts.values())
+        total_connections = sum(s["new_connections"] for s in hosts.values())
+        for stats in hosts.values():
+            stats["reuse_rate"] = _reuse_rate(stats["requests"], stats["new_connections"])
+        return {
+            "requests": total_requests,
+            "new_connections": total_connections,
+            "reuse_rate": _reuse_rate(total_requests, total_connections),
+            "hosts": hosts
+        }
+
+    def reset(self):
+        with self._lock:
+            self._hosts.clear()
+
+
+def _reuse_rate(requests_count: int, connections: int) -> Optional[float]:
+    if not requests_count:
+        return None
+    return round(max(0.0, 1.0 - connections / requests_count), 3)
+
+
+_METRICS = PoolMetrics()
+
+
+class _MeteredHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _METRICS.record_connection(self.host)
+        return super()._new_conn()
+
+
+class _MeteredHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _METRICS.record_connection(self.host)
+        return super()._new_conn()
+
+
+class MeteredHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter cujos pools contam requisições e conexões novas por host"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _MeteredHTTPConnectionPool,
+            "https": _MeteredHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        host = ""
+        try:
+            host = (requests.utils.urlparse(request.url).hostname or "").lower()
+            _METRICS.record_request(host)
+        except Exception:
+            pass
+
+        limiter_name = HOST_RATE_LIMITS.get(host)
+        limiter = get_rate_limiter(limiter_name) if limiter_name else None
+        if limiter is not None and not limiter.acquire():
+            logger.warning(f"⏳ Limite '{limiter_name}' saturado, enviando {host} mesmo assim")
+
+        response = super().send(request, *args, **kwargs)
+        if limiter is not None and response.status_code == 429:
+            limiter.pause(_retry_after_seconds(response))
+        return response
+
+
+# -------------------- SESSÕES COMPARTILHADAS --------------------
+_SESSIONS: Dict[str, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def _build_session(profile: Dict[str, Any]) -> requests.Session:
+    session = requests.Session()
+    adapter = MeteredHTTPAdapter(
+        pool_connections=profile.get("pool_connections", 8),
+        pool_maxsize=profile.get("pool_maxsize", 16),
+        max_retries=Retry(**profile.get("retry", {"total": 0})),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(profile.get("headers", {}))
+    return session
+
+
+def configure_http_profile(name: str, **overrides) -> None:
+    """Ajusta um perfil (headers, pool_connections, pool_maxsize, retry) e recria sua sessão"""
+    with _SESSIONS_LOCK:
+        profile = dict(HTTP_PROFILES.get(name, HTTP_PROFILES["default"]))
+        profile.update(overrides)
+        HTTP_PROFILES[name] = profile
+        old = _SESSIONS.pop(name, None)
+    if old is not None:
+        old.close()
+    logger.info(f"🔧 Perfil HTTP '{name}' reconfigurado")
+
+
+def get_http_session(name: str = "default") -> requests.Session:
+    """Retorna a sessão SINGLETON do perfil informado (thread-safe para requisições)"""
+    session = _SESSIONS.get(name)
+    if session is None:
+        with _SESSIONS_LOCK:
+            session = _SESSIONS.get(name)
+            if session is None:
+                if name not in HTTP_PROFILES:
+                    logger.debug(f"Perfil HTTP '{name}' desconhecido, usando 'default'")
+                session = _build_session(HTTP_PROFILES.get(name, HTTP_PROFILES["default"]))
+                _SESSIONS[name] = session
+    return session
+
+
+# -------------------- SINGLE-FLIGHT --------------------
+class _FlightCall:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    ✈️ AGRUPAMENTO DE CHAMADAS IDÊNTICAS
+    Enquanto uma chamada com a mesma chave está em andamento, as demais
+    aguardam e recebem o mesmo resultado (ou a mesma exceção).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _FlightCall] = {}
+        self.calls = 0
+        self.executed = 0
+        self.shared = 0
+        self.errors = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = _FlightCall()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executed": self.executed,
+                "saved": self.shared,
+                "errors": self.errors,
+                "in_flight": len(self._calls),
+                "saved_ratio": round(self.shared / self.calls, 3) if self.calls else None
+            }
+
+
+_SINGLE_FLIGHTS: Dict[str, SingleFlight] = {}
+_SINGLE_FLIGHTS_LOCK = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Retorna o grupo SINGLETON de single-flight (normalmente um por host)"""
+    flight = _SINGLE_FLIGHTS.get(name)
+    if flight is None:
+        with _SINGLE_FLIGHTS_LOCK:
+            flight = _SINGLE_FLIGHTS.get(name)
+            if flight is None:
+                flight = SingleFlight(name)
+                _SINGLE_FLIGHTS[name] = flight
+    return flight
+
+
+def flight_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """Chave canônica de uma requisição GET (URL + parâmetros ordenados)"""
+    return requests.Request("GET", url, params=sorted((params or {}).items())).prepare().url
+
+
+def coalesced_get(session_name: str, url: str, params: Optional[Dict[str, Any]] = None,
+                  timeout: Optional[float] = None) -> requests.Response:
+    """
+    GET pela sessão do perfil, agrupando chamadas simultâneas à mesma URL.
+    A resposta (já lida, sem stream) é compartilhada entre quem aguardou.
+    """
+    key = flight_key(url, params)
+    flight = get_single_flight(urlsplit(key).hostname or "default")
+    return flight.do(key, lambda: get_http_session(session_name).get(url, params=params, timeout=timeout))
+
+
+def get_http_metrics() -> Dict[str, Any]:
+    """Métricas de reaproveitamento de conexões de todas as sessões"""
+    metrics = _METRICS.snapshot()
+    with _SESSIONS_LOCK:
+        metrics["sessions"] = sorted(_SESSIONS.keys())
+    metrics["http2"] = False
+    with _RATE_LIMITERS_LOCK:
+        limiters = dict(_RATE_LIMITERS)
+    metrics["rate_limits"] = {name: limiter.snapshot() for name, limiter in limiters.items()}
+    with _SINGLE_FLIGHTS_LOCK:
+        flights = dict(_SINGLE_FLIGHTS)
+    metrics["single_flight"] = {name: flight.snapshot() for name, flight in flights.items()}
+    return metrics
+
+
+def close_http_sessions() -> None:
+    """Fecha todas as sessões (encerramento do aplicativo)"""
+    with _SESSIONS_LOCK:
+        sessions = list(_SESSIONS.values())
+        _SESSIONS.clear()
+    for session in sessions:
+        try:
+            session.close()
+        except Exception:
+            pass
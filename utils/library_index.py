@@ -0,0 +1,223 @@
+# utils/library_index.py - ÍNDICE INCREMENTAL DAS BIBLIOTECAS STEAM
+# Guarda os campos de cada appmanifest_*.acf (appid, name, installdir) junto
+# com (mtime, tamanho) no cache persistente ("library_index"). Uma varredura
+# só faz stat nos manifestos e reinterpreta os que mudaram; bibliotecas cujo
+# diretório steamapps não mudou (mtime) nem gerou evento no fs_watcher são
+# puladas inteiras.
+
+import os
+import re
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .cache_store import get_cache_store
+from .fs_watcher import KIND_STEAMAPPS, get_fs_watcher
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURAÇÕES --------------------
+LIBRARY_INDEX_NAMESPACE = "library_index"
+# Sem fs_watcher, edições no próprio .acf não mudam o mtime do diretório:
+# depois deste intervalo a biblioteca passa por um stat completo
+DIR_SHORTCUT_MAX_AGE = 30
+
+_APPID_RE = re.compile(r'"appid"\s*"(\d+)"')
+_NAME_RE = re.compile(r'"name"\s*"(.+?)"')
+_INSTALLDIR_RE = re.compile(r'"installdir"\s*"(.+?)"')
+
+
+def parse_appmanifest(content: str) -> Optional[Dict[str, Any]]:
+    """Campos usados de um appmanifest .acf (None se faltar appid/installdir)"""
+    appid_m = _APPID_RE.search(content)
+    installdir_m = _INSTALLDIR_RE.search(content)
+    if not appid_m or not installdir_m:
+        return None
+    name_m = _NAME_RE.search(content)
+    appid = int(appid_m.group(1))
+    return {
+        "appid": appid,
+        "name": name_m.group(1) if name_m else f"App {appid}",
+        "installdir": installdir_m.group(1)
+    }
+
+
+class LibraryIndex:
+    """
+    📚 ÍNDICE DE APPMANIFESTS
+    - por biblioteca: mtime do steamapps + {arquivo: mtime, tamanho, campos}
+    - varredura quente: um stat por biblioteca (atalho de diretório) ou um
+      stat por manifesto; leitura/regex só nos arquivos alterados
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._libraries: Dict[str, Dict[str, Any]] = {}
+        self._dirty: Set[str] = set()
+        self._loaded = False
+        self._library_vdf: Tuple[Optional[Tuple[int, int]], List[str]] = (None, [])
+        self.stats = {"scans": 0, "dir_skips": 0, "stat_passes": 0, "parsed": 0, "reused": 0}
+        get_fs_watcher().subscribe(self._on_fs_change, kinds=(KIND_STEAMAPPS,))
+
+    def _on_fs_change(self, kind: str, path: str, names: Set[str]):
+        with self._lock:
+            self._dirty.add(os.path.abspath(path))
+
+    def _load(self):
+        """Carrega o índice persistido; cada biblioteca ainda passa por um stat
+        completo na primeira varredura da sessão (o app pode ter ficado fechado)"""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            for steamapps_dir, entry in get_cache_store().items(LIBRARY_INDEX_NAMESPACE, allow_expired=True).items():
+                if isinstance(entry, dict) and isinstance(entry.get("manifests"), dict):
+                    self._libraries[steamapps_dir] = dict(entry, checked_at=0.0, verified=False)
+        except Exception as e:
+            logger.debug(f"Índice de bibliotecas persistido ilegível: {e}")
+
+    # -------------------- BIBLIOTECAS --------------------
+    def _libraries_for(self, steam_root: str) -> List[str]:
+        """Raiz + bibliotecas do libraryfolders.vdf (relido só se ele mudar)"""
+        from .fix_manager import _parse_libraryfolders_vdf
+        library_vdf = os.path.join(steam_root, "steamapps", "libraryfolders.vdf")
+        try:
+            st = os.stat(library_vdf)
+            assinatura = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            assinatura = None
+
+        if assinatura != self._library_vdf[0] or assinatura is None:
+            extras = _parse_libraryfolders_vdf(library_vdf) if assinatura else []
+            self._library_vdf = (assinatura, extras)
+        return list(dict.fromkeys([steam_root] + self._library_vdf[1]))
+
+    def _refresh_library(self, steamapps_dir: str) -> Optional[Dict[str, Any]]:
+        try:
+            dir_mtime = os.stat(steamapps_dir).st_mtime_ns
+        except OSError:
+            return None
+
+        agora = time.time()
+        entry = self._libraries.get(steamapps_dir)
+        if (entry and entry.get("verified") and entry["dir_mtime"] == dir_mtime
+                and steamapps_dir not in self._dirty
+                and (get_fs_watcher().is_watching_path(steamapps_dir)
+                     or agora - entry["checked_at"] < DIR_SHORTCUT_MAX_AGE)):
+            self.stats["dir_skips"] += 1
+            return entry
+
+        self._dirty.discard(steamapps_dir)
+        self.stats["stat_passes"] += 1
+        antigos = entry["manifests"] if entry else {}
+        novos: Dict[str, Dict[str, Any]] = {}
+        alterado = entry is None or entry["dir_mtime"] != dir_mtime
+
+        with os.scandir(steamapps_dir) as it:
+            for item in it:
+                fname = item.name
+                if not fname.startswith("appmanifest_") or not fname.endswith(".acf"):
+                    continue
+                try:
+                    st = item.stat()
+                except OSError:
+                    continue
+                anterior = antigos.get(fname)
+                if anterior and anterior["mtime"] == st.st_mtime_ns and anterior["size"] == st.st_size:
+                    novos[fname] = anterior
+                    self.stats["reused"] += 1
+                    continue
+                try:
+                    with open(item.path, "r", encoding="utf-8", errors="ignore") as f:
+                        campos = parse_appmanifest(f.read())
+                except OSError as e:
+                    logger.debug("Erro lendo manifesto %s: %s", item.path, e)
+                    continue
+                novos[fname] = {"mtime": st.st_mtime_ns, "size": st.st_size, "fields": campos}
+                self.stats["parsed"] += 1
+                alterado = True
+
+        alterado = alterado or antigos.keys() != novos.keys()
+        entry = {"dir_mtime": dir_mtime, "manifests": novos, "checked_at": agora, "verified": True,
+                 "games": self._build_games(steamapps_dir, novos)}
+        self._libraries[steamapps_dir] = entry
+        if alterado:
+            get_cache_store().set(LIBRARY_INDEX_NAMESPACE, steamapps_dir,
+                                  {"dir_mtime": dir_mtime, "manifests": novos})
+        return entry
+
+    @staticmethod
+    def _build_games(steamapps_dir: str, manifests: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+        library = os.path.dirname(steamapps_dir)
+        games = []
+        for manifesto in manifests.values():
+            campos = manifesto.get("fields")
+            if campos:
+                games.append({
+                    "appid": campos["appid"],
+                    "name": campos["name"],
+                    "installdir": campos["installdir"],
+                    "library": library,
+                    "install_path": os.path.abspath(os.path.join(steamapps_dir, "common", campos["installdir"]))
+                })
+        return games
+
+    # -------------------- API PÚBLICA --------------------
+    def scan(self, steam_root: str) -> List[Dict[str, Any]]:
+        """Mesmo resultado de scan_steam_games: um dict por appid instalado"""
+        if not steam_root or not os.path.exists(steam_root):
+            return []
+        steam_root = os.path.abspath(steam_root)
+
+        games: List[Dict[str, Any]] = []
+        seen: Set[int] = set()
+        with self._lock:
+            self._load()
+            self.stats["scans"] += 1
+            for library in self._libraries_for(steam_root):
+                steamapps_dir = os.path.join(library, "steamapps")
+                entry = self._refresh_library(steamapps_dir)
+                if not entry:
+                    continue
+                for game in entry["games"]:
+                    if game["appid"] not in seen:
+                        seen.add(game["appid"])
+                        games.append(dict(game))
+        return games
+
+    def steamapps_dirs(self, steam_root: str) -> List[str]:
+        """Diretórios steamapps de todas as bibliotecas da instalação"""
+        if not steam_root:
+            return []
+        with self._lock:
+            return [os.path.join(library, "steamapps")
+                    for library in self._libraries_for(os.path.abspath(steam_root))]
+
+    def invalidate(self):
+        with self._lock:
+            self._libraries.clear()
+            self._dirty.clear()
+            self._library_vdf = (None, [])
+        get_cache_store().clear(LIBRARY_INDEX_NAMESPACE)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.stats,
+                        libraries=len(self._libraries),
+                        manifests=sum(len(e["manifests"]) for e in self._libraries.values()))
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_LIBRARY_INDEX: Optional[LibraryIndex] = None
+_LIBRARY_INDEX_LOCK = threading.Lock()
+
+
+def get_library_index() -> LibraryIndex:
+    """Retorna o índice SINGLETON de bibliotecas"""
+    global _LIBRARY_INDEX
+    if _LIBRARY_INDEX is None:
+        with _LIBRARY_INDEX_LOCK:
+            if _LIBRARY_INDEX is None:
+                _LIBRARY_INDEX = LibraryIndex()
+    return _LIBRARY_INDEX
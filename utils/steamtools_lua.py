@@ -0,0 +1,295 @@
+# utils/steamtools_lua.py - ÍNDICE EM MEMÓRIA E EDIÇÃO ATÔMICA DO Steamtools.lua
+# O stplug-in/Steamtools.lua é lido e interpretado uma única vez e o resultado
+# é reutilizado enquanto o mtime e o tamanho do arquivo não mudarem. Consultas
+# de DLC instalada viram lookups em dicionário em vez de reler o arquivo.
+# Inclusões e remoções passam por apply_steamtools_edits: uma passada baseada
+# em conjuntos, sob trava de arquivo, gravando via temporário + os.replace.
+
+import os
+import time
+import logging
+import tempfile
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+    import fcntl
+
+logger = logging.getLogger(__name__)
+
+
+class SteamtoolsLuaIndex:
+    """
+    📜 Steamtools.lua INTERPRETADO
+    - entries: appid -> linhas addappid(...) daquele appid (argumentos e nº da linha)
+    - appids: appids na ordem em que aparecem, sem duplicatas
+    """
+
+    def __init__(self, path: str, signature: Optional[Tuple[int, int]], lines: List[str]):
+        self.path = path
+        self.signature = signature
+        self.entries: Dict[str, List[Dict[str, Any]]] = {}
+        self.appids: List[str] = []
+        for numero, line in enumerate(lines):
+            line_clean = line.strip().replace(" ", "")
+            if not line_clean.startswith("addappid("):
+                continue
+            # Extrair: addappid(123456,1,"chave") -> ["123456", "1", "\"chave\""]
+            corpo = line_clean[9:].split(")", 1)[0]
+            args = corpo.split(",")
+            if not args or not args[0].isdigit():
+                continue
+            appid = args[0]
+            if appid not in self.entries:
+                self.entries[appid] = []
+                self.appids.append(appid)
+            self.entries[appid].append({"args": args[1:], "line": numero})
+
+    def __contains__(self, appid: Any) -> bool:
+        return str(appid) in self.entries
+
+    def __len__(self) -> int:
+        return len(self.appids)
+
+    def get(self, appid: Any) -> List[Dict[str, Any]]:
+        return self.entries.get(str(appid), [])
+
+
+class SteamtoolsLuaCache:
+    """
+    🗂️ CACHE DE ÍNDICES POR CAMINHO
+    Cada consulta faz só um os.stat; o arquivo é relido quando
+    (mtime_ns, tamanho) difere do que foi interpretado.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, SteamtoolsLuaIndex] = {}
+        self.parses = 0
+        self.hits = 0
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def get(self, path: Any) -> SteamtoolsLuaIndex:
+        """Índice atual do arquivo (vazio se ele não existe ou não pôde ser lido)"""
+        path = os.path.abspath(str(path))
+        assinatura = self._signature(path)
+
+        with self._lock:
+            atual = self._indexes.get(path)
+            if atual is not None and atual.signature == assinatura:
+                self.hits += 1
+                return atual
+
+            lines: List[str] = []
+            if assinatura is not None:
+                try:
+                    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                        lines = f.read().splitlines()
+                except OSError as e:
+                    logger.error(f"Erro ao ler {path}: {e}")
+                    assinatura = None
+
+            index = SteamtoolsLuaIndex(path, assinatura, lines)
+            self._indexes[path] = index
+            self.parses += 1
+            logger.debug(f"📜 Steamtools.lua interpretado: {len(index)} appids")
+            return index
+
+    def invalidate(self, path: Optional[Any] = None):
+        """Descarta o índice de um arquivo (ou de todos) após escrita própria"""
+        with self._lock:
+            if path is None:
+                self._indexes.clear()
+            else:
+                self._indexes.pop(os.path.abspath(str(path)), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "files": len(self._indexes),
+                "parses": self.parses,
+                "hits": self.hits,
+                "appids": sum(len(i) for i in self._indexes.values())
+            }
+
+
+# -------------------- EDIÇÃO ATÔMICA --------------------
+ADD_ENTRY_FORMAT = "addappid({appid}, 1)"
+LOCK_TIMEOUT = 10.0
+REPLACE_RETRIES = 5        # no Windows o Steam/antivírus pode segurar o arquivo por instantes
+
+_path_locks: Dict[str, threading.Lock] = {}
+_path_locks_guard = threading.Lock()
+
+
+def _thread_lock_for(path: str) -> threading.Lock:
+    with _path_locks_guard:
+        return _path_locks.setdefault(path, threading.Lock())
+
+
+class _FileLock:
+    """
+    Trava exclusiva entre processos via arquivo <alvo>.lock (msvcrt/fcntl).
+    O .lock fica no diretório de propósito (ex.: stplug-in/Steamtools.lua.lock):
+    apagá-lo ao sair deixaria quem já espera travando um inode órfão enquanto
+    outro processo cria e trava um novo arquivo.
+    """
+
+    def __init__(self, path: str, timeout: float = LOCK_TIMEOUT):
+        self.lock_path = path + ".lock"
+        self.timeout = timeout
+        self._fd: Optional[int] = None
+
+    def _try_lock(self) -> bool:
+        try:
+            if msvcrt:
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            else:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def __enter__(self):
+        self._fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        limite = time.monotonic() + self.timeout
+        while not self._try_lock():
+            if time.monotonic() >= limite:
+                os.close(self._fd)
+                self._fd = None
+                raise TimeoutError(f"Trava de {self.lock_path} não obtida em {self.timeout:.0f}s")
+            time.sleep(0.02)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if msvcrt:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+
+def _entry_appid(line: str) -> Optional[str]:
+    line_clean = line.strip().replace(" ", "")
+    if not line_clean.startswith("addappid("):
+        return None
+    appid = line_clean[9:].split(")", 1)[0].split(",", 1)[0]
+    return appid if appid.isdigit() else None
+
+
+def _write_atomic(path: str, content: str):
+    fd, temp_path = tempfile.mkstemp(prefix=".steamloader_", suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", errors="surrogateescape", newline="") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        for tentativa in range(REPLACE_RETRIES):
+            try:
+                os.replace(temp_path, path)
+                return
+            except PermissionError:
+                if tentativa == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(0.05 * (tentativa + 1))
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+def apply_steamtools_edits(path: Any, add: Optional[Iterable[Any]] = None,
+                           remove: Optional[Iterable[Any]] = None,
+                           entry_format: str = ADD_ENTRY_FORMAT) -> Dict[str, Any]:
+    """
+    Aplica um lote de inclusões/remoções de addappid em uma única passada.
+    Remoções são aplicadas antes das inclusões; o arquivo só é regravado se
+    algo mudou. Retorna o diff: appids adicionados, removidos, já presentes
+    e não encontrados.
+    """
+    inicio = time.perf_counter()
+    path = os.path.abspath(str(path))
+    to_add = [str(a).strip() for a in (add or [])]
+    to_add = [a for a in dict.fromkeys(to_add) if a.isdigit()]
+    to_remove = {str(r).strip() for r in (remove or [])}
+
+    # O diretório precisa existir antes da trava (o .lock é criado nele)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _thread_lock_for(path), _FileLock(path):
+        try:
+            with open(path, "r", encoding="utf-8", errors="surrogateescape", newline="") as f:
+                lines = f.read().splitlines(keepends=True)
+        except FileNotFoundError:
+            lines = []
+
+        newline = "\r\n" if lines and lines[0].endswith("\r\n") else "\n"
+        kept: List[str] = []
+        presentes = set()
+        removidos: Dict[str, int] = {}
+        for line in lines:
+            appid = _entry_appid(line)
+            if appid is not None and appid in to_remove:
+                removidos[appid] = removidos.get(appid, 0) + 1
+                continue
+            if appid is not None:
+                presentes.add(appid)
+            kept.append(line)
+
+        adicionados = [a for a in to_add if a not in presentes]
+        if adicionados:
+            if kept and not kept[-1].endswith(("\n", "\r")):
+                kept[-1] += newline
+            kept.extend(entry_format.format(appid=a) + newline for a in adicionados)
+
+        alterado = bool(adicionados or removidos)
+        if alterado:
+            _write_atomic(path, "".join(kept))
+            get_steamtools_lua_cache().invalidate(path)
+
+    diff = {
+        "success": True,
+        "changed": alterado,
+        "added": adicionados,
+        "removed": list(removidos),
+        "lines_removed": sum(removidos.values()),
+        "already_present": [a for a in to_add if a in presentes],
+        "not_found": sorted(to_remove - set(removidos)),
+        "lines_before": len(lines),
+        "lines_after": len(kept),
+        "elapsed_ms": round((time.perf_counter() - inicio) * 1000, 2)
+    }
+    if alterado:
+        logger.info(f"📝 Steamtools.lua: +{len(adicionados)} / -{len(removidos)} appids "
+                    f"em {diff['elapsed_ms']}ms")
+    return diff
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_STEAMTOOLS_LUA_CACHE: Optional[SteamtoolsLuaCache] = None
+_STEAMTOOLS_LUA_CACHE_LOCK = threading.Lock()
+
+
+def get_steamtools_lua_cache() -> SteamtoolsLuaCache:
+    """Retorna o cache SINGLETON de índices do Steamtools.lua"""
+    global _STEAMTOOLS_LUA_CACHE
+    if _STEAMTOOLS_LUA_CACHE is None:
+        with _STEAMTOOLS_LUA_CACHE_LOCK:
+            if _STEAMTOOLS_LUA_CACHE is None:
+                _STEAMTOOLS_LUA_CACHE = SteamtoolsLuaCache()
+    return _STEAMTOOLS_LUA_CACHE
@@ -4,9 +4,16 @@ import time
 import os
 import sys
 import json
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Any
 from datetime import datetime
+from urllib.parse import urlsplit
+
+from .cache_store import get_cache_store
+from .title_index import SUGGEST_LIMIT, get_title_index
+from .app_metadata import get_app_metadata
+from .http_client import flight_key, get_http_session, get_single_flight
 
 logger = logging.getLogger(__name__)
 
@@ -25,58 +32,71 @@ except ImportError as e:
     logger.warning(f"⚠️ Download Manager não disponível: {e}")
     
     # Fallback functions para manter compatibilidade
-    def baixar_manifesto(appid: str) -> Dict[str, Any]:
+    def baixar_manifesto(appid: str, context: Any = None) -> Dict[str, Any]:
         return {
             "success": False, 
             "error": "Sistema de download não disponível",
             "appid": appid
         }
     
-    def _verificar_disponibilidade_appid(appid: str) -> List[Dict]:
+    def _verificar_disponibilidade_appid(appid: str, context: Any = None) -> List[Dict]:
         return []
 
 # Timeouts / retries (APENAS PARA BUSCA)
 API_TIMEOUT = 12
 MAX_RETRIES = 3
-REQUEST_DELAY = 0.5
 
-# -------------------- CACHE MANAGER (MANTIDO PARA BUSCA) --------------------
+# -------------------- CACHE MANAGER (BACKEND SQLITE COMPARTILHADO) --------------------
+SEARCH_CACHE_NAMESPACE = "search"
+SEARCH_CACHE_TTL = 3600  # validade 1 hora
+# Stale-while-revalidate: busca expirada há menos que isso é servida na hora
+# e atualizada em segundo plano; acima disso a busca espera a Steam
+SEARCH_CACHE_MAX_STALENESS = 24 * 3600
+
 class CacheManager:
     def __init__(self):
         self.cache_dir = Path(__file__).parent.parent / "cache"
         self.search_cache_file = self.cache_dir / "search_cache.json"
         self._ensure_cache_dir()
+        self.store = get_cache_store()
+        self.store.import_legacy_json(
+            SEARCH_CACHE_NAMESPACE, self.search_cache_file, ttl=SEARCH_CACHE_TTL,
+            convert=lambda key, data: (data, data.get('timestamp', 0)) if isinstance(data, dict) else None
+        )
 
     def _ensure_cache_dir(self):
         self.cache_dir.mkdir(parents=True, exist_ok=True)
 
-    def get_cached_search(self, query: str) -> Optional[List[Dict]]:
+    def get_cached_search(self, query: str, allow_expired: bool = False) -> Optional[List[Dict]]:
         try:
-            if not self.search_cache_file.exists():
-                return None
-            with open(self.search_cache_file, 'r', encoding='utf-8') as f:
-                cache = json.load(f)
             key = query.lower().strip()
-            data = cache.get(key)
-            if not data:
-                return None
-            # validade 1 hora
-            if time.time() - data.get('timestamp', 0) < 3600:
+            data = self.store.get(SEARCH_CACHE_NAMESPACE, key, allow_expired=allow_expired)
+            if data:
                 return data.get('results', [])
         except Exception as e:
             logger.debug(f"Erro ao ler cache de busca: {e}")
         return None
 
+    def get_cached_search_entry(self, query: str) -> Optional[Dict[str, Any]]:
+        """Entrada da busca com idade e flag de expiração (mesmo se expirada)"""
+        try:
+            entry = self.store.get_entry(SEARCH_CACHE_NAMESPACE, query.lower().strip())
+            if entry and isinstance(entry["value"], dict):
+                return {
+                    'results': entry["value"].get('results', []),
+                    'age': entry["age"],
+                    'expired': entry["expired"]
+                }
+        except Exception as e:
+            logger.debug(f"Erro ao ler cache de busca: {e}")
+        return None
+
     def save_search_cache(self, query: str, results: List[Dict]):
         try:
-            cache = {}
-            if self.search_cache_file.exists():
-                with open(self.search_cache_file, 'r', encoding='utf-8') as f:
-                    cache = json.load(f)
             key = query.lower().strip()
-            cache[key] = {'results': results, 'timestamp': time.time(), 'count': len(results)}
-            with open(self.search_cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache, f, indent=2, ensure_ascii=False)
+            self.store.set(SEARCH_CACHE_NAMESPACE, key,
+                           {'results': results, 'timestamp': time.time(), 'count': len(results)},
+                           ttl=SEARCH_CACHE_TTL)
         except Exception as e:
             logger.debug(f"Erro ao salvar cache de busca: {e}")
 
@@ -302,24 +322,18 @@ def _validar_instalacao_final(appid: str) -> Dict[str, Any]:
 # -------------------- CLIENTE STEAM (MANTIDO PARA BUSCA) --------------------
 class SteamAPIClient:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (compatible; SteamGameLoader/1.0)",
-            "Accept": "application/json",
-            "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8"
-        })
-        self.last_request_time = 0
+        # Sessão compartilhada com TODO o tráfego da Steam Store; o token bucket
+        # do host é aplicado pela própria sessão, entre threads e instâncias
+        self.session = get_http_session("steam_store")
         self.cache_manager = CacheManager()
 
-    def _rate_limit(self):
-        now = time.time()
-        diff = now - self.last_request_time
-        if diff < REQUEST_DELAY:
-            time.sleep(REQUEST_DELAY - diff)
-        self.last_request_time = time.time()
-
     def make_request(self, url: str, params: Dict = None, timeout: int = API_TIMEOUT) -> Optional[Dict]:
-        self._rate_limit()
+        # Buscas/detalhes idênticos em andamento são compartilhados (single-flight)
+        key = flight_key(url, params)
+        flight = get_single_flight(urlsplit(key).hostname or "default")
+        return flight.do(key, lambda: self._request_with_retries(url, params, timeout))
+
+    def _request_with_retries(self, url: str, params: Dict = None, timeout: int = API_TIMEOUT) -> Optional[Dict]:
         for attempt in range(MAX_RETRIES):
             try:
                 logger.debug(f"Request {url} params={params} attempt={attempt+1}")
@@ -343,7 +357,7 @@ class SteamAPIClient:
                 code = getattr(e.response, "status_code", None)
                 logger.warning(f"HTTPError {code} {url}")
                 if code == 429:
-                    time.sleep(2 ** attempt)
+                    # O bucket já foi pausado pelo adapter; a próxima tentativa aguarda a liberação
                     continue
                 if attempt == MAX_RETRIES - 1:
                     raise
@@ -360,6 +374,18 @@ class SteamAPIClient:
                 time.sleep(0.5)
         return None
 
+_STEAM_API_CLIENT: Optional[SteamAPIClient] = None
+_STEAM_API_CLIENT_LOCK = threading.Lock()
+
+def get_steam_api_client() -> SteamAPIClient:
+    """Retorna o SteamAPIClient SINGLETON do processo (sessão, cache e limite compartilhados)"""
+    global _STEAM_API_CLIENT
+    if _STEAM_API_CLIENT is None:
+        with _STEAM_API_CLIENT_LOCK:
+            if _STEAM_API_CLIENT is None:
+                _STEAM_API_CLIENT = SteamAPIClient()
+    return _STEAM_API_CLIENT
+
 # -------------------- PROCESSAMENTO DOS DADOS (MANTIDO) --------------------
 def _processar_dados_jogo(jogo: Dict) -> Optional[Dict]:
     try:
@@ -410,12 +436,74 @@ def _processar_dados_jogo(jogo: Dict) -> Optional[Dict]:
         return None
 
 # -------------------- FUNÇÃO PRINCIPAL DE BUSCA (MANTIDA) --------------------
+_SEARCHES_REVALIDATING: set = set()
+_SEARCHES_REVALIDATING_LOCK = threading.Lock()
+
+def _buscar_na_steam(client: SteamAPIClient, query: str, max_results: int) -> List[Dict]:
+    """Consulta /storesearch e grava o resultado no cache (exceções propagam)"""
+    params = {
+        "term": query,
+        "l": "brazilian",
+        "cc": "BR",
+        "max_results": max_results
+    }
+
+    data = client.make_request(STEAM_SEARCH_URL, params=params, timeout=API_TIMEOUT)
+    if not data:
+        logger.warning("Resposta vazia da API Steam")
+        return []
+    items = data.get('items') if isinstance(data, dict) else None
+    if not items:
+        items = data.get('results') if isinstance(data, dict) else None
+    if not items:
+        logger.info("Nenhum item retornado pela Steam")
+        return []
+
+    jogos = []
+    for item in items[:max_results]:
+        p = _processar_dados_jogo(item)
+        if p:
+            jogos.append(p)
+
+    try:
+        client.cache_manager.save_search_cache(query, jogos)
+    except Exception:
+        logger.debug("Falha ao salvar cache, ignorando")
+
+    # Títulos vistos alimentam o autocomplete local
+    title_index = get_title_index()
+    for jogo in jogos:
+        title_index.add(jogo['appid'], jogo['name'], source="search", extra={"tiny_image": jogo.get('tiny_image', "")})
+
+    logger.info(f"buscar_jogos_steam: {len(jogos)} resultados para '{query}'")
+    return jogos
+
+def _revalidar_busca(client: SteamAPIClient, query: str, max_results: int):
+    key = query.lower()
+    with _SEARCHES_REVALIDATING_LOCK:
+        if key in _SEARCHES_REVALIDATING:
+            return
+        _SEARCHES_REVALIDATING.add(key)
+
+    def _worker():
+        try:
+            _buscar_na_steam(client, query, max_results)
+        except Exception as e:
+            logger.debug(f"Revalidação da busca '{query}' falhou: {e}")
+        finally:
+            with _SEARCHES_REVALIDATING_LOCK:
+                _SEARCHES_REVALIDATING.discard(key)
+
+    threading.Thread(target=_worker, daemon=True, name="search_revalidate").start()
+
 def buscar_jogos_steam(nome_jogo: str, max_results: int = 50) -> List[Dict]:
     """
     Busca única e definitiva. Retorna lista de dicionários padronizados.
     Usa cache (1h) e faz request à Steam Store API /storesearch.
+    Cache expirado há menos de SEARCH_CACHE_MAX_STALENESS é retornado na hora
+    e atualizado em segundo plano (stale-while-revalidate).
     """
-    client = SteamAPIClient()
+    client = get_steam_api_client()
     cache = client.cache_manager
 
     if not nome_jogo or len(nome_jogo.strip()) < 2:
@@ -424,50 +512,25 @@ def buscar_jogos_steam(nome_jogo: str, max_results: int = 50) -> List[Dict]:
 
     query = nome_jogo.strip()
     try:
-        cached = cache.get_cached_search(query)
+        cached = cache.get_cached_search_entry(query)
         if cached is not None:
-            logger.info(f"Usando cache para '{query}' ({len(cached)} resultados)")
-            return cached
+            if not cached['expired']:
+                logger.info(f"Usando cache para '{query}' ({len(cached['results'])} resultados)")
+                return cached['results']
+            if cached['age'] <= SEARCH_CACHE_MAX_STALENESS:
+                logger.info(f"Usando cache expirado para '{query}' e revalidando em segundo plano")
+                _revalidar_busca(client, query, max_results)
+                return cached['results']
     except Exception:
         logger.debug("Falha ao verificar cache")
 
-    params = {
-        "term": query,
-        "l": "brazilian",
-        "cc": "BR",
-        "max_results": max_results
-    }
-
     try:
-        data = client.make_request(STEAM_SEARCH_URL, params=params, timeout=API_TIMEOUT)
-        if not data:
-            logger.warning("Resposta vazia da API Steam")
-            return []
-        items = data.get('items') if isinstance(data, dict) else None
-        if not items:
-            items = data.get('results') if isinstance(data, dict) else None
-        if not items:
-            logger.info("Nenhum item retornado pela Steam")
-            return []
-
-        jogos = []
-        for item in items[:max_results]:
-            p = _processar_dados_jogo(item)
-            if p:
-                jogos.append(p)
-
-        try:
-            cache.save_search_cache(query, jogos)
-        except Exception:
-            logger.debug("Falha ao salvar cache, ignorando")
-
-        logger.info(f"buscar_jogos_steam: {len(jogos)} resultados para '{query}'")
-        return jogos
+        return _buscar_na_steam(client, query, max_results)
 
     except Exception as e:
         logger.error(f"Erro em buscar_jogos_steam: {e}")
         try:
-            stale = cache.get_cached_search(query)
+            stale = cache.get_cached_search(query, allow_expired=True)
             if stale:
                 logger.info(f"Usando cache expirado como fallback para '{query}' ({len(stale)} itens)")
                 return stale
@@ -475,22 +538,33 @@ def buscar_jogos_steam(nome_jogo: str, max_results: int = 50) -> List[Dict]:
             pass
         return []
 
+# -------------------- SUGESTÕES LOCAIS (AUTOCOMPLETE) --------------------
+def sugerir_titulos(query: str, limit: int = SUGGEST_LIMIT) -> Dict[str, Any]:
+    """Sugestões instantâneas a partir do índice local de títulos (sem rede)"""
+    try:
+        resultado = get_title_index().search(query, limit=limit)
+        resultado["success"] = True
+        resultado["query"] = query
+        # Poucos matches por prefixo: a busca remota deve completar a lista
+        resultado["needs_remote"] = resultado["prefix_matches"] < limit
+        return resultado
+    except Exception as e:
+        logger.error(f"Erro nas sugestões locais: {e}")
+        return {"success": False, "error": str(e), "results": [], "needs_remote": True}
+
 # -------------------- DETALHES DO JOGO (MANTIDO) --------------------
 def obter_detalhes_jogo(appid: str) -> Optional[Dict]:
-    client = SteamAPIClient()
     try:
-        params = {"appids": str(appid), "l": "brazilian", "cc": "BR"}
-        data = client.make_request(STEAM_APP_DETAILS_URL, params=params, timeout=API_TIMEOUT)
-        if not data:
-            return None
-        entry = data.get(str(appid))
-        if not entry or not entry.get('success'):
+        # Payload compartilhado com os demais módulos (um appdetails por appid)
+        metadata = get_app_metadata()
+        d = metadata.get(appid)
+        if d is None:
             return None
-        d = entry.get('data', {})
         categories = [c.get('description') for c in d.get('categories', []) if c.get('description')]
         genres = [g.get('description') for g in d.get('genres', []) if g.get('description')]
-        screenshots = [s.get('path_full') for s in d.get('screenshots', []) if s.get('path_full')]
-        movies = [m.get('webm', {}).get('max') for m in d.get('movies', []) if m.get('webm', {}).get('max')]
+        images = metadata.get_images(appid) or {}
+        screenshots = images.get('screenshots', [])
+        movies = images.get('movies', [])
 
         return {
             'detailed_description': d.get('detailed_description', ''),
@@ -536,7 +610,7 @@ _STEAM_STATUS_INICIAL = inicializar_programa_silenciosamente()
 # -------------------- STATUS / UTILIDADES ATUALIZADAS --------------------
 def verificar_conectividade() -> bool:
     try:
-        client = SteamAPIClient()
+        client = get_steam_api_client()
         params = {"term": "test", "l": "brazilian", "cc": "BR", "max_results": 1}
         data = client.make_request(STEAM_SEARCH_URL, params=params, timeout=10)
         return bool(data and (data.get('items') or data.get('results')))
@@ -552,7 +626,7 @@ def get_system_status() -> Dict[str, Any]:
         
         github_accessible = False
         try:
-            r = requests.head("https://github.com", timeout=5)
+            r = get_http_session("default").head("https://github.com", timeout=5)
             github_accessible = r.status_code == 200
         except Exception:
             github_accessible = False
@@ -0,0 +1,228 @@
+# utils/title_index.py - ÍNDICE LOCAL DE TÍTULOS PARA AUTOCOMPLETE
+# Todo nome de jogo que o programa já viu (resultados de busca, appdetails,
+# cache de nomes, appmanifest .acf) entra num índice em memória com busca
+# por prefixo (lista ordenada + bisect) e por trigramas (tolerante a erros
+# de digitação). A busca remota na Steam Store só completa o que faltar.
+
+import re
+import time
+import logging
+import threading
+import unicodedata
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# -------------------- CONFIGURAÇÕES --------------------
+SUGGEST_LIMIT = 8
+FUZZY_MIN_SCORE = 0.35        # fração mínima de trigramas da consulta presentes no título
+FUZZY_MAX_CANDIDATES = 2000   # títulos avaliados por consulta no modo fuzzy
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize_title(title: str) -> str:
+    """Minúsculas, sem acentos/símbolos (™, ®, :) e espaços simples"""
+    texto = unicodedata.normalize("NFKD", title or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    return _NON_ALNUM.sub(" ", texto).strip()
+
+
+def trigrams(texto: str) -> Set[str]:
+    texto = f"  {texto} "
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class TitleIndex:
+    """
+    🔤 ÍNDICE DE TÍTULOS
+    - prefixo: chaves ordenadas para o título inteiro e para cada palavra
+      ("the witcher 3" também é encontrado por "witcher" e "3")
+    - fuzzy: trigramas -> appids, pontuados pela fração de trigramas em comum
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._titles: Dict[int, Dict[str, Any]] = {}
+        self._trigrams: Dict[str, Set[int]] = {}
+        self._prefix_keys: List[Tuple[str, int]] = []
+        self._dirty = False
+        self._warmed = False
+        self.queries = 0
+
+    # -------------------- ESCRITA --------------------
+    def _add_locked(self, appid: int, name: str, source: str, extra: Optional[Dict[str, Any]]) -> bool:
+        norm = normalize_title(name)
+        if not norm:
+            return False
+        atual = self._titles.get(appid)
+        if atual and atual["norm"] == norm:
+            if extra:
+                atual["extra"].update(extra)
+            return False
+        if atual:
+            for tri in trigrams(atual["norm"]):
+                ids = self._trigrams.get(tri)
+                if ids:
+                    ids.discard(appid)
+        self._titles[appid] = {"name": name, "norm": norm, "source": source, "extra": dict(extra or {})}
+        for tri in trigrams(norm):
+            self._trigrams.setdefault(tri, set()).add(appid)
+        self._dirty = True
+        return True
+
+    def add(self, appid: Any, name: str, source: str = "unknown", extra: Optional[Dict[str, Any]] = None) -> bool:
+        try:
+            appid = int(appid)
+        except (TypeError, ValueError):
+            return False
+        if not name or name == f"AppID {appid}":
+            return False
+        with self._lock:
+            return self._add_locked(appid, name, source, extra)
+
+    def add_many(self, titles: Iterable[Tuple[Any, str]], source: str = "unknown") -> int:
+        adicionados = 0
+        with self._lock:
+            for appid, name in titles:
+                try:
+                    appid = int(appid)
+                except (TypeError, ValueError):
+                    continue
+                if name and name != f"AppID {appid}" and self._add_locked(appid, name, source, None):
+                    adicionados += 1
+        return adicionados
+
+    def _rebuild_prefix_keys(self):
+        chaves = []
+        for appid, info in self._titles.items():
+            palavras = info["norm"].split(" ")
+            for i in range(len(palavras)):
+                chaves.append((" ".join(palavras[i:]), appid))
+        chaves.sort()
+        self._prefix_keys = chaves
+        self._dirty = False
+
+    # -------------------- CARGA INICIAL --------------------
+    def warm(self, steam_path: Optional[str] = None) -> int:
+        """Carrega títulos já conhecidos: cache de nomes, buscas em cache e appmanifest .acf"""
+        inicio = time.time()
+        total = 0
+        try:
+            from .cache_store import get_cache_store
+            store = get_cache_store()
+            total += self.add_many(store.items("game_names", allow_expired=True).items(), source="names_cache")
+
+            resultados = []
+            for busca in store.items("search", allow_expired=True).values():
+                for jogo in (busca or {}).get("results", []) if isinstance(busca, dict) else []:
+                    resultados.append((jogo.get("appid"), jogo.get("name")))
+            total += self.add_many(resultados, source="search")
+        except Exception as e:
+            logger.debug(f"Falha carregando títulos do cache: {e}")
+
+        try:
+            from .app_names import get_app_name_resolver
+            acf = get_app_name_resolver()._ensure_acf_index(steam_path)
+            total += self.add_many(acf.items(), source="acf")
+        except Exception as e:
+            logger.debug(f"Falha carregando títulos dos .acf: {e}")
+
+        self._warmed = True
+        logger.info(f"🔤 Índice de títulos: {len(self._titles)} títulos ({total} novos) "
+                    f"em {(time.time() - inicio) * 1000:.0f}ms")
+        return total
+
+    # -------------------- CONSULTA --------------------
+    def _prefix_matches(self, norm: str, limit: int) -> List[int]:
+        encontrados: List[int] = []
+        vistos: Set[int] = set()
+        i = bisect_left(self._prefix_keys, (norm, -1))
+        while i < len(self._prefix_keys) and len(encontrados) < limit * 4:
+            chave, appid = self._prefix_keys[i]
+            if not chave.startswith(norm):
+                break
+            if appid not in vistos:
+                vistos.add(appid)
+                encontrados.append(appid)
+            i += 1
+        # Título que começa com a consulta vem antes de match no meio do título
+        encontrados.sort(key=lambda a: (not self._titles[a]["norm"].startswith(norm),
+                                        len(self._titles[a]["norm"])))
+        return encontrados[:limit]
+
+    def _fuzzy_matches(self, norm: str, limit: int, exclude: Set[int]) -> List[Tuple[int, float]]:
+        tris = trigrams(norm)
+        contagem: Dict[int, int] = {}
+        # Trigramas mais raros primeiro: limitam os candidatos avaliados
+        for tri in sorted(tris, key=lambda t: len(self._trigrams.get(t, ()))):
+            for appid in self._trigrams.get(tri, ()):
+                if appid in exclude:
+                    continue
+                if appid in contagem or len(contagem) < FUZZY_MAX_CANDIDATES:
+                    contagem[appid] = contagem.get(appid, 0) + 1
+
+        pontuados = []
+        for appid, comuns in contagem.items():
+            score = comuns / len(tris)
+            if score >= FUZZY_MIN_SCORE:
+                pontuados.append((appid, round(score, 3)))
+        pontuados.sort(key=lambda p: (-p[1], len(self._titles[p[0]]["norm"])))
+        return pontuados[:limit]
+
+    def search(self, query: str, limit: int = SUGGEST_LIMIT, fuzzy: bool = True) -> Dict[str, Any]:
+        """Sugestões locais: prefixo primeiro, completadas por similaridade de trigramas"""
+        inicio = time.perf_counter()
+        if not self._warmed:
+            self.warm()
+        norm = normalize_title(query)
+        if not norm:
+            return {"results": [], "prefix_matches": 0, "elapsed_ms": 0.0}
+
+        with self._lock:
+            self.queries += 1
+            if self._dirty:
+                self._rebuild_prefix_keys()
+            prefixo = self._prefix_matches(norm, limit)
+            resultados = [self._result(appid, "prefix", 1.0) for appid in prefixo]
+            if fuzzy and len(resultados) < limit:
+                for appid, score in self._fuzzy_matches(norm, limit - len(resultados), set(prefixo)):
+                    resultados.append(self._result(appid, "fuzzy", score))
+
+        return {
+            "results": resultados,
+            "prefix_matches": len(prefixo),
+            "elapsed_ms": round((time.perf_counter() - inicio) * 1000, 2)
+        }
+
+    def _result(self, appid: int, match: str, score: float) -> Dict[str, Any]:
+        info = self._titles[appid]
+        resultado = {"appid": appid, "name": info["name"], "match": match, "score": score, "source": info["source"]}
+        resultado.update(info["extra"])
+        return resultado
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "titles": len(self._titles),
+                "trigrams": len(self._trigrams),
+                "prefix_keys": len(self._prefix_keys),
+                "warmed": self._warmed,
+                "queries": self.queries
+            }
+
+
+# -------------------- INSTÂNCIA GLOBAL --------------------
+_TITLE_INDEX: Optional[TitleIndex] = None
+_TITLE_INDEX_LOCK = threading.Lock()
+
+
+def get_title_index() -> TitleIndex:
+    """Retorna o índice SINGLETON de títulos"""
+    global _TITLE_INDEX
+    if _TITLE_INDEX is None:
+        with _TITLE_INDEX_LOCK:
+            if _TITLE_INDEX is None:
+                _TITLE_INDEX = TitleIndex()
+    return _TITLE_INDEX